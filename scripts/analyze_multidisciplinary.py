@@ -3,40 +3,41 @@
 Analyze multidisciplinary courses in MIT OCW data.
 """
 
-import json
 import re
-from pathlib import Path
 from collections import defaultdict
 
+from graph_loader import load_index
+from keyword_classifier import KeywordClassifier
+
+# Indicators of multidisciplinary courses
+MULTIDISCIPLINARY_KEYWORDS = [
+    'joint', 'cross', 'interdisciplinary', 'multidisciplinary',
+    'collaborative', 'combined', 'integrated', 'hybrid', 'cross-listed'
+]
+# Subject areas whose co-occurrence in a title suggests a multidisciplinary course
+SUBJECT_AREAS = ['computer science', 'mathematics', 'physics', 'chemistry',
+                 'biology', 'engineering', 'economics', 'history', 'literature']
+
+# Each keyword is its own category, so the hits name the indicators directly
+KEYWORD_INDICATORS = KeywordClassifier({f'keyword_{keyword}': [keyword] for keyword in MULTIDISCIPLINARY_KEYWORDS})
+SUBJECT_AREA_CLASSIFIER = KeywordClassifier({area: [area] for area in SUBJECT_AREAS})
+
 def analyze_multidisciplinary():
     """Analyze which courses are multidisciplinary."""
     
-    # Load graph data
-    graph_path = Path(__file__).parent.parent / 'public' / 'data' / 'mit-ocw-graph.json'
-    if not graph_path.exists():
-        graph_path = Path(__file__).parent.parent / 'data' / 'mit-ocw-graph.json'
-    
-    with open(graph_path, 'r') as f:
-        data = json.load(f)
-    
-    # Indicators of multidisciplinary courses
-    multidisciplinary_keywords = [
-        'joint', 'cross', 'interdisciplinary', 'multidisciplinary',
-        'collaborative', 'combined', 'integrated', 'hybrid', 'cross-listed'
-    ]
+    # Load graph data (through its cached snapshot, see graph_loader.py)
+    nodes = load_index().nodes
     
     multidisciplinary_courses = []
     joint_notation_courses = []
     multiple_dept_courses = []
     
-    for node in data['nodes']:
+    for node in nodes:
         course_id = node['id']
         title = node.get('title', '') or ''
         description = node.get('description', '') or ''
         department = node.get('department', '') or ''
         
-        title_lower = title.lower()
-        desc_lower = description.lower()
         dept_lower = department.lower() if department else ''
         
         indicators = []
@@ -46,10 +47,8 @@ def analyze_multidisciplinary():
             joint_notation_courses.append(course_id)
             indicators.append('joint_notation')
         
-        # Check for multidisciplinary keywords
-        for keyword in multidisciplinary_keywords:
-            if keyword in title_lower or keyword in desc_lower or keyword in dept_lower:
-                indicators.append(f'keyword_{keyword}')
+        # Check for multidisciplinary keywords (one scan over all three fields)
+        indicators.extend(KEYWORD_INDICATORS.counts('\n'.join((title, description, department))))
         
         # Check for multiple departments mentioned
         if department and (' and ' in dept_lower or ' & ' in dept_lower or ', ' in dept_lower):
@@ -58,9 +57,7 @@ def analyze_multidisciplinary():
         
         # Check for courses that span multiple subject areas in title
         # (e.g., "Computer Science and Mathematics", "Physics and Chemistry")
-        subject_areas = ['computer science', 'mathematics', 'physics', 'chemistry', 
-                        'biology', 'engineering', 'economics', 'history', 'literature']
-        found_areas = [area for area in subject_areas if area in title_lower]
+        found_areas = SUBJECT_AREA_CLASSIFIER.counts(title)
         if len(found_areas) > 1:
             indicators.append('multiple_subjects_in_title')
         
@@ -79,9 +76,9 @@ def analyze_multidisciplinary():
     print("MIT OCW Multidisciplinary Course Analysis")
     print("=" * 70)
     print()
-    print(f"Total courses: {len(data['nodes'])}")
+    print(f"Total courses: {len(nodes)}")
     print(f"Multidisciplinary courses: {len(unique_multidisciplinary)}")
-    print(f"Percentage: {len(unique_multidisciplinary) / len(data['nodes']) * 100:.1f}%")
+    print(f"Percentage: {len(unique_multidisciplinary) / len(nodes) * 100:.1f}%")
     print()
     
     print("Breakdown by indicator type:")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword classification on synthetic thesis and course records.
+
+Each record is a few topic phrases and a short description. The words are
+drawn from the keywords of ``COLLEGE_MAPPINGS`` and the multidisciplinary
+indicators, from words that merely contain a keyword ("chain", "partial",
+"across"), from derived forms that should still count ("Mathematical",
+"Environmental", "Philosophies") and from filler. Per record count, the
+run times:
+
+- ``substring``: the nested ``keyword in text`` scoring that
+  ``map_to_college`` and ``analyze_multidisciplinary.py`` used before
+- ``compiled``: ``KeywordClassifier``, one scan per record
+
+It reports records per second for both, and how often they pick a
+different college, split into records where the substring scan counted a
+false hit and records where the compiled scan missed a derived form (a
+lost true hit). The substring scan costs O(keywords) per record and the
+compiled scan does not, so the smallest record count is run again with
+``--extra-keywords`` synthetic keywords added to the college table (a
+taxonomy such as OpenAlex's topics has thousands).
+
+Usage:
+    python bench_classifier.py [--records 100000 1000000] [--extra-keywords 1000] [--seed 0]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from analyze_multidisciplinary import MULTIDISCIPLINARY_KEYWORDS
+from fetch_phd_thesis_topics import COLLEGE_MAPPINGS
+from keyword_classifier import KeywordClassifier
+
+# Words that contain a keyword without meaning it
+NEAR_MISSES = ['chain', 'partial', 'maintain', 'across', 'startup', 'smart', 'artifact', 'csv',
+               'blockchain', 'histology', 'crossword', 'mathsoft']
+# Derived forms of keywords that should still be found
+DERIVED = ['mathematical', 'statistical', 'environmental', 'philosophies', 'historical', 'linguistic',
+           'biological', 'economic', 'educational', 'physicists', 'algebraic', 'musical']
+FILLER = ('a study of the effects on models for systems with data under new methods in '
+          'regional analysis design and theory toward practice using large scale').split()
+
+
+def synthetic_records(n: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in COLLEGE_MAPPINGS.values() for keyword in keywords]
+    keywords += MULTIDISCIPLINARY_KEYWORDS
+    vocabulary = [keyword.rstrip('*') for keyword in keywords] + NEAR_MISSES * 2 + DERIVED + FILLER * 3
+
+    def phrase(words: int) -> str:
+        return ' '.join(rng.choice(vocabulary) for _ in range(words)).capitalize()
+
+    return [{'discipline': phrase(2), 'topics': [phrase(3) for _ in range(rng.randint(1, 4))],
+             'description': phrase(rng.randint(10, 40))} for _ in range(n)]
+
+
+def substring_best(text: str, mappings: Dict[str, List[str]]) -> str:
+    """The pre-classifier ``map_to_college`` scoring (a stem is a plain substring)."""
+    text = text.lower()
+    scores = {}
+    for college, keywords in mappings.items():
+        score = sum(1 for keyword in keywords if keyword.rstrip('*') in text)
+        if score > 0:
+            scores[college] = score
+    return max(scores.items(), key=lambda x: x[1])[0] if scores else 'META'
+
+
+def substring_indicators(text: str) -> List[str]:
+    text = text.lower()
+    return [f'keyword_{keyword}' for keyword in MULTIDISCIPLINARY_KEYWORDS if keyword in text]
+
+
+def extended_mappings(extra: int, seed: int) -> Dict[str, List[str]]:
+    """``COLLEGE_MAPPINGS`` with ``extra`` made-up keywords spread over its colleges."""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    mappings = {college: list(keywords) for college, keywords in COLLEGE_MAPPINGS.items()}
+    colleges = list(mappings)
+    for i in range(extra):
+        word = ''.join(rng.choice(letters) for _ in range(rng.randint(5, 12)))
+        mappings[colleges[i % len(colleges)]].append(word if rng.random() < 0.7 else f"{word} studies")
+    return mappings
+
+
+def compare(texts: List[str], mappings: Dict[str, List[str]]):
+    n = len(texts)
+    start = time.perf_counter()
+    colleges = KeywordClassifier(mappings)
+    indicators = KeywordClassifier({f'keyword_{keyword}': [keyword] for keyword in MULTIDISCIPLINARY_KEYWORDS})
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    old_colleges = [substring_best(text, mappings) for text in texts]
+    old_indicators = sum(len(substring_indicators(text)) for text in texts)
+    substring = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_colleges = [colleges.best(text, 'META') for text in texts]
+    new_indicators = sum(len(indicators.counts(text)) for text in texts)
+    compiled = time.perf_counter() - start
+
+    for text in texts[:1000]:  # the fast path and the positional scan agree
+        assert colleges.found(text) == {keyword for _, keyword in colleges.finditer(text)}
+
+    # A derived form the compiled scan finds no keyword in, though the
+    # substring scan does, is a lost true hit; every other change of college
+    # comes from a substring false hit ('ai' in "chain", 'math' counted again
+    # inside "mathematical")
+    lost_words = {word for word in DERIVED if not colleges.found(word)
+                  and any(keyword.rstrip('*') in word for keyword in colleges.keywords)}
+    changed = lost = 0
+    for text, old, new in zip(texts, old_colleges, new_colleges):
+        if old != new:
+            changed += 1
+            lost += bool(lost_words & set(re.findall(r'\w+', text.lower())))
+    print(f"  {len(colleges.keywords)} college keywords, compiled in {compile_ms:.1f} ms")
+    print(f"  substring: {substring:6.2f}s ({n / substring:9.0f} records/s), {old_indicators} indicator hits")
+    print(f"  compiled:  {compiled:6.2f}s ({n / compiled:9.0f} records/s), {new_indicators} indicator hits")
+    print(f"  speedup {substring / compiled:.1f}x; college differs for {changed} records "
+          f"({changed / n * 100:.1f}%): {changed - lost} substring false hits, {lost} lost true hits")
+    if lost_words:
+        print(f"  derived forms no keyword covers: {', '.join(sorted(lost_words))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled keyword classification against substring scans")
+    parser.add_argument("--records", type=int, nargs="+", default=[100000, 1000000], help="Record counts")
+    parser.add_argument("--extra-keywords", type=int, default=1000,
+                        help="Synthetic keywords added for the scaling run (default: 1000, 0 to skip)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    for n in args.records:
+        records = synthetic_records(n, args.seed)
+        texts = ['\n'.join([record['discipline'], *record['topics'], record['description']]) for record in records]
+        print(f"{n} records, {sum(map(len, texts)) / n:.0f} characters each:")
+        compare(texts, COLLEGE_MAPPINGS)
+        if args.extra_keywords and n == min(args.records):
+            compare(texts, extended_mappings(args.extra_keywords, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark the OCW crawl engine against a local stand-in HTTP server.
+
+The stand-in server serves a synthetic catalog shaped like MIT OCW (course
+pages plus syllabus pages, with some syllabi missing) and adds a fixed
+latency per request. Each run fetches the whole catalog with a different
+worker count and checks that the resulting graph matches the serial one.
+
+Usage:
+    python bench_crawl.py [--courses N] [--latency MS] [--workers 1 4 8 16] [--cache] [--discover]
+                          [--parse-workers N] [--syllabus always|linked|adaptive]
+
+With ``--cache`` every configuration is run twice against a fresh response
+cache: a cold run that fills it and a warm run that revalidates with
+conditional requests (the stand-in server answers them with 304).
+
+With ``--discover`` each configuration instead streams course URLs from the
+stand-in sitemap index (gzipped child shards) straight into the fetch stage.
+With ``--parse-workers N`` pages are parsed in N worker processes fed by the
+fetch threads (the staged pipeline) instead of on the fetch threads.
+"""
+
+import argparse
+import gzip
+import hashlib
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from fetch_mit_ocw import MITOCWScraper
+from http_cache import ResponseCache
+
+COURSE_PAGE = """<!doctype html>
+<html>
+<head>
+<title>{title} | Mathematics | MIT OpenCourseWare</title>
+<meta name="description" content="Synthetic course {index} for crawl benchmarks.">
+</head>
+<body>
+<div class="course-info">
+<h1>{title} | Mathematics | MIT OpenCourseWare</h1>
+<p>An undergraduate subject.</p>
+{prerequisites}
+</div>
+<nav>{links}</nav>
+</body>
+</html>
+"""
+
+SYLLABUS_PAGE = """<!doctype html>
+<html>
+<head><title>Syllabus | {title}</title></head>
+<body>
+<div class="syllabus">
+<h2>Syllabus</h2>
+<p>Corequisite: {corequisite}</p>
+</div>
+</body>
+</html>
+"""
+
+SITEMAP_SHARD = 25
+
+
+def course_slug(index: int) -> str:
+    return f"18-{index:03d}-synthetic-course-{index}-fall-2020"
+
+
+def make_handler(courses: int, latency: float, counter: dict):
+    """Build a request handler class serving a synthetic catalog.
+
+    Requests are tallied in ``counter["requests"]``.
+    """
+    counter_lock = threading.Lock()
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with counter_lock:
+                counter["requests"] += 1
+            time.sleep(latency)
+            if self.path.startswith("/sitemap"):
+                body = self._render_sitemap(self.path)
+            else:
+                body = self._render(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = body if isinstance(body, bytes) else body.encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(data).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _render(self, path: str):
+            parts = [p for p in path.split("/") if p]
+            if len(parts) < 2 or parts[0] != "courses":
+                return None
+            try:
+                index = int(parts[1].split("-")[1])
+            except (IndexError, ValueError):
+                return None
+            if index >= courses or parts[1] != course_slug(index):
+                return None
+            title = f"Synthetic Course {index}"
+            if parts[2:] == []:
+                # Odd-numbered courses list no prerequisites on their home page
+                prerequisites = ", ".join(
+                    f"18.{i:03d}" for i in (index - 1, index // 2) if 0 <= i < index
+                ) if index % 2 == 0 else ""
+                links = f'<a href="/courses/{parts[1]}/pages/syllabus/">Syllabus</a>' if index % 3 else ""
+                return COURSE_PAGE.format(
+                    title=title, index=index, links=links,
+                    prerequisites=f"<p>Prerequisites: {prerequisites}</p>" if prerequisites else "",
+                )
+            if parts[2:] == ["pages", "syllabus"] and index % 3:
+                return SYLLABUS_PAGE.format(title=title, corequisite=f"18.{(index + 1) % courses:03d}")
+            return None
+
+        def _render_sitemap(self, path: str):
+            """Serve a sitemap index whose children are gzipped urlset shards."""
+            base = f"http://{self.headers.get('Host')}"
+            if path == "/sitemap.xml":
+                shards = "".join(
+                    f"<sitemap><loc>{base}/sitemaps/courses-{k}.xml.gz</loc></sitemap>"
+                    for k in range((courses + SITEMAP_SHARD - 1) // SITEMAP_SHARD)
+                )
+                return ('<?xml version="1.0" encoding="UTF-8"?>'
+                        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                        f"{shards}</sitemapindex>")
+            if path.startswith("/sitemaps/courses-") and path.endswith(".xml.gz"):
+                k = int(path[len("/sitemaps/courses-"):-len(".xml.gz")])
+                entries = "".join(
+                    f"<url><loc>{base}/courses/{course_slug(i)}/</loc><lastmod>2020-09-01</lastmod></url>"
+                    for i in range(k * SITEMAP_SHARD, min(courses, (k + 1) * SITEMAP_SHARD))
+                )
+                return gzip.compress(
+                    ('<?xml version="1.0" encoding="UTF-8"?>'
+                     '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                     f"{entries}</urlset>").encode("utf-8")
+                )
+            return None
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def start_server(courses: int, latency: float) -> ThreadingHTTPServer:
+    """Serve the stand-in catalog; ``server.counter["requests"]`` counts requests."""
+    counter = {"requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(courses, latency, counter))
+    server.counter = counter
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OCW crawler against a local stand-in server")
+    parser.add_argument("--courses", type=int, default=200, help="Synthetic catalog size (default: 200)")
+    parser.add_argument("--latency", type=float, default=20, help="Per-request latency in ms (default: 20)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16], help="Worker counts to compare")
+    parser.add_argument("--cache", action="store_true", help="Also measure warm runs through the response cache")
+    parser.add_argument("--discover", action="store_true",
+                        help="Stream URLs from the stand-in sitemap index instead of a fixed list")
+    parser.add_argument("--syllabus", choices=["always", "linked", "adaptive"], default="always",
+                        help="Syllabus fetch policy (default: always)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Parse in N worker processes (default: 0, parse on the fetch threads)")
+    args = parser.parse_args()
+
+    server = start_server(args.courses, args.latency / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/courses/{course_slug(i)}" for i in range(args.courses)]
+
+    print(f"Stand-in catalog: {args.courses} courses, {args.latency:.0f} ms latency"
+          + (f", {args.parse_workers} parse workers" if args.parse_workers else ""))
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            passes = ["cold", "warm"] if args.cache else [""]
+            for label in passes:
+                cache = ResponseCache(Path(cache_dir)) if args.cache else None
+                scraper = MITOCWScraper(workers=workers, max_per_host=workers, cache=cache,
+                                        parse_workers=args.parse_workers, syllabus_policy=args.syllabus)
+                scraper.SITEMAP_URL = f"{base}/sitemap.xml"
+                requests_before = server.counter["requests"]
+                start = time.perf_counter()
+                scraper.fetch_courses(scraper.iter_sitemap_courses() if args.discover else urls)
+                elapsed = time.perf_counter() - start
+                graph = scraper.build_graph()
+                if baseline is None:
+                    baseline = graph
+                status = "ok" if graph == baseline else "MISMATCH"
+                print(f"  workers={workers:<3} {label:<4} {elapsed:7.2f}s  "
+                      f"{len(scraper.courses) / elapsed:8.1f} courses/s  "
+                      f"requests={server.counter['requests'] - requests_before}  graph={status}")
+                if cache:
+                    cache.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
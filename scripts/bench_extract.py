@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark course-page extraction over saved HTML fixtures.
+
+Each directory under ``fixtures/ocw/`` holds one saved course: ``index.html``
+(the course home page) and, optionally, ``syllabus.html``. Every course is
+parsed with both extractors, the resulting ``Course`` objects are checked
+for equality, and then parse throughput is measured for each.
+
+A synthetic page with deeply nested sections is added to show how each
+extractor scales with document depth.
+
+Usage:
+    python bench_extract.py [--rounds N] [--depth D] [--fixtures DIR]
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from fetch_mit_ocw import MITOCWScraper
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'ocw'
+
+Page = Tuple[str, bytes, Optional[bytes]]
+
+
+def load_fixtures(directory: Path) -> List[Page]:
+    """Load (url, home page, syllabus page) triples from a fixtures directory."""
+    pages = []
+    for course_dir in sorted(p for p in directory.iterdir() if p.is_dir()):
+        syllabus = course_dir / 'syllabus.html'
+        pages.append((
+            f"https://ocw.mit.edu/courses/{course_dir.name}",
+            (course_dir / 'index.html').read_bytes(),
+            syllabus.read_bytes() if syllabus.exists() else None,
+        ))
+    return pages
+
+
+def synthetic_page(depth: int) -> Page:
+    """A course page whose prerequisite notes sit inside ``depth`` nested sections."""
+    parts = ['<!doctype html><html><head><meta charset="utf-8">',
+             '<title>Deep Course | Mathematics | MIT OpenCourseWare</title></head><body>']
+    for i in range(depth):
+        parts.append(f'<div class="course-section level-{i}"><p>Section {i} notes.</p>')
+        parts.append(f'<p><span>Prerequisite</span> for part {i}: <em>{10 + i % 80}.{i % 100:02d}</em>.</p>')
+        if i % 5 == 0:
+            parts.append(f'<ul><li>Corequisite: 18.{i % 100:02d}</li></ul>')
+    parts.append('</div>' * depth)
+    parts.append('</body></html>')
+    return ('https://ocw.mit.edu/courses/18-999-deep-course-fall-2020', ''.join(parts).encode('utf-8'), None)
+
+
+def parse_all(scraper: MITOCWScraper, pages: List[Page]):
+    return [scraper.parse_course_page(url, content, syllabus) for url, content, syllabus in pages]
+
+
+def time_parser(scraper: MITOCWScraper, pages: List[Page], rounds: int) -> float:
+    """Return mean seconds per page over ``rounds`` passes."""
+    count = sum(1 + (syllabus is not None) for _, _, syllabus in pages)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse_all(scraper, pages)
+    return (time.perf_counter() - start) / (rounds * count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCW page extraction over saved fixtures")
+    parser.add_argument("--rounds", type=int, default=20, help="Timing passes over the fixtures (default: 20)")
+    parser.add_argument("--depth", type=int, default=200, help="Nesting depth of the synthetic page (default: 200)")
+    parser.add_argument("--fixtures", type=str, default=str(FIXTURES_DIR), help="Fixtures directory")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(Path(args.fixtures))
+    synthetic = [synthetic_page(args.depth)]
+    soup = MITOCWScraper(parser='soup')
+    lxml = MITOCWScraper(parser='lxml')
+
+    print(f"Checking extractor parity on {len(fixtures)} fixture courses + 1 synthetic page...")
+    mismatches = 0
+    for (url, _, _), expected, actual in zip(fixtures + synthetic,
+                                             parse_all(soup, fixtures + synthetic),
+                                             parse_all(lxml, fixtures + synthetic)):
+        if expected != actual:
+            mismatches += 1
+            print(f"  MISMATCH {url}")
+            print(f"    soup: {asdict(expected) if expected else None}")
+            print(f"    lxml: {asdict(actual) if actual else None}")
+    print(f"  {mismatches} mismatches")
+
+    print("\nParse throughput:")
+    for label, pages, rounds in [("fixtures", fixtures, args.rounds), (f"synthetic depth={args.depth}", synthetic, 3)]:
+        soup_time = time_parser(soup, pages, rounds)
+        lxml_time = time_parser(lxml, pages, rounds)
+        print(f"  {label}")
+        print(f"    soup: {soup_time * 1e6:10.0f} µs/page  {1 / soup_time:8.1f} pages/s")
+        print(f"    lxml: {lxml_time * 1e6:10.0f} µs/page  {1 / lxml_time:8.1f} pages/s  ({soup_time / lxml_time:.1f}x)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
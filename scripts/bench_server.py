@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the graph query server under concurrent load.
+
+Writes a synthetic prerequisite graph (see bench_layout.py) or uses a given
+graph file, starts ``graph_server.py`` on it in a separate process, and
+drives it with a mix of node, search, ego, path and department queries from
+several client threads, each on its own keep-alive connection. Reports
+throughput and p50/p95/p99 latency per query type, for cold requests and
+for ``If-None-Match`` revalidations (which the server answers with 304).
+
+Usage:
+    python bench_server.py [--nodes 100000] [--graph FILE] [--clients 1 8 32] [--requests 2000]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+from bench_layout import synthetic_graph
+from crawl_metrics import QUANTILES, quantile
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _queries(graph: Dict, count: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    ids = [node['id'] for node in graph['nodes']]
+    departments = sorted({node.get('department') or 'Unknown' for node in graph['nodes']})
+    targets = [edge['target'] for edge in graph['edges']]
+    sources = [edge['source'] for edge in graph['edges']] or ids
+    pick = lambda values: quote(rng.choice(values), safe='')
+    makers = [
+        ('node', lambda: f"/node/{pick(ids)}"),
+        ('search', lambda: f"/search?prefix={quote(rng.choice(ids)[:4], safe='')}&limit=20"),
+        ('ego', lambda: f"/ego/{pick(ids)}?k=2"),
+        ('path', lambda: f"/path?from={pick(sources)}&to={pick(targets or ids)}"),
+        ('department', lambda: f"/department/{pick(departments)}"),
+    ]
+    return [(kind, make()) for kind, make in (rng.choice(makers) for _ in range(count))]
+
+
+def _quantiles(sorted_seconds: List[float]) -> Dict[str, float]:
+    return {f"p{int(q * 100)}": quantile(sorted_seconds, q) * 1000 for q in QUANTILES}
+
+
+def _run(port: int, queries: List[Tuple[str, str]], clients: int, etags: Dict[str, str], revalidate: bool) -> Dict:
+    """Send ``queries`` from ``clients`` threads; cold runs collect ETags, revalidating runs send them."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[int, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    def client(share: List[Tuple[str, str]]):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        mine = defaultdict(list)
+        codes = defaultdict(int)
+        for kind, path in share:
+            headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            mine[kind].append(time.perf_counter() - start)
+            codes[response.status] += 1
+            if response.status == 200 and not revalidate:
+                etags[path] = response.getheader('ETag')
+        connection.close()
+        with lock:
+            for kind, values in mine.items():
+                latencies[kind].extend(values)
+            for code, n in codes.items():
+                statuses[code] += n
+
+    threads = [threading.Thread(target=client, args=(queries[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    everything = sorted(value for values in latencies.values() for value in values)
+    return {
+        'requests': len(queries),
+        'seconds': elapsed,
+        'per_second': len(queries) / elapsed,
+        'statuses': dict(statuses),
+        'latency_ms': {kind: _quantiles(sorted(values)) for kind, values in sorted(latencies.items())},
+        'overall_ms': _quantiles(everything),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph_server.py under concurrent load")
+    parser.add_argument("--nodes", type=int, default=100000, help="Synthetic graph size (default: 100000)")
+    parser.add_argument("--graph", help="Benchmark this graph file instead of a synthetic one")
+    parser.add_argument("--binary", action="store_true", help="Serve the synthetic graph from its .bin encoding")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.graph:
+            path = Path(args.graph)
+            with open(path) as f:
+                graph = json.load(f) if path.suffix == '.json' else None
+            if graph is None:
+                sys.exit("--graph must be a JSON graph (the queries are drawn from it)")
+        else:
+            graph = synthetic_graph(args.nodes, 12, args.seed)
+            for i, node in enumerate(graph['nodes']):
+                node['department'] = f"Department {i % 40}"
+            path = Path(tmp) / 'graph.json'
+            path.write_text(json.dumps(graph))
+            if args.binary:
+                from graph_binary import encode_graph
+
+                path = path.with_suffix('.bin')
+                path.write_bytes(encode_graph(graph))
+
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, str(Path(__file__).parent / 'graph_server.py'), str(path),
+                                   '--port', str(port), '--poll', '0']
+                                  + ([] if args.graph else ['--no-snapshot']), stdout=subprocess.DEVNULL)
+        try:
+            deadline = time.time() + 300
+            while True:
+                try:
+                    connection = http.client.HTTPConnection('127.0.0.1', port)
+                    connection.request('GET', '/health')
+                    health = json.loads(connection.getresponse().read())
+                    connection.close()
+                    break
+                except OSError:
+                    if server.poll() is not None or time.time() > deadline:
+                        sys.exit("graph_server.py did not start")
+                    time.sleep(0.2)
+            print(f"{path.name}: {health['courses']} courses, {health['edges']} edges, "
+                  f"loaded in {health['load_seconds']:.2f}s")
+
+            results = []
+            for clients in args.clients:
+                queries = _queries(graph, args.requests, args.seed + clients)
+                etags: Dict[str, str] = {}
+                for label in ('cold', 'revalidate'):
+                    result = _run(port, queries, clients, etags, revalidate=label == 'revalidate')
+                    result.update(clients=clients, mode=label)
+                    results.append(result)
+                    overall = result['overall_ms']
+                    print(f"{clients:>3} clients, {label:<10}: {result['per_second']:8.0f} req/s, "
+                          f"p50 {overall['p50']:.2f} ms, p95 {overall['p95']:.2f} ms, p99 {overall['p99']:.2f} ms "
+                          f"{dict(sorted(result['statuses'].items()))}")
+                    if label == 'cold':
+                        for kind, latency in result['latency_ms'].items():
+                            print(f"      {kind:<10} p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+                                  f"p99 {latency['p99']:.2f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the OCW scraper over a recorded HTTP archive.
+
+Record a crawl once (``fetch_mit_ocw.py --record ARCHIVE``, or
+``--record-synthetic N`` here for the bench_crawl stand-in catalog), then
+replay it under each scraper configuration:
+
+    serial     one fetch worker, parsing on the fetch thread
+    threads    ``--workers`` fetch workers, parsing on the fetch threads
+    pipeline   ``--workers`` fetch workers feeding ``--parse-workers`` parse processes
+
+Every configuration runs in its own subprocess, so peak RSS (its own, and
+that of its largest parse worker) is measured per configuration, and
+discovers courses from the archived sitemap exactly as a live crawl would.
+Requests are answered either in-process by a replay transport adapter
+(``--transport inject``) or by a local HTTP server serving the archive
+(``--transport server``); ``--latency`` adds a fixed delay per
+request. The graphs built by all configurations must be identical.
+
+Parse cost is measured separately, in-process, over the archived course
+pages with both extractors.
+
+Usage:
+    python bench_suite.py [--archive PATH] [--record-synthetic N]
+                          [--workers N] [--parse-workers N] [--latency MS]
+                          [--transport inject|server] [--rounds N] [--json PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fetch_mit_ocw import MITOCWScraper
+from http_archive import ArchiveWriter, HTTPArchive, serve_archive
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_ARCHIVE = Path(__file__).parent.parent / '.cache' / 'ocw-archive.zip'
+RESULT_PREFIX = 'RESULT '
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size of this process, in MB.
+
+    With ``children``, that of its largest terminated child instead (the
+    parse workers): the kernel keeps the maximum over children, not a sum,
+    and the two peaks need not coincide, so they are reported separately.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    scale = 1 if sys.platform == 'darwin' else 1024
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss * scale / 1e6
+
+
+def graph_digest(graph: Dict) -> str:
+    return hashlib.sha256(json.dumps(graph, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def record_synthetic(path: Path, courses: int):
+    """Record the bench_crawl stand-in catalog into an archive at ``path``."""
+    from bench_crawl import start_server
+
+    server = start_server(courses, 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    writer = ArchiveWriter(path)
+    scraper = MITOCWScraper(workers=8, max_per_host=8)
+    scraper.SITEMAP_URL = f"{base}/sitemap.xml"
+    scraper.record_to(writer)
+    scraper.fetch_courses(scraper.iter_sitemap_courses())
+    writer.meta['synthetic_courses'] = courses
+    writer.close()
+    server.shutdown()
+    print(f"Recorded {len(writer.entries)} responses ({len(scraper.courses)} courses) to {path}")
+
+
+def run_config(config: Dict) -> Dict:
+    """Crawl the archive once under ``config``; runs in a benchmark subprocess."""
+    archive = HTTPArchive(Path(config['archive']))
+    scraper = MITOCWScraper(workers=config['workers'], max_per_host=config['workers'],
+                            parse_workers=config['parse_workers'], parser=config['parser'])
+    sitemap_url = archive.meta.get('sitemap_url', scraper.SITEMAP_URL)
+    server = None
+    if config['transport'] == 'server':
+        server = serve_archive(archive, latency=config['latency'])
+        scraper.SITEMAP_URL = server.rewrite(sitemap_url)
+    else:
+        scraper.SITEMAP_URL = sitemap_url
+        scraper.replay_from(archive, config['latency'])
+
+    start = time.perf_counter()
+    scraper.fetch_courses(scraper.iter_sitemap_courses())
+    elapsed = time.perf_counter() - start
+    graph = scraper.build_graph()
+    if server is not None:
+        # Course URLs point at the local server; map them back before comparing
+        text = json.dumps(graph)
+        graph = json.loads(text.replace(server.base_url, archive.origins()[0]))
+        server.shutdown()
+    return {
+        'courses': len(scraper.courses),
+        'seconds': elapsed,
+        'courses_per_second': len(scraper.courses) / elapsed if elapsed else None,
+        'requests': scraper.metrics.requests,
+        'graph': graph_digest(graph),
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_child_rss_mb': peak_rss_mb(children=True),
+    }
+
+
+def spawn_config(name: str, config: Dict) -> Dict:
+    """Run one configuration in a fresh interpreter and collect its result."""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--run-config", json.dumps(config)],
+        cwd=Path(__file__).parent, capture_output=True, text=True,
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return {'name': name, **config, **json.loads(line[len(RESULT_PREFIX):])}
+    sys.stderr.write(completed.stdout[-2000:] + completed.stderr[-2000:])
+    raise RuntimeError(f"Configuration {name} failed (exit status {completed.returncode})")
+
+
+def course_pages(archive: HTTPArchive) -> List:
+    """(url, body, None) for every archived course home page."""
+    pages = []
+    for url in sorted(archive.entries):
+        entry = archive.entries[url]
+        if (entry['status'] == 200 and '/courses/' in url and '/pages/' not in url
+                and 'html' in entry['headers'].get('Content-Type', 'html')):
+            pages.append((url, archive.get(url)[2], None))
+    return pages
+
+
+def time_parse(parser: str, pages: List, rounds: int) -> Optional[float]:
+    """Mean microseconds to parse one page with ``parser``."""
+    if not pages:
+        return None
+    scraper = MITOCWScraper(parser=parser)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, content, syllabus in pages:
+            scraper.parse_course_page(url, content, syllabus)
+    return (time.perf_counter() - start) / (rounds * len(pages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper configurations over a recorded HTTP archive")
+    parser.add_argument("--archive", type=str, default=str(DEFAULT_ARCHIVE),
+                        help=f"Recorded archive to replay (default: {DEFAULT_ARCHIVE})")
+    parser.add_argument("--record-synthetic", type=int, metavar="N",
+                        help="First record the bench_crawl stand-in catalog of N courses into --archive")
+    parser.add_argument("--workers", type=int, default=8, help="Fetch workers for threads/pipeline (default: 8)")
+    parser.add_argument("--parse-workers", type=int, default=2,
+                        help="Parse processes for the pipeline configuration (default: 2)")
+    parser.add_argument("--parser", choices=["lxml", "soup"], default="lxml",
+                        help="Course page extractor for the crawl runs (default: lxml)")
+    parser.add_argument("--latency", type=float, default=0, help="Added latency per request in ms (default: 0)")
+    parser.add_argument("--transport", choices=["inject", "server"], default="inject",
+                        help="Replay through a transport adapter or a local HTTP server (default: inject)")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes for the parse benchmark (default: 3)")
+    parser.add_argument("--json", type=str, metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--run-config", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        print(RESULT_PREFIX + json.dumps(run_config(json.loads(args.run_config))))
+        return
+
+    archive_path = Path(args.archive)
+    if args.record_synthetic:
+        record_synthetic(archive_path, args.record_synthetic)
+    if not archive_path.exists():
+        parser.error(f"{archive_path} does not exist; record one with fetch_mit_ocw.py --record "
+                     "or --record-synthetic N")
+
+    base = {'archive': str(archive_path.resolve()), 'parser': args.parser,
+            'latency': args.latency / 1000, 'transport': args.transport}
+    configs = [
+        ("serial", {**base, 'workers': 1, 'parse_workers': 0}),
+        ("threads", {**base, 'workers': args.workers, 'parse_workers': 0}),
+        ("pipeline", {**base, 'workers': args.workers, 'parse_workers': args.parse_workers}),
+    ]
+
+    archive = HTTPArchive(archive_path)
+    print(f"Archive {archive_path}: {len(archive.entries)} responses, "
+          f"transport={args.transport}, latency={args.latency:.0f} ms")
+    results = []
+    for name, config in configs:
+        result = spawn_config(name, config)
+        results.append(result)
+        rss, child_rss = (f"{result[key]:7.1f} MB" if result[key] else "      -"
+                          for key in ('peak_rss_mb', 'peak_child_rss_mb'))
+        print(f"  {name:<9} workers={config['workers']:<3} parse_workers={config['parse_workers']:<2} "
+              f"{result['seconds']:7.2f}s  {result['courses_per_second'] or 0:8.1f} courses/s  "
+              f"requests={result['requests']:<5} rss={rss}  child_rss={child_rss}  graph={result['graph']}")
+    digests = {result['graph'] for result in results}
+    print(f"  graphs {'identical' if len(digests) == 1 else 'DIFFER'} across configurations")
+
+    pages = course_pages(archive)
+    parse = {name: time_parse(name, pages, args.rounds) for name in ("soup", "lxml")}
+    print(f"\nParse cost over {len(pages)} archived course pages:")
+    for name, micros in parse.items():
+        print(f"  {name:<5} {micros or 0:10.0f} µs/page")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'archive': str(archive_path),
+            'configurations': results,
+            'parse_us_per_page': parse,
+            'graphs_identical': len(digests) == 1,
+        }, indent=2))
+    sys.exit(0 if len(digests) == 1 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Crawl telemetry for the OCW scraper.
+
+``CrawlMetrics`` collects request latencies, response bytes, HTTP status
+counts, parse timings, course outcomes and per-phase durations from any
+number of threads. At the end of a run (and optionally every few seconds
+during it) it is exported twice: as a JSON report and as a Prometheus
+text-format file, suitable for the node_exporter textfile collector.
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+QUANTILES = [0.5, 0.95, 0.99]
+# Latency samples kept for quantiles; beyond this, reservoir sampling
+MAX_SAMPLES = 100000
+
+
+def quantile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank quantile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class CrawlMetrics:
+    """Thread-safe counters, histograms and phase timers for one crawl."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.response_bytes = 0
+        self.cache_hits = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latencies: List[float] = []
+        self.pages_parsed = 0
+        self.parse_seconds = 0.0
+        self._parse_times: List[float] = []
+        self.courses: Counter = Counter()  # ok / not_course / failed
+        self.prerequisites: Counter = Counter()  # found / missed
+        self.phases: Dict[str, float] = {}
+        self._snapshot_stop: Optional[threading.Event] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _sample(samples: List[float], seen: int, value: float):
+        if len(samples) < MAX_SAMPLES:
+            samples.append(value)
+        else:
+            slot = random.randrange(seen)
+            if slot < MAX_SAMPLES:
+                samples[slot] = value
+
+    def record_request(self, status, latency: float, nbytes: int = 0, from_cache: bool = False):
+        """Record one HTTP request; ``status`` is the code, or ``'error'``."""
+        with self._lock:
+            self.requests += 1
+            self.statuses[str(status)] += 1
+            self.response_bytes += nbytes
+            self.cache_hits += bool(from_cache)
+            self.latency_sum += latency
+            bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+            self.latency_buckets[bucket] += 1
+            self._sample(self._latencies, self.requests, latency)
+
+    def record_parse(self, seconds: float, pages: int = 1):
+        """Record parsing ``pages`` pages of one course in ``seconds``."""
+        with self._lock:
+            self.pages_parsed += pages
+            self.parse_seconds += seconds
+            self._sample(self._parse_times, self.pages_parsed, seconds / max(1, pages))
+
+    def record_course(self, course) -> None:
+        """Record a successfully processed URL (``course`` may be None)."""
+        with self._lock:
+            if course is None:
+                self.courses['not_course'] += 1
+            else:
+                self.courses['ok'] += 1
+                self.prerequisites['found' if course.prerequisites else 'missed'] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.courses['failed'] += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a crawl phase (discovery, fetch, build, save, ...)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def report(self) -> Dict:
+        """Return a JSON-serializable snapshot of every metric."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            parse_times = sorted(self._parse_times)
+            fetch_seconds = self.phases.get('fetch') or (time.time() - self.started)
+            processed = sum(self.courses.values())
+            return {
+                'generated_at': time.time(),
+                'elapsed_seconds': time.time() - self.started,
+                'phases_seconds': dict(self.phases),
+                'requests': {
+                    'total': self.requests,
+                    'status': dict(self.statuses),
+                    'bytes': self.response_bytes,
+                    'cache_hits': self.cache_hits,
+                    'latency_seconds': {
+                        **{f"p{int(q * 100)}": quantile(latencies, q) for q in QUANTILES},
+                        'mean': self.latency_sum / self.requests if self.requests else None,
+                        'max': latencies[-1] if latencies else None,
+                    },
+                },
+                'parse': {
+                    'pages': self.pages_parsed,
+                    'seconds': self.parse_seconds,
+                    'us_per_page': {
+                        f"p{int(q * 100)}": quantile(parse_times, q) * 1e6 if parse_times else None
+                        for q in QUANTILES
+                    },
+                },
+                'courses': {
+                    **{key: self.courses.get(key, 0) for key in ('ok', 'not_course', 'failed')},
+                    'per_second': processed / fetch_seconds if fetch_seconds else None,
+                    'prerequisites_found': self.prerequisites.get('found', 0),
+                    'prerequisites_missed': self.prerequisites.get('missed', 0),
+                },
+            }
+
+    def prometheus(self) -> str:
+        """Render the metrics in Prometheus text exposition format."""
+        report = self.report()
+        with self._lock:
+            buckets = list(self.latency_buckets)
+            latency_sum = self.latency_sum
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        requests = report['requests']
+        metric('ocw_crawl_requests_total', 'counter', 'HTTP requests by status code.',
+               [({'status': status}, count) for status, count in sorted(requests['status'].items())])
+        lines.append("# HELP ocw_crawl_request_duration_seconds HTTP request latency.")
+        lines.append("# TYPE ocw_crawl_request_duration_seconds histogram")
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], buckets):
+            cumulative += count
+            lines.append(f'ocw_crawl_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"ocw_crawl_request_duration_seconds_sum {latency_sum}")
+        lines.append(f"ocw_crawl_request_duration_seconds_count {requests['total']}")
+        metric('ocw_crawl_request_latency_quantile_seconds', 'gauge', 'HTTP request latency quantiles.',
+               [({'quantile': q}, requests['latency_seconds'][f"p{int(q * 100)}"] or 0) for q in QUANTILES])
+        metric('ocw_crawl_response_bytes_total', 'counter', 'Response body bytes downloaded.',
+               [({}, requests['bytes'])])
+        metric('ocw_crawl_cache_hits_total', 'counter', 'Responses served from the local cache after a 304.',
+               [({}, requests['cache_hits'])])
+        metric('ocw_crawl_pages_parsed_total', 'counter', 'Course pages parsed.',
+               [({}, report['parse']['pages'])])
+        metric('ocw_crawl_parse_seconds_total', 'counter', 'Time spent parsing course pages.',
+               [({}, report['parse']['seconds'])])
+        courses = report['courses']
+        metric('ocw_crawl_courses_total', 'counter', 'Processed course URLs by outcome.',
+               [({'outcome': key}, courses[key]) for key in ('ok', 'not_course', 'failed')])
+        metric('ocw_crawl_prerequisites_total', 'counter', 'Courses with and without prerequisites found.',
+               [({'result': 'found'}, courses['prerequisites_found']),
+                ({'result': 'missed'}, courses['prerequisites_missed'])])
+        metric('ocw_crawl_courses_per_second', 'gauge', 'Processed course URLs per second of fetching.',
+               [({}, courses['per_second'] or 0)])
+        metric('ocw_crawl_phase_seconds', 'gauge', 'Wall time per crawl phase.',
+               [({'phase': name}, seconds) for name, seconds in sorted(report['phases_seconds'].items())])
+        metric('ocw_crawl_last_update_timestamp_seconds', 'gauge', 'When these metrics were written.',
+               [({}, report['generated_at'])])
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path, name: str = 'mit-ocw-crawl'):
+        """Atomically write ``<name>.json`` and ``<name>.prom`` into ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for suffix, text in (('.json', json.dumps(self.report(), indent=2)), ('.prom', self.prometheus())):
+            path = directory / (name + suffix)
+            tmp_path = path.with_suffix(suffix + '.tmp')
+            tmp_path.write_text(text)
+            os.replace(tmp_path, path)
+
+    def start_snapshots(self, directory: Path, interval: float):
+        """Write the metrics every ``interval`` seconds until ``stop_snapshots``."""
+        self._snapshot_stop = threading.Event()
+
+        def loop():
+            while not self._snapshot_stop.wait(interval):
+                self.write(directory)
+
+        self._snapshot_thread = threading.Thread(target=loop, daemon=True)
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self):
+        if self._snapshot_stop is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_stop = None
+
+    def summary(self) -> str:
+        """One-line human summary for the end of a run."""
+        report = self.report()
+        latency = report['requests']['latency_seconds']
+        courses = report['courses']
+
+        def ms(value):
+            return f"{value * 1000:.0f}ms" if value is not None else "-"
+
+        return (f"{report['requests']['total']} requests "
+                f"(p50 {ms(latency['p50'])}, p95 {ms(latency['p95'])}, p99 {ms(latency['p99'])}), "
+                f"{report['requests']['bytes'] / 1e6:.1f} MB, "
+                f"{courses['ok']} courses at {courses['per_second'] or 0:.1f}/s, "
+                f"prerequisites found for {courses['prerequisites_found']}, missed for "
+                f"{courses['prerequisites_missed']}")
@@ -6,23 +6,77 @@ This script scrapes MIT OCW course pages to extract course information
 and prerequisite relationships, then builds a graph structure.
 """
 
+import argparse
+import itertools
 import json
+import multiprocessing
+import os
+import queue
 import re
 import sys
-from collections import defaultdict
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 try:
     import requests
     from bs4 import BeautifulSoup
+    from requests.adapters import HTTPAdapter
+
+    from crawl_metrics import CrawlMetrics
+    from graph_analytics import analyze_graph, summarize as summarize_analytics
+    from graph_binary import encode_graph
+    from graph_delta import publish_version, stamp_version
+    from graph_layout import layout_graph
+    from graph_shards import write_shards
+    from graph_writer import AtomicWriter, BrotliCodec, GzipCodec, iter_json, replicate
+    from http_archive import ArchiveWriter, HTTPArchive, RecordingAdapter, ReplayAdapter, mount
+    from http_cache import DEFAULT_MAX_BYTES, CachedSession, ResponseCache
+    from ocw_extract import COURSE_ID_PATTERN, PageInfo, extract_page, extract_page_soup
+    from ocw_offerings import POLICIES as OFFERING_POLICIES, select_offerings
+    from sitemap_reader import SitemapReader
 except ImportError:
     print("Error: Missing required packages. Install with:")
-    print("  pip install requests beautifulsoup4")
+    print("  pip install -r requirements.txt")
     sys.exit(1)
 
+try:
+    import brotli
+except ImportError:  # optional; .br copies of the graph are skipped without it
+    brotli = None
+
+# Bump when parsing changes so memoized courses from older runs are ignored
+PARSER_VERSION = "2"
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'ocw-http'
+DEFAULT_MANIFEST_PATH = Path(__file__).parent.parent / 'data' / 'mit-ocw-manifest.json'
+DEFAULT_JOURNAL_PATH = Path(__file__).parent.parent / '.cache' / 'mit-ocw-journal.jsonl'
+DEFAULT_METRICS_DIR = Path(__file__).parent.parent / '.cache' / 'metrics'
+
+# Retry back-off for failed course fetches: RETRY_BACKOFF * 2**attempt seconds
+RETRY_BACKOFF = 1.0
+RESUME_RETRIES = 3
+# URLs that have failed this many times are not retried on --resume
+MAX_ATTEMPTS = 5
+
+# Downloaded courses buffered between the I/O and parse stages
+DEFAULT_QUEUE_SIZE = 64
+
+_DONE = object()
+
+# When to fetch a course's syllabus page:
+#   always    request <course>/pages/syllabus/ for every course
+#   linked    only when the course page links to a syllabus page
+#   adaptive  as linked, and only if the course page has no prerequisite text
+SYLLABUS_POLICIES = ['always', 'linked', 'adaptive']
+PREREQ_HINT = re.compile(rb'prereq|co-?req', re.IGNORECASE)
+HREF_PATTERN = re.compile(rb'href\s*=\s*["\']([^"\'#?]+)', re.IGNORECASE)
+
 
 @dataclass
 class Course:
@@ -44,19 +98,340 @@ class Course:
             self.corequisites = []
 
 
+@dataclass
+class CourseDownload:
+    """Raw pages for one course, handed from the I/O stage to the parse stage."""
+    url: str
+    content: bytes
+    syllabus_content: Optional[bytes] = None
+    memo_key: Optional[str] = None
+    memo: Optional[str] = None  # memoized course JSON when the pages are unchanged
+
+
+class HostThrottle:
+    """Per-host concurrency cap with adaptive back-off.
+
+    Each host gets ``max_per_host`` slots. Latency and error rate are tracked
+    as moving averages; while either is above its threshold the delay before
+    each request to that host doubles (up to ``max_delay``), and it decays
+    again once the host recovers.
+    """
+
+    def __init__(self, max_per_host: int = 4, slow_threshold: float = 5.0,
+                 error_threshold: float = 0.2, max_delay: float = 30.0):
+        self.max_per_host = max_per_host
+        self.slow_threshold = slow_threshold
+        self.error_threshold = error_threshold
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._delay: Dict[str, float] = defaultdict(float)
+        self._latency: Dict[str, float] = defaultdict(float)
+        self._error_rate: Dict[str, float] = defaultdict(float)
+
+    def acquire(self, host: str):
+        """Wait for a free slot on ``host``, then honour its back-off delay."""
+        with self._lock:
+            slot = self._slots.setdefault(host, threading.Semaphore(self.max_per_host))
+            delay = self._delay[host]
+        slot.acquire()
+        if delay:
+            time.sleep(delay)
+
+    def release(self, host: str, latency: float, ok: bool):
+        """Release a slot on ``host`` and update its back-off state."""
+        with self._lock:
+            self._latency[host] = 0.8 * self._latency[host] + 0.2 * latency
+            self._error_rate[host] = 0.8 * self._error_rate[host] + (0.0 if ok else 0.2)
+            struggling = (
+                not ok
+                or self._latency[host] > self.slow_threshold
+                or self._error_rate[host] > self.error_threshold
+            )
+            if struggling:
+                self._delay[host] = min(self.max_delay, max(0.25, self._delay[host] * 2))
+            elif self._delay[host] > 0.01:
+                self._delay[host] /= 2
+            else:
+                self._delay[host] = 0.0
+            slot = self._slots[host]
+        slot.release()
+
+
+class CrawlManifest:
+    """Per-URL record of the last crawl, used for incremental re-crawls.
+
+    Stores each course URL's sitemap ``lastmod`` as last seen together with
+    the course extracted from it, as JSON at ``path``.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+
+    def load(self) -> 'CrawlManifest':
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('courses', {})
+        else:
+            print(f"Ignoring manifest {self.path} with unsupported version {data.get('version')}")
+        return self
+
+    def is_current(self, url: str, lastmod: Optional[str]) -> bool:
+        """True if ``url`` was crawled before and its lastmod is unchanged."""
+        entry = self.entries.get(url)
+        return bool(entry and lastmod and entry.get('lastmod') == lastmod and entry.get('course'))
+
+    def course(self, url: str) -> Optional[Course]:
+        entry = self.entries.get(url)
+        if entry and entry.get('course'):
+            return Course(**entry['course'])
+        return None
+
+    def save(self, urls: List[str], lastmods: Dict[str, str], courses_by_url: Dict[str, Course]):
+        """Replace the manifest with this run's URLs, dropping removed ones."""
+        self.entries = {
+            url: {
+                'lastmod': lastmods.get(url),
+                'course': asdict(courses_by_url[url]) if url in courses_by_url else None,
+            }
+            for url in urls
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.VERSION, 'courses': self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+class CrawlJournal:
+    """Append-only JSONL log of processed course URLs, for resuming crawls.
+
+    Each line records one URL: ``{"url", "status": "discovered"}`` when it
+    is queued, then ``{"url", "status": "ok", "course"}`` on success
+    (``course`` is null for pages that are not courses) or ``{"url",
+    "status": "failed", "error", "attempts"}`` on failure. The last record
+    for a URL wins, but URLs keep the order in which they were first
+    journaled, so a graph rebuilt from the journal resolves duplicate
+    course IDs as the crawl that wrote it did. A torn final line from a
+    crash is ignored when the journal is read back.
+
+    A fresh (non-resuming) crawl never truncates an existing journal: a
+    non-empty one is first rotated aside to ``<name>.1``, replacing the
+    previous rotation, so a rerun that forgot ``--resume`` can still be
+    recovered by moving it back.
+    """
+
+    # Records between fsyncs; every record is flushed as it is written
+    SYNC_EVERY = 50
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        if resume:
+            self.load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and self.path.exists() and self.path.stat().st_size > 0:
+            rotated = self.path.with_name(self.path.name + '.1')
+            os.replace(self.path, rotated)
+            print(f"Previous crawl journal kept as {rotated} (use --resume to continue a crawl)")
+        self._file = open(self.path, 'a' if resume else 'w')
+        if resume and self._file.tell() > 0:
+            # Terminate a torn last line so the next record starts cleanly
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def load(self) -> 'CrawlJournal':
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.records[record['url']] = record
+        except FileNotFoundError:
+            pass
+        return self
+
+    def is_done(self, url: str) -> bool:
+        """True if ``url`` succeeded, or has failed too often to retry."""
+        record = self.records.get(url)
+        if record is None:
+            return False
+        return record['status'] == 'ok' or record.get('attempts', 0) >= MAX_ATTEMPTS
+
+    def course(self, url: str) -> Optional[Course]:
+        record = self.records.get(url)
+        if record and record['status'] == 'ok' and record.get('course'):
+            return Course(**record['course'])
+        return None
+
+    def courses(self) -> Dict[str, Course]:
+        """All journaled courses keyed by URL, in discovery order."""
+        return {
+            url: course
+            for url, course in ((url, self.course(url)) for url in self.records)
+            if course
+        }
+
+    def record_discovered(self, url: str):
+        """Note ``url`` as queued for fetching, fixing its place in discovery order."""
+        if url not in self.records:
+            self._append({'url': url, 'status': 'discovered'})
+
+    def record_success(self, url: str, course: Optional[Course]):
+        self._append({'url': url, 'status': 'ok', 'course': asdict(course) if course else None})
+
+    def record_failure(self, url: str, error: Exception):
+        with self._lock:
+            previous = self.records.get(url, {})
+            attempts = previous.get('attempts', 0) + 1 if previous.get('status') == 'failed' else 1
+        self._append({'url': url, 'status': 'failed', 'error': str(error) or type(error).__name__,
+                      'attempts': attempts})
+
+    def _append(self, record: Dict):
+        with self._lock:
+            record['time'] = time.time()
+            self.records[record['url']] = record
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.SYNC_EVERY:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+
 class MITOCWScraper:
     """Scraper for MIT OpenCourseWare course data."""
 
     BASE_URL = "https://ocw.mit.edu"
     COURSES_URL = "https://ocw.mit.edu/courses/"
+    SITEMAP_URL = "https://ocw.mit.edu/sitemap.xml"
 
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, workers: int = 1, max_per_host: int = 4, cache: Optional[ResponseCache] = None,
+                 parser: str = 'lxml', journal: Optional[CrawlJournal] = None, retries: int = 0,
+                 parse_workers: int = 0, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 offering_policy: str = 'all', keep_offerings: bool = False,
+                 syllabus_policy: str = 'always', shards: bool = False, reduce_edges: bool = False,
+                 layout: bool = False, deltas: bool = True, layout_time_budget: Optional[float] = None):
+        self.workers = max(1, workers)
+        self.deltas = deltas
+        self.shards = shards
+        self.reduce_edges = reduce_edges
+        self.layout = layout
+        self.layout_time_budget = layout_time_budget
+        self.parse_workers = parse_workers
+        self.queue_size = max(1, queue_size)
+        self.syllabus_policy = syllabus_policy
+        # Secondary-page outcomes: fetched / missing / known_missing / has_prereqs / not_linked
+        self.secondary_stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        # Known-missing pages for runs without a response cache
+        self._missing: Set[str] = set()
+        self.offering_policy = offering_policy
+        self.keep_offerings = keep_offerings
+        # Kept course URL -> other offerings of the same course (with keep_offerings)
+        self.offerings: Dict[str, List[str]] = {}
+        self.parser = parser
+        self.cache = cache
+        self.journal = journal
+        self.retries = retries
+        self.session = CachedSession(cache)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; MIT OCW Graph Builder)'
         })
+        # Size the connection pool so concurrent workers reuse sockets
+        mount(self.session, HTTPAdapter(**self.pool_options()))
+        self.throttle = HostThrottle(max_per_host=max_per_host)
+        self.metrics = CrawlMetrics()
         self.courses: Dict[str, Course] = {}
-        self.course_pattern = re.compile(r'(\d{2}\.\d{2,3}[A-Z]?)', re.IGNORECASE)
+        self.sitemap_lastmod: Dict[str, str] = {}
+        self.course_pattern = COURSE_ID_PATTERN
+        # Single-flight table: one shared Future per key for the whole run
+        self._flights: Dict[tuple, Future] = {}
+        self._flights_lock = threading.Lock()
+
+    def pool_options(self) -> Dict[str, int]:
+        """Connection-pool sizing for HTTP adapters mounted on ``self.session``."""
+        return {'pool_connections': 10, 'pool_maxsize': max(10, self.workers)}
+
+    def record_to(self, writer: ArchiveWriter):
+        """Record every response this scraper receives into ``writer``."""
+        writer.meta.update({'sitemap_url': self.SITEMAP_URL, 'courses_url': self.COURSES_URL})
+        mount(self.session, RecordingAdapter(writer, **self.pool_options()))
+
+    def replay_from(self, archive: HTTPArchive, latency: float = 0.0):
+        """Answer every request from a recorded archive instead of the network."""
+        mount(self.session, ReplayAdapter(archive, latency))
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL through the session, respecting the per-host throttle."""
+        host = urlparse(url).netloc
+        self.throttle.acquire(host)
+        start = time.monotonic()
+        ok = False
+        status = 'error'
+        nbytes = 0
+        from_cache = False
+        try:
+            response = self.session.get(url, **kwargs)
+            ok = response.status_code < 500 and response.status_code != 429
+            status = response.status_code
+            from_cache = getattr(response, 'from_cache', False)
+            if kwargs.get('stream'):
+                nbytes = int(response.headers.get('Content-Length') or 0)
+            elif not from_cache:
+                nbytes = len(response.content)
+            return response
+        finally:
+            latency = time.monotonic() - start
+            self.throttle.release(host, latency, ok)
+            self.metrics.record_request(status, latency, nbytes, from_cache)
+
+    def _single_flight(self, key: tuple, fn: Callable):
+        """Run ``fn`` once per ``key`` for this scraper and share its result.
+
+        Concurrent callers with the same key wait for the first one; later
+        callers get the stored result (or exception) without redoing the work.
+        """
+        with self._flights_lock:
+            future = self._flights.get(key)
+            owner = future is None
+            if owner:
+                future = self._flights[key] = Future()
+        if owner:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _page_links(self, url: str) -> List[str]:
+        """Return the ``href`` of every link on a page, fetching and parsing it once per run."""
+        def fetch():
+            response = self._get(url, timeout=30)
+            response.raise_for_status()
+            soup = BeautifulSoup(response.content, 'html.parser')
+            return [link['href'] for link in soup.find_all('a', href=True)]
+        return self._single_flight(('links', url), fetch)
 
     def extract_course_id(self, text: str) -> Optional[str]:
         """Extract course ID from text (e.g., '18.01', '6.042J')."""
@@ -79,71 +454,137 @@ class MITOCWScraper:
         return sorted(list(course_ids))
 
     def fetch_course_list(self) -> List[str]:
-        """Fetch list of course URLs from MIT OCW."""
+        """Fetch list of course URLs from MIT OCW.
+
+        URLs come in discovery order, the order ``stream_course_urls``
+        yields them in: sitemap order, then the courses page, then search.
+        """
         print("Fetching course list from MIT OCW...")
         
-        course_links = set()
+        course_links: Dict[str, None] = {}
         
-        # Try multiple approaches to find courses
+        # Try multiple approaches to find courses, concurrently; the listing
+        # strategies share one fetch of the courses page
         approaches = [
             self._fetch_from_sitemap,
             self._fetch_from_courses_page,
             self._fetch_from_search,
         ]
         
-        for approach in approaches:
-            try:
-                links = approach()
-                course_links.update(links)
-                if len(course_links) > 0:
-                    print(f"  Found {len(links)} courses via {approach.__name__}")
-            except Exception as e:
-                print(f"  {approach.__name__} failed: {e}")
-                continue
+        with ThreadPoolExecutor(max_workers=len(approaches)) as executor:
+            futures = [executor.submit(approach) for approach in approaches]
+            for approach, future in zip(approaches, futures):
+                try:
+                    links = future.result()
+                    # Normalize so the same course from different strategies merges
+                    course_links.update(dict.fromkeys(self.normalize_course_url(url) or url for url in links))
+                    if len(course_links) > 0:
+                        print(f"  Found {len(links)} courses via {approach.__name__}")
+                except Exception as e:
+                    print(f"  {approach.__name__} failed: {e}")
+                    continue
         
-        course_links_list = sorted(list(course_links))
+        course_links_list = list(course_links)
         print(f"Total unique course URLs found: {len(course_links_list)}")
         return course_links_list
     
-    def _fetch_from_sitemap(self) -> List[str]:
-        """Try to fetch from sitemap using regex parsing."""
-        sitemap_urls = [
-            "https://ocw.mit.edu/sitemap.xml",
-        ]
-        
-        course_links = []
-        for sitemap_url in sitemap_urls:
+    def dedupe_offerings(self, urls: List[str]) -> List[str]:
+        """Keep one offering per course id under ``self.offering_policy``.
+
+        Runs on URLs alone, before anything is fetched. With
+        ``keep_offerings`` the dropped offerings are recorded in
+        ``self.offerings`` and exported on the kept course's node.
+        """
+        kept, alternates = select_offerings(urls, self.offering_policy)
+        if self.keep_offerings:
+            self.offerings.update(alternates)
+        if len(kept) < len(urls):
+            print(f"Offerings: keeping {len(kept)} of {len(urls)} course URLs "
+                  f"(policy: {self.offering_policy})")
+        return kept
+
+    def normalize_course_url(self, loc: str) -> Optional[str]:
+        """Map a sitemap ``<loc>`` to its course home URL, or None if it is not a course.
+
+        OCW's sitemap index lists one child sitemap per course
+        (``/courses/<slug>/sitemap.xml``); pages inside a course map to the
+        same home URL.
+        """
+        parsed = urlparse(loc)
+        parts = [p for p in parsed.path.split('/') if p]
+        if len(parts) < 2 or parts[0] != 'courses':
+            return None
+        course_path = parts[1]
+        # Check if it matches course pattern (has numbers like 18-01 or 6.042)
+        # And has more than just numbers (has title)
+        if not re.search(r'\d+[-.]\d+', course_path) or len(course_path.split('-')) < 3:
+            return None
+        return f"{parsed.scheme}://{parsed.netloc}/courses/{course_path}"
+
+    def iter_sitemap_courses(self) -> Iterator[str]:
+        """Yield course URLs from the sitemap tree as they are read.
+
+        Child sitemaps that belong to a single course are not fetched: their
+        ``<loc>`` already names the course, and their ``<lastmod>`` is
+        recorded in ``self.sitemap_lastmod``. Other child sitemaps (shards
+        of a large index) are followed concurrently.
+        """
+        reader = SitemapReader(
+            self._get,
+            workers=max(4, self.workers),
+            follow=lambda loc: self.normalize_course_url(loc) is None,
+        )
+        seen: Set[str] = set()
+        for entry in reader.iter_entries(self.SITEMAP_URL):
+            url = self.normalize_course_url(entry.loc)
+            if url is None:
+                continue
+            if entry.lastmod and entry.lastmod > self.sitemap_lastmod.get(url, ''):
+                self.sitemap_lastmod[url] = entry.lastmod
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+    def stream_course_urls(self) -> Iterator[str]:
+        """Yield course URLs lazily, sitemap first, then the listing pages.
+
+        Unlike ``fetch_course_list`` this lets fetching start before the
+        whole sitemap tree has been read. URLs come in sitemap order.
+        """
+        print("Streaming course list from MIT OCW...")
+        seen: Set[str] = set()
+        # The listing strategies run in the background while the sitemap streams
+        executor = ThreadPoolExecutor(max_workers=2)
+        listings = [executor.submit(approach) for approach in (self._fetch_from_courses_page, self._fetch_from_search)]
+        try:
             try:
-                print(f"    Fetching sitemap: {sitemap_url}")
-                response = self.session.get(sitemap_url, timeout=60)
-                if response.status_code == 200:
-                    # Parse sitemap using regex (more reliable than XML parsing)
-                    content = response.text
-                    # Find all URLs in the sitemap
-                    urls = re.findall(r'https://ocw\.mit\.edu/courses/[^\s<>\"]+', content)
-                    
-                    for url in urls:
-                        # Remove /sitemap.xml suffix if present and normalize
-                        url = url.replace('/sitemap.xml', '').rstrip('/')
-                        
-                        # MIT OCW course URLs: https://ocw.mit.edu/courses/SUBJECT-NUMBER-title-semester-year/
-                        if '/courses/' in url:
-                            # Extract course path
-                            parts = url.split('/courses/')
-                            if len(parts) > 1:
-                                course_path = parts[1]
-                                # Check if it matches course pattern (has numbers like 18-01 or 6.042)
-                                # And has more than just numbers (has title)
-                                if re.search(r'\d+[-.]\d+', course_path) and len(course_path.split('-')) >= 3:
-                                    # Make sure it's a full course URL, not a partial one
-                                    if url.count('/') >= 4:  # Full course URLs have more path segments
-                                        course_links.append(url)
-                    
-                    print(f"    Found {len(course_links)} course URLs in sitemap")
+                for url in self.iter_sitemap_courses():
+                    seen.add(url)
+                    yield url
             except Exception as e:
                 print(f"    Sitemap error: {e}")
-                continue
-        
+            for future in listings:
+                try:
+                    links = future.result()
+                except Exception as e:
+                    print(f"  Listing strategy failed: {e}")
+                    continue
+                for url in links:
+                    url = self.normalize_course_url(url) or url
+                    if url not in seen:
+                        seen.add(url)
+                        yield url
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_from_sitemap(self) -> List[str]:
+        """Collect course URLs from the sitemap tree."""
+        course_links = []
+        try:
+            course_links = list(self.iter_sitemap_courses())
+            print(f"    Found {len(course_links)} course URLs in sitemap")
+        except Exception as e:
+            print(f"    Sitemap error: {e}")
         return course_links
     
     def _fetch_from_courses_page(self) -> List[str]:
@@ -151,14 +592,9 @@ class MITOCWScraper:
         course_links = []
         
         try:
-            response = self.session.get(self.COURSES_URL, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
             # MIT OCW course URLs follow pattern: /courses/SUBJECT-NUMBER-course-title/
             # Look for all links that match this pattern
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+            for href in self._page_links(self.COURSES_URL):
                 # Course URLs have format like: /courses/18-01-single-variable-calculus-fall-2006/
                 if '/courses/' in href:
                     # Extract the path after /courses/
@@ -183,206 +619,504 @@ class MITOCWScraper:
         
         # Try to get courses from the browse page which lists all courses
         try:
-            # MIT OCW has a courses listing page
-            browse_url = "https://ocw.mit.edu/courses/"
+            # MIT OCW has a courses listing page (the same one _fetch_from_courses_page reads)
+            browse_url = self.COURSES_URL
             print(f"  Fetching from browse page: {browse_url}")
-            response = self.session.get(browse_url, timeout=30)
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for course links - they're typically in lists or cards
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    # MIT OCW course URLs: /courses/SUBJECT-NUMBER-title-semester-year/
-                    if '/courses/' in href and href != '/courses/':
-                        # Check if it's a full course URL (has numbers and title)
-                        if re.search(r'\d+[-.]\d+', href) and href.count('-') >= 3:
-                            full_url = urljoin(self.BASE_URL, href)
-                            # Make sure it's a complete URL, not a partial one
-                            if full_url.count('/') >= 5:  # Full course URLs have more path segments
-                                course_links.append(full_url)
+            # Look for course links - they're typically in lists or cards
+            for href in self._page_links(browse_url):
+                # MIT OCW course URLs: /courses/SUBJECT-NUMBER-title-semester-year/
+                if '/courses/' in href and href != '/courses/':
+                    # Check if it's a full course URL (has numbers and title)
+                    if re.search(r'\d+[-.]\d+', href) and href.count('-') >= 3:
+                        full_url = urljoin(self.BASE_URL, href)
+                        # Make sure it's a complete URL, not a partial one
+                        if full_url.count('/') >= 5:  # Full course URLs have more path segments
+                            course_links.append(full_url)
         except Exception as e:
             print(f"  Error fetching from browse: {e}")
         
         return course_links
 
     def fetch_course_page(self, url: str) -> Optional[Course]:
-        """Fetch and parse a single course page."""
+        """Fetch and parse a single course page.
+
+        Transient failures (connection errors, timeouts, 429 and 5xx) are
+        retried up to ``self.retries`` times with exponential back-off. The
+        outcome is appended to ``self.journal`` when there is one.
+        """
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Also try to fetch syllabus page for prerequisites
-            syllabus_url = url.rstrip('/') + '/pages/syllabus/'
-            syllabus_soup = None
+            course = self._retrying(self._fetch_course_page, url)
+        except Exception as e:
+            self._record_failure(url, e)
+            return None
+        self._record_success(url, course)
+        return course
+
+    def _retrying(self, fn: Callable, url: str):
+        """Call ``fn(url)``, retrying transient errors with exponential back-off."""
+        for attempt in itertools.count():
+            try:
+                return fn(url)
+            except Exception as e:
+                if attempt < self.retries and self._is_transient(e):
+                    time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                    continue
+                raise
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+    def _record_success(self, url: str, course: Optional[Course]):
+        self.metrics.record_course(course)
+        if self.journal:
+            self.journal.record_success(url, course)
+
+    def _record_failure(self, url: str, error: Exception):
+        print(f"Error fetching course {url}: {error}")
+        self.metrics.record_failure()
+        if self.journal:
+            self.journal.record_failure(url, error)
+
+    def _fetch_course_page(self, url: str) -> Optional[Course]:
+        """Fetch and parse a single course page, raising on fetch errors."""
+        download = self.download_course(url)
+        if download.memo is not None:
+            return self._course_from_memo(download.memo)
+        course = self.parse_course_page(url, download.content, download.syllabus_content)
+        self._store_memo(download, course)
+        return course
+
+    def download_course(self, url: str) -> CourseDownload:
+        """Download a course's pages without parsing them, raising on fetch errors.
+
+        When the response cache has a parsed course for these exact page
+        bodies, it is attached as ``memo`` so parsing can be skipped.
+        """
+        response = self._get(url, timeout=30)
+        response.raise_for_status()
+        
+        # Also try to fetch syllabus page for prerequisites
+        syllabus_response = None
+        syllabus_url = self._syllabus_url(url, response.content)
+        if syllabus_url:
             try:
-                syllabus_response = self.session.get(syllabus_url, timeout=30)
-                if syllabus_response.status_code == 200:
-                    syllabus_soup = BeautifulSoup(syllabus_response.content, 'html.parser')
+                syllabus_response = self._get_secondary(syllabus_url)
             except:
                 pass  # Syllabus page might not exist
-            
-            # Extract course ID from URL or page content
-            course_id = None
-            title = None
-            description = None
-            prerequisites = []
-            corequisites = []
-            department = None
-            level = None
-            
-            # Try to find course ID in the page
-            page_text = soup.get_text()
-            
-            # Look for course ID in title or headings
-            title_elem = soup.find('h1') or soup.find('title')
-            if title_elem:
-                title_text = title_elem.get_text()
-                course_id = self.extract_course_id(title_text)
-                if not title:
-                    # Extract title (before the | separator)
-                    if '|' in title_text:
-                        title = title_text.split('|')[0].strip()
-                        # Extract subject/topic (middle part of "Title | Subject | MIT OCW")
-                        parts = [p.strip() for p in title_text.split('|')]
-                        if len(parts) >= 2:
-                            department = parts[1]  # Subject is usually the second part
-                    else:
-                        title = title_text.strip()
-            
-            # Look for prerequisites in multiple ways
-            prerequisites = []
-            corequisites = []
-            
-            # Combine main page and syllabus page for parsing
-            pages_to_check = [soup]
-            if syllabus_soup:
-                pages_to_check.append(syllabus_soup)
-            
-            for page_soup in pages_to_check:
-                # Method 1: Look for prerequisite text in various elements
-                for elem in page_soup.find_all(['p', 'div', 'li', 'td', 'th', 'span', 'strong', 'em']):
-                    text = elem.get_text()
-                    if re.search(r'\bprerequisite', text, re.I):
-                        # Get surrounding context
-                        parent = elem.find_parent(['div', 'section', 'article', 'td'])
-                        if parent:
-                            prereq_text = parent.get_text()
-                            found = self.parse_prerequisites(prereq_text)
-                            prerequisites.extend(found)
-                
-                # Method 2: Look for "Prerequisites:" label followed by course numbers
-                for label in page_soup.find_all(string=re.compile(r'prerequisite[s]?:', re.I)):
-                    parent = label.find_parent()
-                    if parent:
-                        # Get next sibling or parent text
-                        prereq_text = parent.get_text()
-                        found = self.parse_prerequisites(prereq_text)
-                        prerequisites.extend(found)
-                
-                # Method 3: Look in course info/syllabus sections
-                for section in page_soup.find_all(['section', 'div'], class_=re.compile(r'course|syllabus|info', re.I)):
-                    text = section.get_text()
-                    if 'prerequisite' in text.lower():
-                        found = self.parse_prerequisites(text)
-                        prerequisites.extend(found)
-                
-                # Method 4: Look for course numbers near prerequisite keywords in the full page
-                page_text = page_soup.get_text()
-                # Find sections with prerequisite mentions
-                for match in re.finditer(r'prerequisite[s]?[:\s]+([^\.\n]+)', page_text, re.I):
-                    prereq_section = match.group(1)
-                    found = self.parse_prerequisites(prereq_section)
-                    prerequisites.extend(found)
-                
-                # Look for corequisites
-                for elem in page_soup.find_all(['p', 'div', 'li', 'td', 'th']):
-                    text = elem.get_text()
-                    if re.search(r'\bcorequisite', text, re.I):
-                        parent = elem.find_parent(['div', 'section', 'article'])
-                        if parent:
-                            coreq_text = parent.get_text()
-                            found = self.parse_prerequisites(coreq_text)
-                            corequisites.extend(found)
-            
-            # Remove duplicates and normalize
-            prerequisites = sorted(list(set(prerequisites)))
-            corequisites = sorted(list(set(corequisites)))
-            
-            # Remove self-references (course shouldn't be its own prerequisite)
-            if course_id:
-                prerequisites = [p for p in prerequisites if p != course_id]
-                corequisites = [c for c in corequisites if c != course_id]
-            
-            # Extract description
-            desc_elem = soup.find('meta', {'name': 'description'})
-            if desc_elem:
-                description = desc_elem.get('content', '').strip()
-            
-            # Try to determine level (Undergraduate/Graduate)
-            # Check page text for level indicators
-            page_text_lower = page_text.lower()
-            if not level:
-                if any(word in page_text_lower for word in ['graduate', 'graduate-level', 'grad']):
+        
+        download = CourseDownload(url, response.content,
+                                  syllabus_response.content if syllabus_response else None)
+        # Pages whose bodies are unchanged since the last run don't need re-parsing
+        if self.cache is not None:
+            download.memo_key = self.cache.memo_key(
+                PARSER_VERSION, self.parser, url, response.content_digest,
+                syllabus_response.content_digest if syllabus_response else None,
+            )
+            download.memo = self.cache.get_memo(download.memo_key)
+        return download
+
+    def _syllabus_url(self, url: str, content: bytes) -> Optional[str]:
+        """Decide from the course page whether (and where) to fetch its syllabus."""
+        if self.syllabus_policy == 'always':
+            return url.rstrip('/') + '/pages/syllabus/'
+        if self.syllabus_policy == 'adaptive' and PREREQ_HINT.search(content):
+            self._count('has_prereqs')
+            return None
+        linked = self._linked_page(url, content, 'syllabus')
+        if linked is None:
+            self._count('not_linked')
+        return linked
+
+    @staticmethod
+    def _linked_page(url: str, content: bytes, name: str) -> Optional[str]:
+        """Find a link from a course page to one of its ``/pages/<name>...`` pages."""
+        base = url.rstrip('/') + '/'
+        for match in HREF_PATTERN.finditer(content):
+            href = urljoin(base, match.group(1).decode('utf-8', 'replace').strip())
+            if not href.startswith(base + 'pages/'):
+                continue
+            page = href[len(base + 'pages/'):].strip('/')
+            if page.split('/')[0].startswith(name):
+                return href
+        return None
+
+    def _get_secondary(self, url: str) -> Optional[requests.Response]:
+        """GET a secondary course page, skipping and remembering missing ones."""
+        if url in self._missing or (self.cache is not None and self.cache.is_missing(url)):
+            self._count('known_missing')
+            return None
+        response = self._get(url, timeout=30)
+        if response.status_code in (404, 410):
+            self._count('missing')
+            self._missing.add(url)
+            if self.cache is not None:
+                self.cache.mark_missing(url, response.status_code)
+            return None
+        if response.status_code != 200:
+            return None
+        self._count('fetched')
+        return response
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.secondary_stats[outcome] += 1
+
+    @staticmethod
+    def _course_from_memo(memo: str) -> Optional[Course]:
+        data = json.loads(memo)
+        return Course(**data) if data else None
+
+    def _store_memo(self, download: CourseDownload, course: Optional[Course]):
+        if download.memo_key:
+            self.cache.put_memo(download.memo_key, json.dumps(asdict(course) if course else None))
+
+    def parse_course_page(self, url: str, content: bytes, syllabus_content: Optional[bytes] = None) -> Optional[Course]:
+        """Parse a course page (and its syllabus page, if any) into a Course."""
+        start = time.perf_counter()
+        course = self._parse_pages(url, content, syllabus_content)
+        self.metrics.record_parse(time.perf_counter() - start, 1 + (syllabus_content is not None))
+        return course
+
+    def _parse_pages(self, url: str, content: bytes, syllabus_content: Optional[bytes] = None) -> Optional[Course]:
+        extract = extract_page_soup if self.parser == 'soup' else extract_page
+        pages = [extract(content)]
+        if syllabus_content is not None:
+            pages.append(extract(syllabus_content))
+        return self.course_from_pages(url, pages)
+
+    def course_from_pages(self, url: str, pages: List[PageInfo]) -> Optional[Course]:
+        """Combine fields extracted from a course's pages into a Course.
+
+        ``pages[0]`` is the course home page; any further pages (the
+        syllabus) only contribute prerequisites, corequisites and level.
+        """
+        course_id = None
+        title = None
+        department = None
+        level = None
+        main_page = pages[0]
+        
+        # Look for course ID in title or headings
+        if main_page.title_text is not None:
+            title_text = main_page.title_text
+            course_id = self.extract_course_id(title_text)
+            # Extract title (before the | separator)
+            if '|' in title_text:
+                title = title_text.split('|')[0].strip()
+                # Extract subject/topic (middle part of "Title | Subject | MIT OCW")
+                parts = [p.strip() for p in title_text.split('|')]
+                if len(parts) >= 2:
+                    department = parts[1]  # Subject is usually the second part
+            else:
+                title = title_text.strip()
+        
+        # Remove duplicates and normalize
+        prerequisites = sorted(set().union(*(page.prerequisites for page in pages)))
+        corequisites = sorted(set().union(*(page.corequisites for page in pages)))
+        
+        # Remove self-references (course shouldn't be its own prerequisite)
+        if course_id:
+            prerequisites = [p for p in prerequisites if p != course_id]
+            corequisites = [c for c in corequisites if c != course_id]
+        
+        description = main_page.description
+        
+        # Try to determine level (Undergraduate/Graduate) from the text of
+        # the last page checked, falling back to the course number
+        level = pages[-1].level_hint
+        if not level and course_id:
+            # MIT course numbers: 1xx-6xx are typically undergraduate, 7xx+ are graduate
+            course_num_match = re.search(r'\.(\d+)', course_id)
+            if course_num_match:
+                course_num = int(course_num_match.group(1))
+                if course_num >= 700:
                     level = 'Graduate'
-                elif any(word in page_text_lower for word in ['undergraduate', 'undergrad', 'freshman', 'sophomore', 'junior', 'senior']):
+                elif course_num < 100:
                     level = 'Undergraduate'
-                # MIT course numbers: 1xx-6xx are typically undergraduate, 7xx+ are graduate
-                elif course_id:
-                    course_num_match = re.search(r'\.(\d+)', course_id)
-                    if course_num_match:
-                        course_num = int(course_num_match.group(1))
-                        if course_num >= 700:
-                            level = 'Graduate'
-                        elif course_num < 100:
-                            level = 'Undergraduate'
-                        else:
-                            level = 'Undergraduate'  # Default
-            
-            if not course_id:
-                # Try to extract from URL - MIT OCW URLs are like: /courses/18-01-single-variable-calculus-fall-2006/
-                url_parts = url.rstrip('/').split('/')
-                if url_parts:
-                    last_part = url_parts[-1]
-                    # Extract course number from URL (e.g., "18-01" from "18-01-single-variable-calculus-fall-2006")
-                    match = re.search(r'(\d+[-.]\d+)', last_part)
-                    if match:
-                        course_id = match.group(1).replace('-', '.').upper()
-                    else:
-                        # Try alternative pattern
-                        course_id = self.extract_course_id(last_part)
-            
-            if not course_id:
-                # Last resort: try to find any course number pattern in the URL
-                match = re.search(r'/(\d+[-.]\d+)-', url)
+                else:
+                    level = 'Undergraduate'  # Default
+        
+        if not course_id:
+            # Try to extract from URL - MIT OCW URLs are like: /courses/18-01-single-variable-calculus-fall-2006/
+            url_parts = url.rstrip('/').split('/')
+            if url_parts:
+                last_part = url_parts[-1]
+                # Extract course number from URL (e.g., "18-01" from "18-01-single-variable-calculus-fall-2006")
+                match = re.search(r'(\d+[-.]\d+)', last_part)
                 if match:
                     course_id = match.group(1).replace('-', '.').upper()
-            
-            if not course_id:
-                return None
-            
-            course = Course(
-                course_id=course_id,
-                title=title or f"Course {course_id}",
-                url=url,
-                department=department,
-                level=level,
-                description=description,
-                prerequisites=prerequisites,
-                corequisites=corequisites,
-                ocw_published=True
-            )
-            
-            return course
-            
-        except Exception as e:
-            print(f"Error fetching course {url}: {e}")
+                else:
+                    # Try alternative pattern
+                    course_id = self.extract_course_id(last_part)
+        
+        if not course_id:
+            # Last resort: try to find any course number pattern in the URL
+            match = re.search(r'/(\d+[-.]\d+)-', url)
+            if match:
+                course_id = match.group(1).replace('-', '.').upper()
+        
+        if not course_id:
             return None
+        
+        course = Course(
+            course_id=course_id,
+            title=title or f"Course {course_id}",
+            url=url,
+            department=department,
+            level=level,
+            description=description,
+            prerequisites=prerequisites,
+            corequisites=corequisites,
+            ocw_published=True
+        )
+        
+        return course
+
+    def iter_courses(self, urls: Iterable[str], workers: Optional[int] = None) -> Iterator[Course]:
+        """Fetch course pages concurrently, yielding courses as they finish.
+
+        At most ``2 * workers`` URLs are in flight at once, so ``urls`` may be
+        a lazy iterator. Completion order is not the order of ``urls``.
+        """
+        for course in self._map_concurrently(self.fetch_course_page, urls, workers or self.workers):
+            if course:
+                yield course
+
+    @staticmethod
+    def _map_concurrently(fn: Callable, items: Iterable, workers: int) -> Iterator:
+        """Apply ``fn`` on a thread pool, yielding results in completion order.
+
+        At most ``2 * workers`` items are in flight, so ``items`` may be lazy.
+        """
+        item_iter = iter(items)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending = {
+                executor.submit(fn, item)
+                for item in itertools.islice(item_iter, workers * 2)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for item in itertools.islice(item_iter, len(done)):
+                    pending.add(executor.submit(fn, item))
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_courses_pipeline(self, urls: Iterable[str], io_workers: Optional[int] = None,
+                              parse_workers: Optional[int] = None,
+                              queue_size: Optional[int] = None) -> Iterator[Course]:
+        """Fetch course pages in a staged pipeline, yielding courses as they finish.
+
+        1. ``io_workers`` threads download raw pages (``download_course``)
+           into a bounded queue of ``queue_size`` items.
+        2. A dispatcher thread hands them to a ``ProcessPoolExecutor`` with
+           ``parse_workers`` processes, with at most ``queue_size`` parses in
+           flight.
+        3. This generator is the single collector: it stores memos, writes
+           the journal and yields courses.
+
+        Parsing runs outside the GIL, so throughput scales with cores while
+        the network side keeps downloading.
+        """
+        io_workers = io_workers or self.workers
+        parse_workers = parse_workers or self.parse_workers or os.cpu_count() or 1
+        queue_size = queue_size or self.queue_size
+        downloads: queue.Queue = queue.Queue(maxsize=queue_size)
+        results: queue.Queue = queue.Queue()
+        parse_slots = threading.Semaphore(queue_size)
+        stop = threading.Event()
+        # Spawn rather than fork: the I/O threads are already running when
+        # worker processes start
+        pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn'))
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    downloads.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def download(url):
+            try:
+                return url, self._retrying(self.download_course, url), None
+            except Exception as e:
+                return url, None, e
+
+        def produce():
+            try:
+                for item in self._map_concurrently(download, urls, io_workers):
+                    if not put(item):
+                        return
+            except Exception as e:
+                # The URL source itself failed; the collector re-raises it
+                put((None, None, e))
+            finally:
+                put(_DONE)
+
+        def dispatch():
+            try:
+                while not stop.is_set():
+                    try:
+                        item = downloads.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is _DONE:
+                        break
+                    url, download, error = item
+                    if error is not None or download.memo is not None:
+                        results.put((item, None))
+                        continue
+                    while not parse_slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    try:
+                        future = pool.submit(_parse_in_worker, self.parser, url,
+                                             download.content, download.syllabus_content)
+                    except Exception as e:
+                        # e.g. BrokenProcessPool: fail this course, keep draining
+                        parse_slots.release()
+                        results.put(((url, download, e), None))
+                        continue
+
+                    def done(f, item=item):
+                        results.put((item, f))
+                        parse_slots.release()
+
+                    future.add_done_callback(done)
+                # Every slot back means every parse has reported its result
+                for _ in range(queue_size):
+                    while not parse_slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+            finally:
+                results.put(_DONE)
+
+        threads = [threading.Thread(target=produce, daemon=True), threading.Thread(target=dispatch, daemon=True)]
+        for thread in threads:
+            thread.start()
+        try:
+            for (url, download, error), future in iter(results.get, _DONE):
+                if url is None:
+                    raise error
+                course = None
+                if error is None and future is not None:
+                    try:
+                        course, seconds = future.result()
+                    except Exception as e:
+                        error = e
+                    else:
+                        self.metrics.record_parse(seconds, 1 + (download.syllabus_content is not None))
+                        self._store_memo(download, course)
+                elif error is None:
+                    course = self._course_from_memo(download.memo)
+                if error is not None:
+                    self._record_failure(url, error)
+                    continue
+                self._record_success(url, course)
+                if course:
+                    yield course
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def fetch_courses(self, urls: Iterable[str]) -> Dict[str, Course]:
+        """Fetch the given course URLs into ``self.courses``.
+
+        ``urls`` may be a lazy iterator (such as ``stream_course_urls``);
+        fetching starts as soon as the first URL arrives. Returns the fetched
+        courses keyed by URL.
+        """
+        consumed: List[str] = []
+
+        def record(url_iter):
+            for url in url_iter:
+                consumed.append(url)
+                yield url
+
+        fetched = self._fetch_by_url(record(urls), total=len(urls) if isinstance(urls, list) else None)
+        self._add_courses_in_order(consumed, fetched)
+        return fetched
+
+    def _fetch_by_url(self, urls: Iterable[str], total: Optional[int] = None) -> Dict[str, Course]:
+        """Fetch course pages, serially or concurrently, keyed by URL.
+
+        When resuming from a journal, URLs it already has an outcome for are
+        not fetched again; their journaled courses are returned instead.
+        """
+        fetched: Dict[str, Course] = {}
+        if self.journal is not None:
+            if self.journal.records:
+                urls = self._skip_journaled(urls, fetched)
+            urls = self._journal_discovered(urls)
+        if self.parse_workers > 0:
+            courses = self.iter_courses_pipeline(urls)
+        elif self.workers > 1:
+            courses = self.iter_courses(urls)
+        else:
+            courses = (self.fetch_course_page(url) for url in urls)
+        for i, course in enumerate(courses, 1):
+            if i % 10 == 0:
+                if total is None:
+                    print(f"  Progress: {i} courses processed...")
+                else:
+                    print(f"  Progress: {i}/{total} courses processed...")
+            if course:
+                fetched[course.url] = course
+        return fetched
 
-    def build_graph(self) -> Dict:
-        """Build graph structure from collected courses."""
+    def _skip_journaled(self, urls: Iterable[str], fetched: Dict[str, Course]) -> Iterator[str]:
+        """Yield URLs the journal has no final outcome for; collect the rest into ``fetched``."""
+        resumed = 0
+        for url in urls:
+            if self.journal.is_done(url):
+                resumed += 1
+                course = self.journal.course(url)
+                if course:
+                    fetched[url] = course
+            else:
+                yield url
+        print(f"  Resumed {resumed} URLs from journal {self.journal.path}")
+
+    def _journal_discovered(self, urls: Iterable[str]) -> Iterator[str]:
+        for url in urls:
+            self.journal.record_discovered(url)
+            yield url
+
+    def _add_courses_in_order(self, urls: List[str], courses_by_url: Dict[str, Course]):
+        """Add courses to ``self.courses`` in discovery order.
+
+        Several offerings can map to the same course ID; walking the URLs in
+        the order they were discovered means later offerings overwrite
+        earlier ones no matter in what order the fetches finished. Streaming,
+        ``--incremental`` and ``--from-journal`` runs all use this order, as
+        does ``--max-courses`` to pick its courses.
+        """
+        for url in urls:
+            course = courses_by_url.get(url)
+            if course:
+                self.courses[course.course_id] = course
+
+    def build_graph(self, journal: Optional[CrawlJournal] = None) -> Dict:
+        """Build graph structure from collected courses.
+
+        With a ``journal``, ``self.courses`` is first rebuilt from the
+        journaled courses alone (in discovery order), without fetching anything.
+        """
+        if journal is not None:
+            courses_by_url = journal.courses()
+            self.courses = {}
+            self._add_courses_in_order(list(courses_by_url), courses_by_url)
         nodes = []
         edges = []
         
@@ -397,6 +1131,8 @@ class MITOCWScraper:
                 'level': course.level,
                 'description': course.description,
             })
+            if course.url in self.offerings:
+                nodes[-1]['offerings'] = self.offerings[course.url]
         
         # Create edges for prerequisites
         for course_id, course in self.courses.items():
@@ -430,49 +1166,171 @@ class MITOCWScraper:
             }
         }
 
-    def run(self, max_courses: int = None):
-        """Main execution: fetch courses and build graph."""
+    def fetch_courses_incremental(self, urls: List[str], manifest: CrawlManifest) -> Dict[str, Course]:
+        """Fetch only new or changed course URLs, reusing the rest from ``manifest``.
+
+        A URL is reused when the manifest has a course for it and its sitemap
+        lastmod is unchanged; URLs without a known lastmod are always fetched.
+        URLs no longer discovered are dropped when the manifest is saved.
+        """
+        courses_by_url: Dict[str, Course] = {}
+        changed = []
+        for url in urls:
+            if manifest.is_current(url, self.sitemap_lastmod.get(url)):
+                courses_by_url[url] = manifest.course(url)
+            else:
+                changed.append(url)
+        removed = len(set(manifest.entries) - set(urls))
+        print(f"Incremental crawl: {len(courses_by_url)} unchanged, {len(changed)} new or changed, "
+              f"{removed} removed")
+        
+        courses_by_url.update(self._fetch_by_url(changed, total=len(changed)))
+        self._add_courses_in_order(urls, courses_by_url)
+        manifest.save(urls, self.sitemap_lastmod, courses_by_url)
+        return courses_by_url
+
+    def run(self, max_courses: int = None, manifest: Optional[CrawlManifest] = None):
+        """Main execution: fetch courses and build graph.
+
+        Without a manifest, course URLs stream from the sitemap into the
+        fetch stage as they are discovered. With a ``manifest`` only courses
+        whose sitemap lastmod changed since the previous run are fetched, and
+        the rest are merged in from it.
+        """
         print("Starting MIT OCW course graph builder...")
         
-        # Fetch course list
-        course_urls = self.fetch_course_list()
+        if manifest is not None:
+            # Incremental runs need the full URL list to spot removed courses
+            with self.metrics.phase('discovery'):
+                course_urls = self.dedupe_offerings(self.fetch_course_list())
+            if course_urls:
+                urls = course_urls[:max_courses] if max_courses else course_urls
+                print(f"\nFetching {len(urls)} courses...")
+                with self.metrics.phase('fetch'):
+                    self.fetch_courses_incremental(urls, manifest)
+        else:
+            # Stream discovery straight into the fetch stage, unless offerings
+            # are deduplicated: that needs every offering of a course first
+            # (the discovery phase then only covers time to the first URL)
+            with self.metrics.phase('discovery'):
+                stream = self.stream_course_urls()
+                if self.offering_policy != 'all':
+                    stream = iter(self.dedupe_offerings(list(stream)))
+                if max_courses:
+                    stream = itertools.islice(stream, max_courses)
+                first = next(stream, None)
+            course_urls = [first] if first else []
+            if first:
+                print(f"\nFetching courses as they are discovered (limit: {max_courses or 'none'})...")
+                with self.metrics.phase('fetch'):
+                    self.fetch_courses(itertools.chain([first], stream))
+        
+        if self.secondary_stats:
+            print("Syllabus pages: " + ", ".join(
+                f"{outcome.replace('_', ' ')} {count}" for outcome, count in sorted(self.secondary_stats.items())
+            ))
         
         if not course_urls:
             print("No courses found. Using sample data for testing...")
             self._add_sample_courses()
-        else:
-            # Fetch individual courses
-            total_courses = len(course_urls) if max_courses is None else min(max_courses, len(course_urls))
-            print(f"\nFetching {total_courses} courses...")
-            
-            for i, url in enumerate(course_urls[:total_courses] if max_courses else course_urls, 1):
-                if i % 10 == 0:
-                    print(f"  Progress: {i}/{total_courses} courses processed...")
-                course = self.fetch_course_page(url)
-                if course:
-                    self.courses[course.course_id] = course
         
         # Build graph
         print("\nBuilding graph structure...")
-        graph = self.build_graph()
+        with self.metrics.phase('build'):
+            graph = self.build_graph()
+        with self.metrics.phase('analyze'):
+            self.annotate_graph(graph)
+        if self.layout:
+            with self.metrics.phase('layout'):
+                self.layout_graph(graph)
         
-        # Save to JSON (save to both data/ and public/data/ for flexibility)
-        output_paths = [
-            Path(__file__).parent.parent / 'public' / 'data' / 'mit-ocw-graph.json',
-            Path(__file__).parent.parent / 'data' / 'mit-ocw-graph.json',
-        ]
-        
-        for output_path in output_paths:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w') as f:
-                json.dump(graph, f, indent=2)
-            print(f"Graph saved to: {output_path}")
+        with self.metrics.phase('save'):
+            self.save_graph(graph)
         
         print(f"\n  Nodes: {len(graph['nodes'])}")
         print(f"  Edges: {len(graph['edges'])}")
         
         return graph
 
+    def annotate_graph(self, graph: Dict) -> Dict:
+        """Check the graph for cycles and annotate depth and degrees (see graph_analytics.py).
+
+        With ``reduce_edges``, redundant prerequisite edges are dropped.
+        """
+        report = analyze_graph(graph, reduce=self.reduce_edges)
+        print(f"Graph analytics: {summarize_analytics(report)}")
+        for cycle in report['cycles']:
+            print(f"  Prerequisite cycle: {' <-> '.join(cycle)}")
+        return report
+
+    def layout_graph(self, graph: Dict) -> Dict:
+        """Store a precomputed layered layout in the graph (see graph_layout.py)."""
+        summary = layout_graph(graph, time_budget=self.layout_time_budget)
+        print(f"Layout: {summary['layers']} layers, {summary['width']:.0f}x{summary['height']:.0f}, "
+              f"{summary['crossings']} edge crossings")
+        return summary
+
+    def save_graph(self, graph: Dict):
+        """Write the graph to public/data/ and data/.
+
+        Besides ``mit-ocw-graph.json`` this writes precompressed
+        ``.json.gz``/``.json.br`` copies for static hosting and the compact
+        binary encoding ``mit-ocw-graph.bin`` (see graph_binary.py). With
+        ``shards``, per-department shards and their manifest are written to
+        ``public/data/mit-ocw-shards/`` (see graph_shards.py). With
+        ``deltas``, a changed graph gets the next version number and a delta
+        against the previous build in ``public/data/mit-ocw-deltas/`` (see
+        graph_delta.py).
+
+        The JSON is serialized once and streamed into the plain and
+        compressed files together. Every file is replaced atomically, and
+        left untouched when its content has not changed. The second
+        location gets hardlinks (or copies) of the first.
+        """
+        # Save to both data/ and public/data/ for flexibility
+        primary, *mirrors = [
+            Path(__file__).parent.parent / 'public' / 'data' / 'mit-ocw-graph.json',
+            Path(__file__).parent.parent / 'data' / 'mit-ocw-graph.json',
+        ]
+        # Read the previous graph now; its delta is published only after the new files are committed
+        version_update = stamp_version(graph, primary) if self.deltas else None
+        codecs = {'.json': None, '.json.gz': GzipCodec()}
+        if brotli is not None:
+            codecs['.json.br'] = BrotliCodec()
+        writers = {suffix: AtomicWriter(primary.with_name(primary.stem + suffix), codec)
+                   for suffix, codec in codecs.items()}
+        writers['.bin'] = AtomicWriter(primary.with_name(primary.stem + '.bin'))
+        try:
+            for chunk in iter_json(graph):
+                data = chunk.encode('utf-8')
+                for suffix, writer in writers.items():
+                    if suffix != '.bin':
+                        writer.write(data)
+            writers['.bin'].write(encode_graph(graph))
+        except BaseException:
+            for writer in writers.values():
+                writer.abort()
+            raise
+        changed = {suffix: writer.commit() for suffix, writer in writers.items()}
+        if version_update is not None:
+            version = publish_version(version_update)
+            print(f"Graph version {version['version']} ({len(version['deltas'])} deltas in the chain)")
+
+        for mirror in mirrors:
+            for suffix, writer in writers.items():
+                changed[suffix] |= replicate(writer.path, mirror.with_name(mirror.stem + suffix), writer.digest)
+        for output_path in [primary] + mirrors:
+            print(f"Graph saved to: {output_path} (+ {', '.join(s for s in writers if s != '.json')})")
+        unchanged = [suffix for suffix, was_changed in changed.items() if not was_changed]
+        if unchanged:
+            print(f"  Unchanged, left as is: {', '.join(unchanged)}")
+
+        if self.shards:
+            shard_dir = primary.with_name('mit-ocw-shards')
+            manifest = write_shards(graph, shard_dir)
+            print(f"Department shards saved to: {shard_dir} ({len(manifest['shards'])} shards, "
+                  f"{manifest['cross']['edges']} cross-department edges)")
+
     def _add_sample_courses(self):
         """Add sample MIT courses for testing when scraping fails."""
         sample_courses = [
@@ -522,15 +1380,243 @@ class MITOCWScraper:
             self.courses[course.course_id] = course
 
 
+# One scraper per parser name in each parse worker process
+_WORKER_SCRAPERS: Dict[str, MITOCWScraper] = {}
+
+
+def _parse_in_worker(parser: str, url: str, content: bytes,
+                     syllabus_content: Optional[bytes]) -> Tuple[Optional[Course], float]:
+    """Process-pool entry point for ``iter_courses_pipeline``.
+
+    Parses one course and returns it with the parse time in seconds.
+    """
+    scraper = _WORKER_SCRAPERS.get(parser)
+    if scraper is None:
+        scraper = _WORKER_SCRAPERS[parser] = MITOCWScraper(parser=parser)
+    start = time.perf_counter()
+    course = scraper._parse_pages(url, content, syllabus_content)
+    return course, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch MIT OCW course data and build a prerequisite graph")
+    parser.add_argument(
+        "max_courses",
+        type=int,
+        nargs="?",
+        default=50,
+        help="Maximum number of courses to fetch (default: 50)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of concurrent fetch workers (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Parse pages in N worker processes, fed by the fetch workers (default: 0, parse in fetch threads)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Downloaded courses buffered ahead of the parse workers (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=4,
+        help="Maximum concurrent requests per host (default: 4)",
+    )
+
+    parser.add_argument(
+        "--parser",
+        choices=["lxml", "soup"],
+        default="lxml",
+        help="Page extractor: single-pass lxml (default) or the BeautifulSoup reference",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory for the persistent HTTP response cache (default: .cache/ocw-http)",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Maximum size of the response cache in MB before LRU eviction (default: 1024)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the HTTP response cache",
+    )
+
+    parser.add_argument(
+        "--offerings",
+        choices=OFFERING_POLICIES,
+        default="all",
+        help="Fetch one offering per course, chosen from the URL before fetching (default: all offerings)",
+    )
+    parser.add_argument(
+        "--keep-offerings",
+        action="store_true",
+        help="List the skipped offerings of each course on its graph node",
+    )
+
+    parser.add_argument(
+        "--syllabus",
+        choices=SYLLABUS_POLICIES,
+        default="always",
+        help="When to fetch syllabus pages: always, only if linked from the course page, "
+             "or adaptive (linked and the course page has no prerequisites) (default: always)",
+    )
+
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="Also write per-department graph shards and a manifest to public/data/mit-ocw-shards/",
+    )
+    parser.add_argument(
+        "--reduce-edges",
+        action="store_true",
+        help="Drop duplicate, self-loop and transitively implied prerequisite edges from the output",
+    )
+    parser.add_argument(
+        "--layout",
+        action="store_true",
+        help="Precompute a layered layout (node x/y, edge bend points) so the browser can skip ELK",
+    )
+    parser.add_argument(
+        "--layout-time-budget",
+        type=float,
+        help="Stop the layout's crossing-reduction sweeps after this many seconds "
+             "(the layout then depends on machine speed; default: a fixed number of sweeps)",
+    )
+    parser.add_argument(
+        "--no-deltas",
+        action="store_true",
+        help="Do not version the graph or write a delta against the previous build",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only refetch courses whose sitemap lastmod changed since the last run",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=str(DEFAULT_MANIFEST_PATH),
+        help="Manifest used by --incremental (default: data/mit-ocw-manifest.json)",
+    )
+
+    parser.add_argument(
+        "--metrics-dir",
+        type=str,
+        default=str(DEFAULT_METRICS_DIR),
+        help="Write crawl metrics here as mit-ocw-crawl.json and mit-ocw-crawl.prom (default: .cache/metrics)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=0,
+        help="Also write metric snapshots every N seconds during the crawl (default: 0, end of run only)",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Do not write crawl metrics",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="ARCHIVE",
+        help="Record every HTTP response of this run into a replayable archive (.zip)",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="ARCHIVE",
+        help="Serve every HTTP request from a recorded archive instead of the network",
+    )
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default=str(DEFAULT_JOURNAL_PATH),
+        help="Append-only crawl journal (default: .cache/mit-ocw-journal.jsonl)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted crawl: skip URLs in the journal and retry failed ones",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        help=f"Retries with back-off for transient fetch errors (default: 0, or {RESUME_RETRIES} with --resume)",
+    )
+    parser.add_argument(
+        "--from-journal",
+        action="store_true",
+        help="Rebuild the graph from the journal alone, without fetching",
+    )
+
+    args = parser.parse_args()
+
+    journal = CrawlJournal(Path(args.journal), resume=args.resume or args.from_journal)
+    if args.from_journal:
+        scraper = MITOCWScraper(shards=args.shards, reduce_edges=args.reduce_edges, layout=args.layout,
+                                deltas=not args.no_deltas, layout_time_budget=args.layout_time_budget)
+        graph = scraper.build_graph(journal)
+        scraper.annotate_graph(graph)
+        if args.layout:
+            scraper.layout_graph(graph)
+        scraper.save_graph(graph)
+        print(f"\n  Nodes: {len(graph['nodes'])}")
+        print(f"  Edges: {len(graph['edges'])}")
+        journal.close()
+        return
+
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(Path(args.cache_dir), max_bytes=args.cache_size_mb * 1024 * 1024)
+
+    retries = args.retries if args.retries is not None else (RESUME_RETRIES if args.resume else 0)
+    scraper = MITOCWScraper(workers=args.workers, max_per_host=args.max_per_host, cache=cache,
+                            parser=args.parser, journal=journal, retries=retries,
+                            parse_workers=args.parse_workers, queue_size=args.queue_size,
+                            offering_policy=args.offerings, keep_offerings=args.keep_offerings,
+                            syllabus_policy=args.syllabus, shards=args.shards,
+                            reduce_edges=args.reduce_edges, layout=args.layout, deltas=not args.no_deltas,
+                            layout_time_budget=args.layout_time_budget)
+    manifest = CrawlManifest(Path(args.manifest)).load() if args.incremental else None
+    recorder = None
+    if args.record:
+        recorder = ArchiveWriter(Path(args.record))
+        scraper.record_to(recorder)
+    if args.replay:
+        scraper.replay_from(HTTPArchive(Path(args.replay)))
+    metrics_dir = None if args.no_metrics else Path(args.metrics_dir)
+    if metrics_dir and args.metrics_interval > 0:
+        scraper.metrics.start_snapshots(metrics_dir, args.metrics_interval)
+    try:
+        scraper.run(max_courses=args.max_courses, manifest=manifest)
+    finally:
+        journal.close()
+        if recorder:
+            recorder.close()
+            print(f"HTTP archive written to: {args.record}")
+        scraper.metrics.stop_snapshots()
+        print(f"\nCrawl: {scraper.metrics.summary()}")
+        if metrics_dir:
+            scraper.metrics.write(metrics_dir)
+            print(f"Metrics written to: {metrics_dir}")
+
+
 if __name__ == "__main__":
-    scraper = MITOCWScraper()
-    
-    # Allow command-line argument for max courses
-    max_courses = 50
-    if len(sys.argv) > 1:
-        try:
-            max_courses = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid max_courses argument: {sys.argv[1]}. Using default: {max_courses}")
-    
-    graph = scraper.run(max_courses=max_courses)
+    main()
@@ -18,28 +18,53 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 import time
 import re
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
+from keyword_classifier import KeywordClassifier
+
 # API endpoints
 OPENALEX_API_BASE = "https://api.openalex.org"
 OATD_SEARCH_BASE = "https://oatd.org/oatd/search"
 
 # Rate limiting
-RATE_LIMIT_DELAY = 0.5  # seconds between requests (OpenAlex allows 10 req/sec)
+RATE_LIMIT_DELAY = 0.5  # seconds between requests
+# OpenAlex allows 10 requests per second; requests are spaced to stay under it
+OPENALEX_MAX_REQUESTS_PER_SECOND = 8
+# Retries for 429 and 5xx responses: Retry-After, or RETRY_BACKOFF * 2**attempt seconds
+OPENALEX_RETRIES = 5
+RETRY_BACKOFF = 1.0
+OPENALEX_MAX_PER_PAGE = 200
+# OpenAlex accepts at most 100 values OR'd together in one filter
+OPENALEX_MAX_OR_VALUES = 100
+# Best /authors matches followed per name, and concurrent author searches
+AUTHOR_MATCHES = 3
+AUTHOR_SEARCH_WORKERS = 8
+# Cursor pages followed per batched author query beyond the ceil(authors * limit / per_page) needed
+AUTHOR_PAGE_SLACK = 2
+# The root-level work fields fetch_openalex_theses reads; everything else is left out of the response
+OPENALEX_WORK_FIELDS = [
+    "id", "doi", "title", "publication_year", "cited_by_count", "authorships", "topics", "concepts",
+]
 
-# College mappings
+# College mappings. Keywords match whole words (plurals included); a
+# trailing '*' marks a stem that also covers derived forms, e.g.
+# 'environment*' for "Environmental" (see keyword_classifier.py)
 COLLEGE_MAPPINGS = {
-    'MATH': ['mathematics', 'math', 'statistics', 'algebra', 'geometry', 'number theory'],
+    'MATH': ['mathemat*', 'math', 'statistic*', 'algebra*', 'geometr*', 'number theory'],
     'AINS': ['computer science', 'artificial intelligence', 'machine learning', 'ai', 'neural network', 'cs'],
-    'NAT': ['physics', 'chemistry', 'biology', 'natural science', 'quantum', 'molecular'],
-    'HUM': ['philosophy', 'literature', 'history', 'theology', 'classics', 'humanities'],
-    'ELA': ['language', 'linguistics', 'english', 'writing', 'literature'],
-    'ARTS': ['art', 'music', 'aesthetic', 'visual', 'creative'],
-    'SOC': ['psychology', 'sociology', 'economics', 'political science', 'social science'],
+    'NAT': ['physics', 'physicist', 'chemistry', 'biolog*', 'natural science', 'quantum', 'molecular'],
+    'HUM': ['philosoph*', 'literature', 'histor*', 'theolog*', 'classics', 'humanities'],
+    'ELA': ['language', 'linguistic*', 'english', 'writing', 'literature'],
+    'ARTS': ['art', 'artist*', 'music*', 'aesthetic', 'visual', 'creative'],
+    'SOC': ['psycholog*', 'sociolog*', 'econom*', 'political science', 'social science'],
     'HEAL': ['health', 'medicine', 'public health', 'medical'],
-    'CEF': ['ecology', 'environment', 'sustainability', 'climate'],
-    'META': ['education', 'pedagogy', 'learning', 'teaching'],
+    'CEF': ['ecolog*', 'environment*', 'sustainab*', 'climate'],
+    'META': ['educat*', 'pedagog*', 'learning', 'teaching'],
 }
+COLLEGE_CLASSIFIER = KeywordClassifier(COLLEGE_MAPPINGS)
 
 
 def map_to_college(discipline: str, topics: List[str] = None, keywords: List[str] = None) -> str:
@@ -54,36 +79,156 @@ def map_to_college(discipline: str, topics: List[str] = None, keywords: List[str
     Returns:
         College code (e.g., 'MATH', 'AINS')
     """
-    text_to_check = (discipline + ' ' + ' '.join(topics or []) + ' ' + ' '.join(keywords or [])).lower()
+    # One line per field, so a multi-word keyword cannot span two topics
+    text_to_check = '\n'.join([discipline or ''] + list(topics or []) + list(keywords or []))
+    
+    # The college with the most distinct keywords; META for interdisciplinary/unknown
+    return COLLEGE_CLASSIFIER.best(text_to_check, 'META')
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / per_second`` seconds apart.
+
+    Unlike a fixed sleep after every request, only the part of the interval
+    not already spent waiting for the previous response is slept.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+OPENALEX_LIMITER = RateLimiter(OPENALEX_MAX_REQUESTS_PER_SECOND)
+
+
+def openalex_session() -> requests.Session:
+    """A keep-alive session for the OpenAlex API with gzip-compressed responses."""
+    session = requests.Session()
+    session.headers.update({
+        "Accept-Encoding": "gzip",
+        "User-Agent": "Arbor thesis topic curator (fetch_phd_thesis_topics.py)",
+    })
+    return session
+
+
+def openalex_get(session: requests.Session, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    GET an OpenAlex endpoint within the rate limit and return its JSON.
+    
+    429 and 5xx responses are retried after their ``Retry-After`` delay, or
+    with exponential back-off; other errors raise ``requests.HTTPError``.
+    """
+    for attempt in range(OPENALEX_RETRIES + 1):
+        OPENALEX_LIMITER.wait()
+        response = session.get(f"{OPENALEX_API_BASE}/{path}", params=params)
+        if (response.status_code == 429 or response.status_code >= 500) and attempt < OPENALEX_RETRIES:
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF * 2 ** attempt
+            print(f"  OpenAlex returned {response.status_code}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        response.raise_for_status()
+        return response.json()
+
+
+def work_to_thesis(work: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the thesis information of an OpenAlex work.
     
-    # Score each college
-    scores = {}
-    for college, keywords_list in COLLEGE_MAPPINGS.items():
-        score = sum(1 for kw in keywords_list if kw in text_to_check)
-        if score > 0:
-            scores[college] = score
+    Args:
+        work: OpenAlex work object (at least the ``OPENALEX_WORK_FIELDS``)
+        
+    Returns:
+        Thesis metadata, including its discipline and college
+    """
+    thesis_data = {
+        "openalex_id": (work.get("id") or "").replace("https://openalex.org/", ""),
+        "title": work.get("title") or "",
+        "abstract": work.get("abstract", ""),
+        "year": work.get("publication_year"),
+        "authors": [],
+        "institutions": [],
+        "topics": [],
+        "keywords": [],
+        "doi": work.get("doi"),
+        "openalex_url": work.get("id"),
+        "cited_by_count": work.get("cited_by_count", 0),
+    }
     
-    if scores:
-        return max(scores.items(), key=lambda x: x[1])[0]
+    # Extract authors
+    for author in work.get("authorships", []):
+        author_name = (author.get("author") or {}).get("display_name", "")
+        if author_name:
+            thesis_data["authors"].append(author_name)
+    
+    # Extract institutions
+    for authorship in work.get("authorships", []):
+        for inst in authorship.get("institutions", []):
+            inst_name = inst.get("display_name", "")
+            if inst_name:
+                thesis_data["institutions"].append(inst_name)
+    
+    # Extract OpenAlex topics
+    for topic in work.get("topics", []):
+        thesis_data["topics"].append({
+            "id": topic.get("id", "").replace("https://openalex.org/", ""),
+            "display_name": topic.get("display_name", ""),
+            "score": topic.get("score", 0),
+        })
     
-    # Default to META for interdisciplinary/unknown
-    return 'META'
+    # Extract concepts (additional keywords)
+    for concept in work.get("concepts", []):
+        if concept.get("score", 0) > 0.5:  # Only high-scoring concepts
+            thesis_data["keywords"].append(concept.get("display_name", ""))
+    
+    # Determine discipline from topics
+    topic_names = [t["display_name"] for t in thesis_data["topics"]]
+    if topic_names:
+        # Use first topic as primary discipline
+        primary_topic = topic_names[0]
+        thesis_data["discipline"] = primary_topic
+    else:
+        thesis_data["discipline"] = "Interdisciplinary"
+    
+    # Map to college
+    thesis_data["college"] = map_to_college(
+        thesis_data["discipline"],
+        topic_names,
+        thesis_data["keywords"]
+    )
+    return thesis_data
 
 
-def fetch_openalex_theses(limit: int = 50, filter_type: str = "dissertation") -> List[Dict[str, Any]]:
+def fetch_openalex_theses(limit: int = 50, filter_type: str = "dissertation",
+                          session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
     """
     Fetch PhD theses from OpenAlex API.
     
+    Pages are followed with OpenAlex's cursor (``cursor=*``, then each
+    response's ``next_cursor``), which unlike ``page=`` is not capped at
+    10,000 results. Only ``OPENALEX_WORK_FIELDS`` are requested.
+    
     Args:
         limit: Maximum number of theses to fetch
         filter_type: Type filter (dissertation, thesis, etc.)
+        session: Session to reuse (default: a new ``openalex_session()``)
         
     Returns:
         List of thesis metadata from OpenAlex
     """
     theses = []
     page = 1
-    per_page = min(200, limit)
+    per_page = min(OPENALEX_MAX_PER_PAGE, limit)
+    session = session or openalex_session()
     
     print(f"Fetching theses from OpenAlex (type={filter_type})...")
     
@@ -91,22 +236,21 @@ def fetch_openalex_theses(limit: int = 50, filter_type: str = "dissertation") ->
     # Using type:dissertation or type:thesis
     filter_param = f"type:{filter_type}"
     
-    url = f"{OPENALEX_API_BASE}/works"
     params = {
         "filter": filter_param,
         "per_page": per_page,
-        "page": page,
         "sort": "cited_by_count:desc",  # Sort by citations
+        "select": ",".join(OPENALEX_WORK_FIELDS),
+        "cursor": "*",
     }
     
     try:
         while len(theses) < limit:
             print(f"  Fetching page {page}...")
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = openalex_get(session, "works", params)
             results = data.get("results", [])
+            if page == 1 and data.get("meta", {}).get("count") is not None:
+                print(f"  {data['meta']['count']} matching works")
             
             if not results:
                 break
@@ -115,73 +259,16 @@ def fetch_openalex_theses(limit: int = 50, filter_type: str = "dissertation") ->
                 if len(theses) >= limit:
                     break
                 
-                # Extract thesis information
-                thesis_data = {
-                    "openalex_id": work.get("id", "").replace("https://openalex.org/", ""),
-                    "title": work.get("title", ""),
-                    "abstract": work.get("abstract", ""),
-                    "year": work.get("publication_year"),
-                    "authors": [],
-                    "institutions": [],
-                    "topics": [],
-                    "keywords": [],
-                    "doi": work.get("doi"),
-                    "openalex_url": work.get("id"),
-                    "cited_by_count": work.get("cited_by_count", 0),
-                }
-                
-                # Extract authors
-                for author in work.get("authorships", []):
-                    author_name = author.get("author", {}).get("display_name", "")
-                    if author_name:
-                        thesis_data["authors"].append(author_name)
-                
-                # Extract institutions
-                for authorship in work.get("authorships", []):
-                    for inst in authorship.get("institutions", []):
-                        inst_name = inst.get("display_name", "")
-                        if inst_name:
-                            thesis_data["institutions"].append(inst_name)
-                
-                # Extract OpenAlex topics
-                for topic in work.get("topics", []):
-                    thesis_data["topics"].append({
-                        "id": topic.get("id", "").replace("https://openalex.org/", ""),
-                        "display_name": topic.get("display_name", ""),
-                        "score": topic.get("score", 0),
-                    })
-                
-                # Extract concepts (additional keywords)
-                for concept in work.get("concepts", []):
-                    if concept.get("score", 0) > 0.5:  # Only high-scoring concepts
-                        thesis_data["keywords"].append(concept.get("display_name", ""))
-                
-                # Determine discipline from topics
-                topic_names = [t["display_name"] for t in thesis_data["topics"]]
-                if topic_names:
-                    # Use first topic as primary discipline
-                    primary_topic = topic_names[0]
-                    thesis_data["discipline"] = primary_topic
-                else:
-                    thesis_data["discipline"] = "Interdisciplinary"
-                
-                # Map to college
-                thesis_data["college"] = map_to_college(
-                    thesis_data["discipline"],
-                    topic_names,
-                    thesis_data["keywords"]
-                )
-                
+                thesis_data = work_to_thesis(work)
                 theses.append(thesis_data)
                 print(f"  Found: {thesis_data['title'][:60]}... ({thesis_data['college']})")
             
-            page += 1
-            params["page"] = page
-            time.sleep(RATE_LIMIT_DELAY)
-            
-            # Check if we have more pages
-            if len(results) < per_page:
+            # The last page has no next cursor
+            next_cursor = data.get("meta", {}).get("next_cursor")
+            if not next_cursor:
                 break
+            params["cursor"] = next_cursor
+            page += 1
                 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching from OpenAlex: {e}")
@@ -460,125 +547,153 @@ def save_topics_to_json(topics: List[Dict[str, Any]], output_path: Path):
     print(f"Saved {len(topics)} topics to {output_path}")
 
 
-def search_author_theses(author_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+def _openalex_id(url: Optional[str]) -> str:
+    return (url or "").replace("https://openalex.org/", "")
+
+
+def resolve_authors(author_names: List[str], session: requests.Session,
+                    matches: int = AUTHOR_MATCHES) -> Dict[str, List[Dict[str, str]]]:
     """
-    Search for theses by a specific author name.
+    Look up OpenAlex author ids for several names at once.
+    
+    The ``/authors`` searches run concurrently (still within the shared rate
+    limit); a failed search is reported and yields no matches.
     
     Args:
-        author_name: Author name to search for (e.g., "mcshan, dc")
-        limit: Maximum number of results
+        author_names: Author names to search for (e.g., "mcshan, dc")
+        session: Session to send the searches on
+        matches: How many of the best matches to keep per name
         
     Returns:
-        List of thesis metadata
+        ``{name: [{"id": "A...", "display_name": ...}, ...]}`` in the order of ``author_names``
     """
-    print(f"\nSearching for theses by: {author_name}...")
+    def search(name: str) -> List[Dict[str, str]]:
+        params = {"search": name, "per_page": matches, "select": "id,display_name"}
+        try:
+            authors = openalex_get(session, "authors", params).get("results", [])
+        except requests.exceptions.RequestException as e:
+            print(f"Error searching for author {name}: {e}")
+            return []
+        return [{"id": _openalex_id(author.get("id")), "display_name": author.get("display_name", "")}
+                for author in authors[:matches]]
+    
+    names = list(dict.fromkeys(author_names))
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(AUTHOR_SEARCH_WORKERS, len(names))) as pool:
+        return dict(zip(names, pool.map(search, names)))
+
+
+def _fetch_author_dissertations(author_ids: List[str], limit: int, kept: Dict[str, int],
+                                works: Dict[str, Dict], session: requests.Session) -> bool:
+    """
+    Read the dissertations of ``author_ids`` with one OR'd query into ``works``.
     
-    # OpenAlex author search
-    url = f"{OPENALEX_API_BASE}/authors"
+    Follows cursor pages until every author has ``limit`` theses in ``kept``,
+    or for at most ``ceil(len(author_ids) * limit / per_page)`` pages plus
+    ``AUTHOR_PAGE_SLACK``. Returns True if pages were left unread.
+    """
+    max_pages = math.ceil(len(author_ids) * limit / OPENALEX_MAX_PER_PAGE) + AUTHOR_PAGE_SLACK
     params = {
-        "search": author_name,
-        "per_page": 10,
+        "filter": f"author.id:{'|'.join(author_ids)},type:dissertation",
+        "per_page": OPENALEX_MAX_PER_PAGE,
+        "sort": "publication_date:desc",
+        "select": ",".join(OPENALEX_WORK_FIELDS),
+        "cursor": "*",
     }
+    for _ in range(max_pages):
+        if all(kept[author_id] >= limit for author_id in author_ids):
+            return True
+        data = openalex_get(session, "works", params)
+        for work in data.get("results", []):
+            work_id = _openalex_id(work.get("id"))
+            authors = {_openalex_id((authorship.get("author") or {}).get("id"))
+                       for authorship in work.get("authorships", [])} & kept.keys()
+            wanted = [author_id for author_id in authors if kept[author_id] < limit]
+            if work_id in works or not wanted:
+                continue
+            for author_id in wanted:
+                kept[author_id] += 1
+            works[work_id] = work
+        params["cursor"] = data.get("meta", {}).get("next_cursor")
+        if not params["cursor"]:
+            return False
+    return True
+
+
+def search_authors_theses(author_names: List[str], limit: int = 10,
+                          session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+    """
+    Search for theses by several author names with a few batched requests.
     
-    theses = []
+    The names are resolved to author ids concurrently (``resolve_authors``).
+    Dissertations are then fetched for up to ``OPENALEX_MAX_OR_VALUES``
+    authors per request with an OR'd ``author.id:A|B|C`` filter, following
+    cursor pages. A query reads at most the pages that ``limit`` theses per
+    author fill, plus ``AUTHOR_PAGE_SLACK``; authors that still need theses
+    after that are queried again without the ones already satisfied. A work
+    by several of the authors is kept once, before conversion.
     
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        authors = data.get("results", [])
+    Args:
+        author_names: Author names to search for (e.g., "mcshan, dc")
+        limit: Maximum number of theses per matched author
+        session: Session to reuse (default: a new ``openalex_session()``)
         
+    Returns:
+        List of thesis metadata
+    """
+    session = session or openalex_session()
+    print(f"\nSearching for theses by: {'; '.join(author_names)}...")
+    
+    author_ids = []
+    for name, authors in resolve_authors(author_names, session).items():
         if not authors:
-            print(f"  No authors found for: {author_name}")
-            return []
-        
-        # For each author found, get their works
-        for author in authors[:3]:  # Check top 3 matches
-            author_id = author.get("id", "").replace("https://openalex.org/", "")
-            author_name_display = author.get("display_name", "")
-            print(f"  Found author: {author_name_display} (ID: {author_id})")
-            
-            # Get works by this author
-            works_url = f"{OPENALEX_API_BASE}/works"
-            works_params = {
-                "filter": f"author.id:{author_id},type:dissertation",
-                "per_page": 50,
-                "sort": "publication_date:desc",
-            }
-            
-            works_response = requests.get(works_url, params=works_params)
-            if works_response.status_code == 200:
-                works_data = works_response.json()
-                works = works_data.get("results", [])
-                
-                for work in works[:limit]:
-                    # Extract thesis information (same as fetch_openalex_theses)
-                    thesis_data = {
-                        "openalex_id": work.get("id", "").replace("https://openalex.org/", ""),
-                        "title": work.get("title", ""),
-                        "abstract": work.get("abstract", ""),
-                        "year": work.get("publication_year"),
-                        "authors": [],
-                        "institutions": [],
-                        "topics": [],
-                        "keywords": [],
-                        "doi": work.get("doi"),
-                        "openalex_url": work.get("id"),
-                        "cited_by_count": work.get("cited_by_count", 0),
-                    }
-                    
-                    # Extract authors
-                    for auth in work.get("authorships", []):
-                        auth_name = auth.get("author", {}).get("display_name", "")
-                        if auth_name:
-                            thesis_data["authors"].append(auth_name)
-                    
-                    # Extract institutions
-                    for authorship in work.get("authorships", []):
-                        for inst in authorship.get("institutions", []):
-                            inst_name = inst.get("display_name", "")
-                            if inst_name:
-                                thesis_data["institutions"].append(inst_name)
-                    
-                    # Extract OpenAlex topics
-                    for topic in work.get("topics", []):
-                        thesis_data["topics"].append({
-                            "id": topic.get("id", "").replace("https://openalex.org/", ""),
-                            "display_name": topic.get("display_name", ""),
-                            "score": topic.get("score", 0),
-                        })
-                    
-                    # Extract concepts
-                    for concept in work.get("concepts", []):
-                        if concept.get("score", 0) > 0.5:
-                            thesis_data["keywords"].append(concept.get("display_name", ""))
-                    
-                    # Determine discipline
-                    topic_names = [t["display_name"] for t in thesis_data["topics"]]
-                    if topic_names:
-                        thesis_data["discipline"] = topic_names[0]
-                    else:
-                        thesis_data["discipline"] = "Interdisciplinary"
-                    
-                    # Map to college
-                    thesis_data["college"] = map_to_college(
-                        thesis_data["discipline"],
-                        topic_names,
-                        thesis_data["keywords"]
-                    )
-                    
-                    theses.append(thesis_data)
-                    print(f"    Found: {thesis_data['title'][:60]}... ({thesis_data.get('year', 'N/A')})")
-            
-            time.sleep(RATE_LIMIT_DELAY)
+            print(f"  No authors found for: {name}")
+        for author in authors:
+            print(f"  Found author: {author['display_name']} (ID: {author['id']}) for {name}")
+            author_ids.append(author["id"])
+    author_ids = list(dict.fromkeys(author_ids))
+    
+    # Matched author id -> theses kept for them so far
+    kept = dict.fromkeys(author_ids, 0)
+    works = {}
+    for start in range(0, len(author_ids), OPENALEX_MAX_OR_VALUES):
+        pending = author_ids[start:start + OPENALEX_MAX_OR_VALUES]
+        try:
+            while pending:
+                if not _fetch_author_dissertations(pending, limit, kept, works, session):
+                    break  # every remaining author's dissertations were read
+                still_pending = [author_id for author_id in pending if kept[author_id] < limit]
+                if len(still_pending) == len(pending):
+                    break  # the page cap was hit with nobody satisfied; requerying would repeat it
+                pending = still_pending
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching theses for {len(pending)} authors: {e}")
     
-    except requests.exceptions.RequestException as e:
-        print(f"Error searching for author {author_name}: {e}")
+    theses = []
+    for work in works.values():
+        thesis_data = work_to_thesis(work)
+        theses.append(thesis_data)
+        print(f"    Found: {thesis_data['title'][:60]}... ({thesis_data.get('year', 'N/A')})")
     
-    print(f"Found {len(theses)} theses for {author_name}")
+    print(f"Found {len(theses)} theses for {len(author_names)} author names")
     return theses
 
 
+def search_author_theses(author_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Search for theses by a specific author name.
+    
+    Args:
+        author_name: Author name to search for (e.g., "mcshan, dc")
+        limit: Maximum number of results per matched author
+        
+    Returns:
+        List of thesis metadata
+    """
+    return search_authors_theses([author_name], limit)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download and curate PhD thesis topics from OpenAlex and OATD")
     parser.add_argument(
@@ -625,14 +740,13 @@ def main():
     print("=" * 60)
     
     # Fetch from OpenAlex
-    openalex_theses = fetch_openalex_theses(limit=args.limit)
+    session = openalex_session()
+    openalex_theses = fetch_openalex_theses(limit=args.limit, session=session)
     
     # Search for specific authors if provided
     author_theses = []
     if args.authors:
-        for author_name in args.authors:
-            author_results = search_author_theses(author_name, limit=20)
-            author_theses.extend(author_results)
+        author_theses = search_authors_theses(args.authors, limit=20, session=session)
     
     # Combine all theses
     all_openalex = openalex_theses + author_theses
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build-time analytics for the prerequisite graph.
+
+Prerequisites are extracted with regular expressions, so the "DAG" can in
+fact contain cycles (mutual or self-referencing prerequisites), duplicate
+edges and many edges implied by others (18.01 -> 18.02 -> 18.03 plus
+18.01 -> 18.03). ``analyze_graph`` checks and annotates a ``build_graph``
+dict:
+
+- Tarjan's algorithm finds strongly connected components; every component
+  with more than one course, and every self-loop, is reported as a cycle.
+- Courses get a topological ``depth``: the longest chain of prerequisites
+  leading to them (courses in one cycle share a depth).
+- The transitive reduction of the prerequisite edges is computed on the
+  condensation (cycle-free) graph with reachability bitsets. Edges inside a
+  cycle are always kept, as are parallel edges from different members of
+  one cycle to the same course.
+- Courses get ``in_degree`` and ``out_degree`` over the shipped edges.
+
+Only ``prerequisite`` edges are analyzed; corequisites are left alone.
+
+Usage:
+    python graph_analytics.py [graph.json] [--check]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+from graph_loader import find_graph
+
+PREREQUISITE = 'prerequisite'
+
+
+def strongly_connected_components(successors: List[List[int]]) -> List[List[int]]:
+    """Tarjan's algorithm, iterative; components come in reverse topological order."""
+    n = len(successors)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            v, child = work.pop()
+            if child == 0:
+                index[v] = lowlink[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+            recurse = False
+            for i in range(child, len(successors[v])):
+                w = successors[v][i]
+                if index[w] == -1:
+                    work.append((v, i + 1))
+                    work.append((w, 0))
+                    recurse = True
+                    break
+                if on_stack[w]:
+                    lowlink[v] = min(lowlink[v], index[w])
+            if recurse:
+                continue
+            if lowlink[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[v])
+    return components
+
+
+def analyze_graph(graph: Dict, reduce: bool = False) -> Dict:
+    """Annotate ``graph`` in place and return the analytics report.
+
+    With ``reduce``, redundant prerequisite edges (duplicates, self-loops
+    and transitively implied edges) are removed from ``graph['edges']``.
+    The report is also stored as ``graph['metadata']['analytics']``.
+    """
+    nodes = graph.get('nodes', [])
+    edges = graph.get('edges', [])
+    position = {node['id']: i for i, node in enumerate(nodes)}
+    prerequisites: List[Tuple[int, int, int]] = []  # (edge index, source, target)
+    successors: List[List[int]] = [[] for _ in nodes]
+    for k, edge in enumerate(edges):
+        if edge.get('type') == PREREQUISITE and edge['source'] in position and edge['target'] in position:
+            source, target = position[edge['source']], position[edge['target']]
+            prerequisites.append((k, source, target))
+            successors[source].append(target)
+
+    components = strongly_connected_components([sorted(set(s)) for s in successors])
+    component_of = [0] * len(nodes)
+    for c, members in enumerate(components):
+        for v in members:
+            component_of[v] = c
+    # Tarjan emits sinks first; topological order is the reverse
+    order = list(range(len(components) - 1, -1, -1))
+    rank = {c: r for r, c in enumerate(order)}
+    condensed: List[set] = [set() for _ in components]
+    for _, source, target in prerequisites:
+        if component_of[source] != component_of[target]:
+            condensed[component_of[source]].add(component_of[target])
+
+    depth = [0] * len(components)
+    for c in order:
+        for d in condensed[c]:
+            depth[d] = max(depth[d], depth[c] + 1)
+
+    # Reachability bitsets over topological ranks; a child already reachable
+    # through an earlier (in topological order) child is implied
+    reach = [0] * len(components)
+    implied = set()
+    for c in reversed(order):
+        reachable = 0
+        for d in sorted(condensed[c], key=rank.__getitem__):
+            if reachable >> rank[d] & 1:
+                implied.add((c, d))
+            else:
+                reachable |= reach[d] | (1 << rank[d])
+        reach[c] = reachable
+
+    removed = set()
+    seen = set()
+    self_loops = []
+    duplicates = redundant = 0
+    for k, source, target in prerequisites:
+        if source == target:
+            self_loops.append(nodes[source]['id'])
+            removed.add(k)
+        elif (source, target) in seen:
+            duplicates += 1
+            removed.add(k)
+        elif (component_of[source], component_of[target]) in implied:
+            redundant += 1
+            removed.add(k)
+        seen.add((source, target))
+    if reduce:
+        graph['edges'] = edges = [edge for k, edge in enumerate(edges) if k not in removed]
+
+    in_degree = [0] * len(nodes)
+    out_degree = [0] * len(nodes)
+    for edge in edges:
+        if edge['source'] in position and edge['target'] in position:
+            out_degree[position[edge['source']]] += 1
+            in_degree[position[edge['target']]] += 1
+    for i, node in enumerate(nodes):
+        node['depth'] = depth[component_of[i]]
+        node['in_degree'] = in_degree[i]
+        node['out_degree'] = out_degree[i]
+
+    cycles = sorted(sorted(nodes[v]['id'] for v in members) for members in components if len(members) > 1)
+    report = {
+        'cycles': cycles,
+        'self_loops': sorted(set(self_loops)),
+        'layers': max(depth, default=-1) + 1,
+        'duplicate_edges': duplicates,
+        'redundant_edges': redundant,
+        'edges_reduced': reduce,
+    }
+    graph.setdefault('metadata', {})['analytics'] = report
+    return report
+
+
+def summarize(report: Dict) -> str:
+    """One-line human summary of an analytics report."""
+    removable = report['duplicate_edges'] + report['redundant_edges'] + len(report['self_loops'])
+    return (f"{report['layers']} layers, {len(report['cycles'])} cycles, "
+            f"{len(report['self_loops'])} self-loops, {report['duplicate_edges']} duplicate and "
+            f"{report['redundant_edges']} transitively implied prerequisite edges "
+            f"({'removed' if report['edges_reduced'] else f'{removable} removable with --reduce-edges'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the prerequisite graph for cycles and redundant edges")
+    parser.add_argument("graph", nargs="?", help="Graph JSON file (default: ../public/data or ../data)")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if the graph has cycles")
+    args = parser.parse_args()
+
+    try:
+        with open(args.graph or find_graph()) as f:
+            graph = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Graph file not found at {args.graph or 'public/data or data'}")
+        print("Run 'python fetch_mit_ocw.py' to generate the graph first.")
+        sys.exit(1)
+    report = analyze_graph(graph)
+    print(summarize(report))
+    for cycle in report['cycles']:
+        print(f"  cycle: {' <-> '.join(cycle)}")
+    for course_id in report['self_loops']:
+        print(f"  self-loop: {course_id}")
+    sys.exit(1 if args.check and (report['cycles'] or report['self_loops']) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Compact, memory-mappable binary encoding of the course graph.
+
+``mit-ocw-graph.json`` repeats every field name, department and level for
+every node. The binary form stores each distinct string once in a string
+table, nodes as integer-indexed columns of string ids, numeric node
+attributes (``depth``, degrees, layout ``x``/``y``) as typed columns, and
+edges in CSR form (per-source offsets into target and edge-type arrays,
+plus layout bend points), so loading it is a ``mmap`` plus a few
+``memoryview`` casts and lookups touch only the pages they need.
+
+File layout (all integers little-endian, sections 8-byte aligned)::
+
+    magic    8 bytes   b'OCWGRAPH'
+    version  uint32
+    count    uint32    number of sections
+    table    count x (name: 8 bytes ASCII, offset: uint64, length: uint64)
+    sections ...
+
+Sections:
+
+    strofs    uint32[S + 1]  byte offsets of each string in strdata
+    strdata   UTF-8          concatenated strings
+    n.<col>   uint32[N]      string id per node for each NODE_COLUMNS entry
+                             (NONE for null)
+    n.num<k>  int64[N] or    numeric node field k of meta['numeric'] (null
+              float64[N]     is INT64_NULL or NaN)
+    n.int<k>  uint8[N]       for a float64 field that also holds integers:
+                             1 where the value was an int
+    e.offset  uint32[N + 1]  CSR offsets of each source node's edges
+    e.target  uint32[E]      target node index
+    e.type    uint8[E]       index into meta['edge_types']
+    e.ptofs   uint32[E + 1]  offsets of each edge's bend points in e.points
+    e.points  float64[2P]    x, y of every bend point
+    meta      JSON           graph metadata, edge type names, the numeric
+                             columns, and any field that fits no column:
+                             per node (``extra``) or per edge position
+                             (``edge_extra``)
+
+A node field gets a numeric column when every node has it as an int, a
+float or null; anything else (strings outside NODE_COLUMNS, lists, fields
+only some nodes have) is kept in ``extra``. Bend points are typed when
+they are lists of float pairs. Node labels are not stored; they are rebuilt
+as ``"<id>: <title>"``, as are edge labels from the edge type. Edges come
+back grouped by source node, so a round trip preserves the edge set but
+not the order of the JSON edge list.
+"""
+
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'OCWGRAPH'
+FORMAT_VERSION = 2
+NONE = 0xFFFFFFFF
+INT64_NULL = -2 ** 63
+# (node field, section name) for every string-valued node column
+NODE_COLUMNS = [
+    ('id', 'n.id'),
+    ('title', 'n.title'),
+    ('url', 'n.url'),
+    ('department', 'n.dept'),
+    ('level', 'n.level'),
+    ('description', 'n.desc'),
+]
+EDGE_TYPES = ['prerequisite', 'corequisite']
+
+_HEADER = struct.Struct('<8sII')
+_ENTRY = struct.Struct('<8sQQ')
+
+
+def pack_sections(magic: bytes, version: int, sections: List[Tuple[str, bytes]]) -> bytes:
+    """Lay out named sections behind a header and section table, 8-byte aligned.
+
+    The same container (with its own magic) is used by the other
+    memory-mapped files derived from the graph.
+    """
+    position = _HEADER.size + _ENTRY.size * len(sections)
+    table = []
+    body = []
+    for name, data in sections:
+        padding = -position % 8
+        body.append(b'\0' * padding)
+        position += padding
+        table.append(_ENTRY.pack(name.encode('ascii'), position, len(data)))
+        body.append(data)
+        position += len(data)
+    return _HEADER.pack(magic, version, len(sections)) + b''.join(table) + b''.join(body)
+
+
+def section_spans(buffer, magic: bytes, version: int, path: Path, kind: str) -> Dict[str, Tuple[int, int]]:
+    """``{name: (offset, length)}`` from the table of a ``pack_sections`` file."""
+    found, found_version, count = _HEADER.unpack_from(buffer, 0)
+    if found != magic:
+        raise ValueError(f"{path} is not a {kind} file")
+    if found_version != version:
+        raise ValueError(f"Unsupported {kind} version {found_version} in {path}")
+    spans = {}
+    for i in range(count):
+        name, offset, length = _ENTRY.unpack_from(buffer, _HEADER.size + i * _ENTRY.size)
+        spans[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+    return spans
+
+
+def _label(node: Dict) -> str:
+    return f"{node['id']}: {node.get('title')}"
+
+
+def _pack(typecode: str, values) -> bytes:
+    data = array(typecode, values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _u32(values) -> bytes:
+    return _pack('I', values)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _numeric_columns(nodes: List[Dict], fields: List[str]) -> List[Tuple[str, str, bool]]:
+    """``(field, typecode, mixed)`` for each field that fits a typed column.
+
+    Every node must have the field, as an int, a float or null. Ints must
+    fit int64 (INT64_NULL is reserved) and floats must not be NaN (the
+    null). A field holding both is a float64 column with ``mixed`` set.
+    """
+    numeric = []
+    for field in fields:
+        values = [node.get(field, '') for node in nodes]
+        if not nodes or not all(value is None or _is_number(value) for value in values):
+            continue
+        ints = [value for value in values if isinstance(value, int)]
+        floats = [value for value in values if isinstance(value, float)]
+        if any(not INT64_NULL < value < 2 ** 63 for value in ints) or any(math.isnan(value) for value in floats):
+            continue
+        if ints and floats and any(abs(value) > 2 ** 53 for value in ints):
+            continue  # not exact as a float64
+        numeric.append((field, 'd' if floats else 'q', bool(ints and floats)))
+    return numeric
+
+
+def _typed_points(points) -> bool:
+    return (isinstance(points, list) and len(points) > 0
+            and all(isinstance(point, list) and len(point) == 2
+                    and all(isinstance(value, float) for value in point) for point in points))
+
+
+def encode_graph(graph: Dict) -> bytes:
+    """Encode a ``build_graph`` dict into the compact binary format."""
+    nodes = graph.get('nodes', [])
+    strings: Dict[str, int] = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return NONE
+        return strings.setdefault(str(value), len(strings))
+
+    index = {node['id']: i for i, node in enumerate(nodes)}
+    columns = {section: [intern(node.get(field)) for node in nodes] for field, section in NODE_COLUMNS}
+    known = {field for field, _ in NODE_COLUMNS} | {'label'}
+    other_fields = list(dict.fromkeys(key for node in nodes for key in node if key not in known))
+    numeric = _numeric_columns(nodes, other_fields)
+    numeric_sections = []
+    for k, (field, typecode, mixed) in enumerate(numeric):
+        null = math.nan if typecode == 'd' else INT64_NULL
+        values = [null if node[field] is None else node[field] for node in nodes]
+        numeric_sections.append((f'n.num{k}', _pack(typecode, values)))
+        if mixed:
+            numeric_sections.append((f'n.int{k}', bytes(isinstance(value, int) for value in values)))
+    known |= {field for field, _, _ in numeric}
+    extra = {}
+    for i, node in enumerate(nodes):
+        fields = {key: value for key, value in node.items() if key not in known}
+        if node.get('label', _label(node)) != _label(node):
+            fields['label'] = node['label']
+        if fields:
+            extra[str(i)] = fields
+
+    edge_types = list(EDGE_TYPES)
+    by_source: List[List[Tuple[int, int, Dict]]] = [[] for _ in nodes]
+    for edge in graph.get('edges', []):
+        if edge['source'] not in index or edge['target'] not in index:
+            continue
+        if edge['type'] not in edge_types:
+            edge_types.append(edge['type'])
+        by_source[index[edge['source']]].append((index[edge['target']], edge_types.index(edge['type']), edge))
+    offsets = [0]
+    targets: List[int] = []
+    types = bytearray()
+    point_offsets = [0]
+    points: List[float] = []
+    edge_extra = {}
+    for edges in by_source:
+        for target, kind, edge in edges:
+            fields = {key: value for key, value in edge.items() if key not in ('source', 'target', 'type', 'label')}
+            if edge.get('label', edge['type']) != edge['type']:
+                fields['label'] = edge['label']
+            if _typed_points(fields.get('points')):
+                points.extend(value for point in fields.pop('points') for value in point)
+            point_offsets.append(len(points) // 2)
+            if fields:
+                edge_extra[str(len(targets))] = fields
+            targets.append(target)
+            types.append(kind)
+        offsets.append(len(targets))
+
+    encoded = [value.encode('utf-8') for value in strings]
+    string_offsets = [0]
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    meta = {
+        'metadata': graph.get('metadata', {}),
+        'edge_types': edge_types,
+        'numeric': [{'field': field, 'type': typecode, 'mixed': mixed} for field, typecode, mixed in numeric],
+        'extra': extra,
+        'edge_extra': edge_extra,
+    }
+    sections = [
+        ('strofs', _u32(string_offsets)),
+        ('strdata', b''.join(encoded)),
+        *((section, _u32(values)) for section, values in columns.items()),
+        *numeric_sections,
+        ('e.offset', _u32(offsets)),
+        ('e.target', _u32(targets)),
+        ('e.type', bytes(types)),
+        ('e.ptofs', _u32(point_offsets)),
+        ('e.points', _pack('d', points)),
+        ('meta', json.dumps(meta, separators=(',', ':')).encode('utf-8')),
+    ]
+
+    return pack_sections(MAGIC, FORMAT_VERSION, sections)
+
+
+class CompactGraph:
+    """Read-only, memory-mapped view of a binary graph file.
+
+    Columns are exposed as ``memoryview`` arrays over the mapping, so
+    opening a file is cheap regardless of its size; strings and numbers are
+    decoded on access.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        spans = section_spans(self._map, MAGIC, FORMAT_VERSION, self.path, 'binary graph')
+        self._sections: Dict[str, memoryview] = {
+            name: self._view[offset:offset + length] for name, (offset, length) in spans.items()
+        }
+
+        self._string_offsets = self._u32('strofs')
+        self._string_data = self._sections['strdata']
+        self._columns = {field: self._u32(section) for field, section in NODE_COLUMNS}
+        self.offsets = self._u32('e.offset')
+        self.targets = self._u32('e.target')
+        self.types = self._sections['e.type']
+        self._point_offsets = self._u32('e.ptofs')
+        self._points = self._array('e.points', 'd')
+        meta = json.loads(bytes(self._sections['meta']))
+        self.metadata: Dict = meta['metadata']
+        self.edge_types: List[str] = meta['edge_types']
+        # field -> (values, int flags or None) for every numeric column
+        self._numeric: Dict[str, Tuple] = {
+            column['field']: (self._array(f'n.num{k}', column['type']),
+                              self._sections[f'n.int{k}'] if column['mixed'] else None)
+            for k, column in enumerate(meta['numeric'])
+        }
+        self._extra: Dict[str, Dict] = meta['extra']
+        self._edge_extra: Dict[str, Dict] = meta['edge_extra']
+        self._index: Optional[Dict[str, int]] = None
+
+    def _array(self, section: str, typecode: str):
+        view = self._sections[section]
+        if sys.byteorder == 'little':
+            return view.cast(typecode)
+        data = array(typecode, bytes(view))
+        data.byteswap()
+        return data
+
+    def _u32(self, section: str):
+        return self._array(section, 'I')
+
+    @property
+    def node_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE:
+            return None
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return bytes(self._string_data[start:end]).decode('utf-8')
+
+    def column(self, field: str):
+        """String ids of ``field`` for every node (``NONE`` for null), as an array view."""
+        return self._columns[field]
+
+    def numeric_column(self, field: str):
+        """Values of a numeric node field as an int64 or float64 array view
+        (``INT64_NULL``/NaN for null), or None if it has no column."""
+        column = self._numeric.get(field)
+        return column[0] if column else None
+
+    def _number(self, field: str, i: int):
+        values, ints = self._numeric[field]
+        value = values[i]
+        if value == INT64_NULL or value != value:  # null (NaN for floats)
+            return None
+        return int(value) if ints is not None and ints[i] else value
+
+    def node_id(self, i: int) -> str:
+        return self.string(self._columns['id'][i])
+
+    def node(self, i: int) -> Dict:
+        """The JSON node dict for node index ``i``."""
+        node = {field: self.string(column[i]) for field, column in self._columns.items()}
+        node = {'id': node['id'], 'label': _label(node), **{k: v for k, v in node.items() if k != 'id'}}
+        for field in self._numeric:
+            node[field] = self._number(field, i)
+        node.update(self._extra.get(str(i), {}))
+        return node
+
+    def index_of(self, course_id: str) -> Optional[int]:
+        """Node index of ``course_id`` (the id map is built on first use)."""
+        if self._index is None:
+            self._index = {self.node_id(i): i for i in range(self.node_count)}
+        return self._index.get(course_id)
+
+    def out_edges(self, i: int) -> Iterator[Tuple[int, str]]:
+        """``(target index, edge type)`` for every edge leaving node ``i``."""
+        for position in range(self.offsets[i], self.offsets[i + 1]):
+            yield self.targets[position], self.edge_types[self.types[position]]
+
+    def edge_points(self, position: int) -> Optional[List[List[float]]]:
+        """Typed bend points of the edge at CSR ``position``, or None if it has none."""
+        start, end = self._point_offsets[position], self._point_offsets[position + 1]
+        if start == end:
+            return None
+        return [[self._points[2 * p], self._points[2 * p + 1]] for p in range(start, end)]
+
+    def edge_fields(self, position: int) -> Dict:
+        """Fields of the edge at CSR ``position`` beyond source, target, type and label."""
+        fields = {}
+        points = self.edge_points(position)
+        if points is not None:
+            fields['points'] = points
+        fields.update(self._edge_extra.get(str(position), {}))
+        return fields
+
+    def to_graph(self) -> Dict:
+        """Decode the whole file back into a ``build_graph``-shaped dict."""
+        ids = [self.node_id(i) for i in range(self.node_count)]
+        edges = []
+        for i in range(self.node_count):
+            for position in range(self.offsets[i], self.offsets[i + 1]):
+                kind = self.edge_types[self.types[position]]
+                edges.append({'source': ids[i], 'target': ids[self.targets[position]], 'type': kind, 'label': kind,
+                              **self.edge_fields(position)})
+        return {
+            'nodes': [self.node(i) for i in range(self.node_count)],
+            'edges': edges,
+            'metadata': self.metadata,
+        }
+
+    def close(self):
+        # Release every view before the mapping itself
+        self._columns = self._sections = self._numeric = {}
+        self._string_offsets = self._string_data = self.offsets = self.targets = self.types = None
+        self._point_offsets = self._points = None
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
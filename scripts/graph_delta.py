@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Deltas between successive builds of the course graph.
+
+Every build that changes the graph gets the next version number. Its delta
+against the previous build lists only what changed:
+
+- nodes: ``removed`` ids, ``added`` nodes (with their index in the new
+  node list) and ``modified`` nodes (changed fields only, or the whole node
+  if its field order changed)
+- edges: the same, with an edge identified by ``[source, target, type, n]``
+  (``n`` tells duplicate edges apart)
+- the new ``metadata``, if it changed
+
+Each delta carries content hashes of the graph before and after, so a
+consumer can verify the result. The version chain lives in the graph's own
+metadata::
+
+    "version": 7,
+    "deltas": [{"from": 6, "to": 7, "file": "mit-ocw-deltas/v7.json",
+                "bytes": 1234, "sha256": "..."}, ...]
+
+The same chain is written to ``mit-ocw-deltas/index.json``, a small file a
+client can poll. A client holding version N applies the deltas
+``N+1 .. latest`` in order, or downloads the full graph if N is older than
+the chain (``MAX_CHAIN`` versions). Content hashes ignore these two
+metadata keys, so a rebuild that changes nothing keeps its version and
+produces byte-identical output.
+
+Usage:
+    python graph_delta.py diff OLD.json NEW.json [-o DELTA.json]
+    python graph_delta.py apply GRAPH.json DELTA.json [DELTA.json ...] -o OUT.json
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from graph_writer import AtomicWriter
+
+DELTA_VERSION = 1
+MAX_CHAIN = 30
+VERSION_KEYS = ('version', 'deltas')
+DELTA_DIR = 'mit-ocw-deltas'
+INDEX_NAME = 'index.json'
+
+
+def content_digest(graph: Dict) -> str:
+    """SHA-256 of a graph's content, ignoring version chain metadata."""
+    content = dict(graph)
+    content['metadata'] = {k: v for k, v in graph.get('metadata', {}).items() if k not in VERSION_KEYS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _edge_keys(edges: List[Dict]) -> List[Tuple]:
+    seen: Counter = Counter()
+    keys = []
+    for edge in edges:
+        key = (edge['source'], edge['target'], edge.get('type'))
+        keys.append(key + (seen[key],))
+        seen[key] += 1
+    return keys
+
+
+def _diff_items(old_items: List[Dict], old_keys: List, new_items: List[Dict], new_keys: List) -> Dict:
+    """Delta between two keyed lists of dicts."""
+    old = dict(zip(old_keys, old_items))
+    new_set = set(new_keys)
+    delta: Dict = {}
+    removed = [key for key in old_keys if key not in new_set]
+    added = [{'index': i, 'item': item} for i, (key, item) in enumerate(zip(new_keys, new_items)) if key not in old]
+    modified = []
+    for key, item in zip(new_keys, new_items):
+        before = old.get(key)
+        if before is None or (before == item and list(before) == list(item)):
+            continue
+        unset = [field for field in before if field not in item]
+        changed = {field: value for field, value in item.items() if before.get(field, object()) != value}
+        expected = [field for field in before if field in item] + [f for f in item if f not in before]
+        if expected == list(item):
+            modified.append({'key': key, 'set': changed, 'unset': unset})
+        else:
+            modified.append({'key': key, 'item': item})
+    if removed:
+        delta['removed'] = removed
+    if added:
+        delta['added'] = added
+    if modified:
+        delta['modified'] = modified
+    survivors_old = [key for key in old_keys if key in new_set]
+    survivors_new = [key for key in new_keys if key in old]
+    if survivors_old != survivors_new:
+        delta['order'] = new_keys
+    return delta
+
+
+def _apply_items(items: List[Dict], keys: List, delta: Dict) -> Tuple[List[Dict], List]:
+    """Apply a ``_diff_items`` delta; returns the new items and keys."""
+    removed = set(map(_key, delta.get('removed', [])))
+    by_key = {key: dict(item) for key, item in zip(keys, items) if key not in removed}
+    for change in delta.get('modified', []):
+        key = _key(change['key'])
+        if 'item' in change:
+            by_key[key] = change['item']
+        else:
+            item = by_key[key]
+            for field in change['unset']:
+                item.pop(field, None)
+            item.update(change['set'])
+    order = [key for key in keys if key not in removed]
+    added = delta.get('added', [])
+    for entry in added:
+        by_key[_key(entry['key'])] = entry['item']
+    if 'order' in delta:
+        order = [_key(key) for key in delta['order']]
+    else:
+        for entry in added:
+            order.insert(entry['index'], _key(entry['key']))
+    return [by_key[key] for key in order], order
+
+
+def _key(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+def diff_graphs(old: Dict, new: Dict) -> Dict:
+    """Compute the delta that turns graph ``old`` into graph ``new``."""
+    old_ids = [node['id'] for node in old.get('nodes', [])]
+    new_ids = [node['id'] for node in new.get('nodes', [])]
+    nodes = _diff_items(old.get('nodes', []), old_ids, new.get('nodes', []), new_ids)
+    edges = _diff_items(old.get('edges', []), _edge_keys(old.get('edges', [])),
+                        new.get('edges', []), _edge_keys(new.get('edges', [])))
+    # Added items also carry their key so they can be indexed on apply
+    for part, keys in ((nodes, new_ids), (edges, _edge_keys(new.get('edges', [])))):
+        for entry in part.get('added', []):
+            entry['key'] = keys[entry['index']]
+    delta = {
+        'format': DELTA_VERSION,
+        'from_sha256': content_digest(old),
+        'to_sha256': content_digest(new),
+        'nodes': nodes,
+        'edges': edges,
+    }
+    metadata = {k: v for k, v in new.get('metadata', {}).items() if k not in VERSION_KEYS}
+    if metadata != {k: v for k, v in old.get('metadata', {}).items() if k not in VERSION_KEYS}:
+        delta['metadata'] = metadata
+    return delta
+
+
+def apply_delta(graph: Dict, delta: Dict) -> Dict:
+    """Return ``graph`` with ``delta`` applied; raises ValueError on a hash mismatch."""
+    if content_digest(graph) != delta['from_sha256']:
+        raise ValueError("Delta does not apply to this graph (base content hash differs)")
+    nodes, _ = _apply_items(graph.get('nodes', []), [node['id'] for node in graph.get('nodes', [])],
+                            delta['nodes'])
+    edges, _ = _apply_items(graph.get('edges', []), _edge_keys(graph.get('edges', [])), delta['edges'])
+    metadata = copy.deepcopy(delta['metadata']) if 'metadata' in delta else {
+        k: v for k, v in graph.get('metadata', {}).items() if k not in VERSION_KEYS
+    }
+    if 'to_version' in delta:
+        metadata['version'] = delta['to_version']
+    result = {**graph, 'nodes': nodes, 'edges': edges, 'metadata': metadata}
+    if content_digest(result) != delta['to_sha256']:
+        raise ValueError("Applying the delta did not reproduce the expected graph")
+    return result
+
+
+def _read_graph(path: Path) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def stamp_version(graph: Dict, previous_path: Path, max_chain: int = MAX_CHAIN) -> Dict:
+    """Stamp ``graph`` with its version and delta chain, without writing anything.
+
+    ``previous_path`` is the graph file about to be replaced; it is read now,
+    before it is overwritten. Returns the pending update for
+    ``publish_version``, to be called once the new graph files are committed
+    so that the published chain never points at a graph that was not written.
+    """
+    previous = _read_graph(previous_path)
+    metadata = graph.setdefault('metadata', {})
+    for key in VERSION_KEYS:
+        metadata.pop(key, None)
+    old_meta = previous.get('metadata', {}) if previous else {}
+    directory = previous_path.parent / DELTA_DIR
+    if previous is not None and 'version' in old_meta and content_digest(previous) == content_digest(graph):
+        # Unchanged content keeps its version, so the output stays identical
+        metadata['version'], metadata['deltas'] = old_meta['version'], old_meta.get('deltas', [])
+        return {'directory': directory, 'changed': False, 'delta': None,
+                **{key: metadata[key] for key in VERSION_KEYS}}
+
+    chain = list(old_meta.get('deltas', [])) if previous else []
+    version = old_meta.get('version', 0) + 1 if previous else 1
+    delta = None
+    if previous is not None and 'version' in old_meta:
+        diff = diff_graphs(previous, graph)
+        diff['from_version'], diff['to_version'] = version - 1, version
+        text = json.dumps(diff, separators=(',', ':')).encode('utf-8')
+        name = f"v{version}.json"
+        delta = (name, text)
+        chain.append({'from': version - 1, 'to': version, 'file': f"{DELTA_DIR}/{name}",
+                      'bytes': len(text), 'sha256': hashlib.sha256(text).hexdigest()})
+    chain = chain[-max_chain:]
+    metadata['version'], metadata['deltas'] = version, chain
+    return {'directory': directory, 'changed': True, 'delta': delta, 'version': version, 'deltas': chain}
+
+
+def publish_version(update: Dict) -> Dict:
+    """Write the delta and ``index.json`` of a ``stamp_version`` update; returns the version metadata."""
+    if update['changed']:
+        directory = update['directory']
+        if update['delta'] is not None:
+            name, text = update['delta']
+            writer = AtomicWriter(directory / name)
+            writer.write(text)
+            writer.commit()
+        directory.mkdir(parents=True, exist_ok=True)
+        writer = AtomicWriter(directory / INDEX_NAME)
+        writer.write(json.dumps({'version': update['version'], 'deltas': update['deltas']}, indent=2).encode('utf-8'))
+        writer.commit()
+        kept = {Path(entry['file']).name for entry in update['deltas']}
+        for path in directory.glob('v*.json'):
+            if path.name not in kept:
+                path.unlink()
+    return {key: update[key] for key in VERSION_KEYS}
+
+
+def update_version_chain(graph: Dict, previous_path: Path, max_chain: int = MAX_CHAIN) -> Dict:
+    """``stamp_version`` and ``publish_version`` in one step, for callers that write the graph last."""
+    return publish_version(stamp_version(graph, previous_path, max_chain))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff course graphs or apply graph deltas")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    diff = subparsers.add_parser("diff", help="Write the delta between two graph files")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("-o", "--output", help="Delta file (default: stdout)")
+    apply = subparsers.add_parser("apply", help="Apply deltas to a graph file")
+    apply.add_argument("graph")
+    apply.add_argument("deltas", nargs="+")
+    apply.add_argument("-o", "--output", required=True, help="Output graph file")
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        delta = diff_graphs(_read_graph(Path(args.old)), _read_graph(Path(args.new)))
+        text = json.dumps(delta, separators=(',', ':'))
+        if args.output:
+            Path(args.output).write_text(text)
+        else:
+            print(text)
+        return
+
+    graph = _read_graph(Path(args.graph))
+    for path in args.deltas:
+        with open(path) as f:
+            graph = apply_delta(graph, json.load(f))
+    with open(args.output, 'w') as f:
+        json.dump(graph, f, indent=2)
+    print(f"Applied {len(args.deltas)} deltas; wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Indexed in-memory form of the course graph for analysis scripts.
+
+The JSON graph identifies courses by string id and lists edges as dicts,
+so every question asked of it is a pass over ``edges`` plus dict lookups.
+``GraphIndex`` maps course ids to integers once and stores the edges as
+NumPy arrays in CSR form for both directions:
+
+    out_offsets[i] .. out_offsets[i + 1]   slice of out_targets / out_edges
+    in_offsets[i]  .. in_offsets[i + 1]    slice of in_sources / in_edges
+
+``out_edges`` / ``in_edges`` give the position of each CSR entry in the
+original ``sources`` / ``targets`` / ``kinds`` edge arrays. Edges whose
+endpoints are not nodes are dropped.
+
+The algorithms below work on whole frontiers at a time, so their Python
+overhead grows with the number of BFS levels rather than with the number
+of nodes or edges.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PREREQUISITE = 'prerequisite'
+
+
+def csr(keys: np.ndarray, values: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group ``values`` by ``keys``: (offsets, grouped values, original positions)."""
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+    return offsets, values[order], order
+
+
+def gather(offsets: np.ndarray, values: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR neighbours of every node in ``frontier``: (values, the frontier node each came from)."""
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        return values[:0], frontier[:0]
+    # Position of each entry: its row's start plus its rank within the row
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return values[shift + np.arange(total)], np.repeat(frontier, counts)
+
+
+class _CompactNodes:
+    """Read-only sequence of node dicts decoded on access from a ``CompactGraph``."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self) -> int:
+        return self.graph.node_count
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.graph.node(i)
+
+
+class GraphIndex:
+    """Integer-indexed graph with CSR adjacency in both directions."""
+
+    # Every array attribute, e.g. for persisting an index (see graph_loader.py)
+    ARRAYS = ('sources', 'targets', 'kinds', 'out_offsets', 'out_targets', 'out_edges',
+              'in_offsets', 'in_sources', 'in_edges')
+
+    def __init__(self, ids: List[str], sources: np.ndarray, targets: np.ndarray,
+                 kinds: np.ndarray, edge_types: List[str], nodes: Optional[List[Dict]] = None,
+                 metadata: Optional[Dict] = None):
+        self.ids = ids
+        self.nodes = nodes
+        self.metadata = metadata or {}
+        self.position: Dict[str, int] = {course_id: i for i, course_id in enumerate(ids)}
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self.edge_types = edge_types
+        self._build_adjacency()
+
+    def _build_adjacency(self):
+        n = len(self.ids)
+        self.out_offsets, self.out_targets, self.out_edges = csr(self.sources, self.targets, n)
+        self.in_offsets, self.in_sources, self.in_edges = csr(self.targets, self.sources, n)
+
+    @classmethod
+    def from_graph(cls, graph: Dict) -> 'GraphIndex':
+        """Index a ``build_graph``-shaped dict (nodes are kept for attribute lookups)."""
+        nodes = graph.get('nodes', [])
+        ids = [node['id'] for node in nodes]
+        position = {course_id: i for i, course_id in enumerate(ids)}
+        edge_types: List[str] = []
+        type_code: Dict[str, int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+        kinds: List[int] = []
+        for edge in graph.get('edges', []):
+            source = position.get(edge['source'])
+            target = position.get(edge['target'])
+            if source is None or target is None:
+                continue
+            kind = edge.get('type')
+            if kind not in type_code:
+                type_code[kind] = len(edge_types)
+                edge_types.append(kind)
+            sources.append(source)
+            targets.append(target)
+            kinds.append(type_code[kind])
+        return cls(ids, np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64),
+                   np.array(kinds, dtype=np.uint8), edge_types, nodes, graph.get('metadata', {}))
+
+    @classmethod
+    def from_compact(cls, graph) -> 'GraphIndex':
+        """Index a memory-mapped ``graph_binary.CompactGraph``.
+
+        The edge arrays are copied out of the mapping, so that ``graph`` can be
+        closed once the index is no longer queried; node dicts are decoded
+        from the mapping on access.
+        """
+        offsets = np.asarray(graph.offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(graph.node_count, dtype=np.int64), np.diff(offsets))
+        ids = [graph.node_id(i) for i in range(graph.node_count)]
+        return cls(ids, sources, np.asarray(graph.targets, dtype=np.int64),
+                   np.array(graph.types, dtype=np.uint8), list(graph.edge_types), _CompactNodes(graph),
+                   graph.metadata)
+
+    @classmethod
+    def from_arrays(cls, ids: List[str], nodes: Optional[List[Dict]], edge_types: List[str],
+                    metadata: Dict, arrays: Dict[str, np.ndarray]) -> 'GraphIndex':
+        """Rebuild an index from its ``ARRAYS``, without recomputing the adjacency."""
+        index = cls.__new__(cls)
+        index.ids, index.nodes, index.edge_types, index.metadata = ids, nodes, edge_types, metadata
+        index.position = {course_id: i for i, course_id in enumerate(ids)}
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.sources)
+
+    def index_of(self, course_id: str) -> Optional[int]:
+        return self.position.get(course_id)
+
+    def node(self, i: int) -> Dict:
+        return self.nodes[i] if self.nodes is not None else {'id': self.ids[i]}
+
+    def _subset(self, keep: np.ndarray) -> 'GraphIndex':
+        index = GraphIndex.__new__(GraphIndex)
+        index.ids, index.nodes, index.position, index.metadata = self.ids, self.nodes, self.position, self.metadata
+        index.sources, index.targets, index.kinds = self.sources[keep], self.targets[keep], self.kinds[keep]
+        index.edge_types = self.edge_types
+        index._build_adjacency()
+        return index
+
+    def restrict(self, kind: str) -> 'GraphIndex':
+        """The same nodes with only the edges of type ``kind``."""
+        code = self.edge_types.index(kind) if kind in self.edge_types else -1
+        return self._subset(self.kinds == code)
+
+    def without_self_loops(self) -> 'GraphIndex':
+        return self._subset(self.sources != self.targets)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.out_offsets)
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.in_offsets)
+
+    def successors(self, i: int) -> np.ndarray:
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def predecessors(self, i: int) -> np.ndarray:
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+
+def weak_components(index: GraphIndex) -> np.ndarray:
+    """Label every node with the smallest node index in its weakly connected component.
+
+    Min-label hooking with pointer jumping: each round hooks the larger of
+    two differing roots under the smaller one, then compresses every label
+    to its root, so the number of rounds is logarithmic in practice.
+    """
+    labels = np.arange(index.node_count, dtype=np.int64)
+    u, v = index.sources, index.targets
+    while True:
+        lu, lv = labels[u], labels[v]
+        differ = lu != lv
+        if not differ.any():
+            return labels
+        np.minimum.at(labels, np.maximum(lu, lv)[differ], np.minimum(lu, lv)[differ])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def longest_paths(index: GraphIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """Layer the graph with Kahn's algorithm, one frontier at a time.
+
+    Returns ``(depth, parent)``: ``depth[i]`` is the length of the longest
+    path ending at ``i`` and ``parent[i]`` a predecessor on one such path
+    (-1 for sources). Nodes on or downstream of a cycle never become free
+    and keep depth -1.
+    """
+    n = index.node_count
+    remaining = index.in_degree()
+    depth = np.full(n, -1, dtype=np.int64)
+    parent = np.full(n, -1, dtype=np.int64)
+    frontier = np.flatnonzero(remaining == 0)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        targets, sources = gather(index.out_offsets, index.out_targets, frontier)
+        # The last write to a node comes from the round that frees it, i.e.
+        # from a predecessor at the deepest level
+        parent[targets] = sources
+        touched, counts = np.unique(targets, return_counts=True)
+        remaining[touched] -= counts
+        frontier = touched[remaining[touched] == 0]
+        level += 1
+    return depth, parent
+
+
+def chain_to(parent: np.ndarray, end: int) -> List[int]:
+    """Follow ``parent`` links back from ``end``; the chain is returned source first."""
+    chain = [end]
+    while parent[chain[-1]] >= 0:
+        chain.append(int(parent[chain[-1]]))
+    return chain[::-1]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Shared, cached loading of the course graph for analysis scripts.
+
+Parsing ``mit-ocw-graph.json`` dominates the runtime of every analysis on
+a large catalog. ``load_index`` parses it once into a ``GraphIndex`` and
+saves a binary snapshot of the result in ``../.cache/graph-snapshots/``
+(kept out of ``public/`` so that it is never deployed). The snapshot
+holds:
+- the nodes, pickled
+- the index's NumPy edge and CSR arrays, raw
+- the metadata and edge types
+
+It uses the sectioned container of graph_binary.py (magic ``OCWSNAP``).
+
+The snapshot is keyed by the source's mtime and size, plus its SHA-256:
+
+- same mtime and size: the snapshot is memory-mapped and used as is;
+- different mtime, same content hash (a touched or copied file): the
+  snapshot is used and its key refreshed;
+- anything else, or an unreadable snapshot: the JSON is parsed and the
+  snapshot rebuilt.
+
+Usage:
+    python graph_loader.py [graph.json] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from graph_binary import pack_sections, section_spans
+from graph_index import GraphIndex
+from graph_writer import AtomicWriter, file_digest
+
+SNAPSHOT_MAGIC = b'OCWSNAP\0'
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent.parent / '.cache' / 'graph-snapshots'
+GRAPH_PATHS = [
+    Path(__file__).parent.parent / 'public' / 'data' / 'mit-ocw-graph.json',
+    Path(__file__).parent.parent / 'data' / 'mit-ocw-graph.json',
+]
+# GraphIndex array -> section name (at most 8 characters)
+_SECTIONS = {
+    'sources': 'e.src', 'targets': 'e.dst', 'kinds': 'e.kind',
+    'out_offsets': 'o.off', 'out_targets': 'o.tgt', 'out_edges': 'o.edge',
+    'in_offsets': 'i.off', 'in_sources': 'i.src', 'in_edges': 'i.edge',
+}
+
+
+def find_graph() -> Path:
+    """The first existing graph file of ``GRAPH_PATHS``."""
+    for path in GRAPH_PATHS:
+        if path.exists():
+            return path
+    raise FileNotFoundError("Could not find mit-ocw-graph.json")
+
+
+def snapshot_path(source: Path, directory: Path = DEFAULT_SNAPSHOT_DIR) -> Path:
+    """Where the snapshot of ``source`` lives; distinct per source path."""
+    source = Path(source).resolve()
+    tag = hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:12]
+    return Path(directory) / f"{source.stem}-{tag}.snapshot"
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def save_snapshot(index: GraphIndex, path: Path, source: Dict):
+    """Write ``index`` as a snapshot; ``source`` is the key (mtime_ns, size, sha256)."""
+    meta = {
+        'source': source,
+        'edge_types': index.edge_types,
+        'metadata': index.metadata,
+        'dtypes': {name: getattr(index, name).dtype.str for name in _SECTIONS},
+    }
+    sections = [('meta', json.dumps(meta, separators=(',', ':')).encode('utf-8')),
+                ('nodes', pickle.dumps(list(index.nodes), protocol=pickle.HIGHEST_PROTOCOL))]
+    sections += [(section, np.ascontiguousarray(getattr(index, name)).tobytes())
+                 for name, section in _SECTIONS.items()]
+    with AtomicWriter(path) as writer:
+        writer.write(pack_sections(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sections))
+
+
+def open_snapshot(path: Path) -> Tuple[GraphIndex, Dict]:
+    """Map a snapshot; returns the index and the key it was saved with."""
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    spans = section_spans(mapping, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, path, 'graph snapshot')
+
+    def section(name: str) -> bytes:
+        offset, length = spans[name]
+        return mapping[offset:offset + length]
+
+    meta = json.loads(section('meta'))
+    nodes = pickle.loads(section('nodes'))
+    arrays = {}
+    for name, section_name in _SECTIONS.items():
+        offset, length = spans[section_name]
+        dtype = np.dtype(meta['dtypes'][name])
+        arrays[name] = np.frombuffer(mapping, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+    index = GraphIndex.from_arrays([node['id'] for node in nodes], nodes, meta['edge_types'],
+                                   meta['metadata'], arrays)
+    return index, meta['source']
+
+
+def load_index(path: Optional[Path] = None, snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+               verbose: bool = False) -> GraphIndex:
+    """Load the graph at ``path`` (default: ``find_graph()``) through its snapshot.
+
+    With ``snapshot_dir=None`` the JSON is always parsed and nothing is cached.
+    """
+    source = Path(path) if path else find_graph()
+    mtime_ns, size = _stamp(source)
+    if snapshot_dir is None:
+        with open(source) as f:
+            return GraphIndex.from_graph(json.load(f))
+
+    snapshot = snapshot_path(source, snapshot_dir)
+    digest = None
+    if snapshot.exists():
+        try:
+            index, key = open_snapshot(snapshot)
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError) as e:
+            if verbose:
+                print(f"Unreadable snapshot {snapshot} ({e}); rebuilding")
+        else:
+            if (key['mtime_ns'], key['size']) == (mtime_ns, size):
+                return index
+            digest = file_digest(source)
+            if key['sha256'] == digest:
+                save_snapshot(index, snapshot, {'mtime_ns': mtime_ns, 'size': size, 'sha256': digest})
+                return index
+            if verbose:
+                print(f"{source} changed; rebuilding its snapshot")
+
+    # Hash before parsing: a file replaced mid-parse then fails the next check
+    digest = digest or file_digest(source)
+    with open(source) as f:
+        index = GraphIndex.from_graph(json.load(f))
+    save_snapshot(index, snapshot, {'mtime_ns': mtime_ns, 'size': size, 'sha256': digest})
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check the cached snapshot of a graph file")
+    parser.add_argument("graph", nargs="?", help="Graph JSON file (default: ../public/data or ../data)")
+    parser.add_argument("--snapshot-dir", default=str(DEFAULT_SNAPSHOT_DIR), help="Snapshot directory")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the existing snapshot first")
+    args = parser.parse_args()
+
+    try:
+        source = Path(args.graph) if args.graph else find_graph()
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    snapshot = snapshot_path(source, Path(args.snapshot_dir))
+    if args.rebuild and snapshot.exists():
+        snapshot.unlink()
+    start = time.perf_counter()
+    with open(source) as f:
+        GraphIndex.from_graph(json.load(f))
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    load_index(source, Path(args.snapshot_dir), verbose=True)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    index = load_index(source, Path(args.snapshot_dir), verbose=True)
+    cached = time.perf_counter() - start
+    print(f"{source}: {index.node_count} courses, {index.edge_count} edges")
+    print(f"  snapshot: {snapshot} ({snapshot.stat().st_size / 1024:.0f} KiB)")
+    print(f"  parse JSON: {parsed * 1000:.1f} ms, first load: {first * 1000:.1f} ms, "
+          f"cached load: {cached * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
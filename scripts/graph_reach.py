@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Precomputed reachability (transitive closure) index for prerequisite queries.
+
+"Everything required before 18.06" is the set of ancestors of 18.06 over
+the prerequisite edges; "everything 18.01 unlocks" is its descendants.
+``ReachIndex`` answers both, and single "is A required before B" checks,
+without walking the graph.
+
+Courses are first collapsed into strongly connected components (members
+of a prerequisite cycle reach each other) and the components numbered in
+topological order. The closure is then stored in one of two forms:
+
+- ``bitset``: one packed bitset row per component for its descendants and
+  one for its ancestors (bit ``c`` of a row is component ``c``). A query is
+  a single row read; the size is ``2 * C * C / 8`` bytes.
+- ``interval``: when those bitsets would exceed ``--max-bitset-mb``, a
+  spanning forest of the components is numbered in post-order, so every
+  subtree is one interval of post numbers. Each component stores the
+  merged intervals of everything it reaches (its own subtree plus the
+  intervals of its successors); ancestors get the same labelling over the
+  reversed edges. Prerequisite graphs are close to forests, so most
+  components need only a few intervals, and a query returns whole runs of
+  the post-order.
+
+Self-loops are ignored. The index is written to a memory-mappable file
+(all integers little-endian, sections 8-byte aligned)::
+
+    magic    8 bytes   b'OCWREACH'
+    version  uint32
+    count    uint32    number of sections
+    table    count x (name: 8 bytes ASCII, offset: uint64, length: uint64)
+    sections ...
+
+``update`` brings an index in line with a new graph: if only prerequisite
+edges were added and none of them closes a cycle, the new edges are folded
+into the existing rows (every ancestor of A gains the descendants of B);
+any other change rebuilds the index.
+
+Usage:
+    python graph_reach.py build [graph.json] [--index PATH]
+    python graph_reach.py ancestors 18.06
+    python graph_reach.py descendants 18.01
+    python graph_reach.py reachable 18.01 18.06
+    python graph_reach.py bench
+"""
+
+import argparse
+import json
+import mmap
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from graph_analytics import strongly_connected_components
+from graph_binary import pack_sections, section_spans
+from graph_index import PREREQUISITE, GraphIndex, csr
+from graph_loader import find_graph
+from graph_writer import AtomicWriter
+
+MAGIC = b'OCWREACH'
+FORMAT_VERSION = 1
+DEFAULT_MAX_BITSET_BYTES = 256 * 1024 * 1024
+# Fold at most this many new edges into an index before rebuilding instead
+MAX_INCREMENTAL_EDGES = 1024
+# Derived data stays out of public/, so the site build never deploys it (see graph_loader.py)
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / '.cache' / 'mit-ocw-reach.bin'
+
+# Section name -> dtype; 2-D sections are reshaped from meta
+_DTYPES = {
+    'n.comp': '<i4', 'c.offset': '<i8', 'c.nodes': '<i4',
+    'e.src': '<i4', 'e.dst': '<i4',
+    'desc': 'u1', 'anc': 'u1',
+    'd.post': '<i4', 'd.order': '<i4', 'd.offset': '<i8', 'd.lo': '<i4', 'd.hi': '<i4',
+    'a.post': '<i4', 'a.order': '<i4', 'a.offset': '<i8', 'a.lo': '<i4', 'a.hi': '<i4',
+}
+
+
+def _prerequisite_edges(graph: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Node ids and the distinct prerequisite edges between them, without self-loops."""
+    index = GraphIndex.from_graph(graph).restrict(PREREQUISITE).without_self_loops()
+    n = max(index.node_count, 1)
+    keys = np.unique(index.sources * n + index.targets)
+    return index.ids, (keys // n).astype(np.int32), (keys % n).astype(np.int32)
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(s, e)`` for every pair."""
+    counts = ends - starts
+    total = int(counts.sum())
+    if total <= 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+
+
+def _merge_intervals(rows: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                     span: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge overlapping or adjacent ``[lo, hi]`` intervals of the same row.
+
+    Returns ``(rows, lo, hi)`` sorted by row and then by ``lo``. Offsetting
+    every row by ``span + 2`` lets one running maximum cover all rows.
+    """
+    order = np.lexsort((lo, rows))
+    rows, lo, hi = rows[order], lo[order], hi[order]
+    shift = rows.astype(np.int64) * (span + 2)
+    reach = np.maximum.accumulate(hi + shift)
+    start = np.ones(len(lo), dtype=bool)
+    start[1:] = lo[1:] + shift[1:] > reach[:-1] + 1
+    first = np.flatnonzero(start)
+    last = np.append(first[1:] - 1, len(lo) - 1)
+    return rows[first], lo[first], (reach[last] - shift[last]).astype(lo.dtype)
+
+
+class ReachIndex:
+    """Transitive closure of the prerequisite edges; see the module docstring."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict, source=None):
+        self.arrays = arrays
+        self.meta = meta
+        self.mode: str = meta['mode']
+        self.ids: List[str] = meta['ids']
+        self.position = {course_id: i for i, course_id in enumerate(self.ids)}
+        self._source = source  # the mmap backing ``arrays``, if any
+        for name, array in arrays.items():
+            setattr(self, name.replace('.', '_'), array)
+
+    # -- building ---------------------------------------------------------
+
+    @classmethod
+    def build(cls, graph: Dict, max_bitset_bytes: int = DEFAULT_MAX_BITSET_BYTES) -> 'ReachIndex':
+        ids, sources, targets = _prerequisite_edges(graph)
+        return cls._build(ids, sources, targets, max_bitset_bytes)
+
+    @classmethod
+    def _build(cls, ids: List[str], sources: np.ndarray, targets: np.ndarray,
+               max_bitset_bytes: int) -> 'ReachIndex':
+        n = len(ids)
+        offsets, grouped, _ = csr(sources, targets, n)
+        successors = [grouped[offsets[i]:offsets[i + 1]].tolist() for i in range(n)]
+        components = strongly_connected_components(successors)
+        # Tarjan emits sinks first; number components in topological order
+        count = len(components)
+        component = np.zeros(n, dtype=np.int32)
+        for c, members in enumerate(components):
+            component[members] = count - 1 - c
+        comp_offset, comp_nodes, _ = csr(component, np.arange(n, dtype=np.int32), count)
+
+        cs, ct = component[sources].astype(np.int64), component[targets].astype(np.int64)
+        keys = np.unique((cs * count + ct)[cs != ct])
+        cs, ct = keys // count, keys % count  # every condensed edge has cs < ct
+        succ_offset, succ, _ = csr(cs, ct, count)
+        pred_offset, pred, _ = csr(ct, cs, count)
+
+        arrays = {
+            'n.comp': component, 'c.offset': comp_offset, 'c.nodes': comp_nodes,
+            'e.src': sources.astype(np.int32), 'e.dst': targets.astype(np.int32),
+        }
+        meta = {'ids': ids, 'components': count}
+        width = (count + 7) // 8
+        if 2 * count * width <= max_bitset_bytes:
+            meta.update(mode='bitset', width=width)
+            arrays['desc'] = cls._bitset_rows(count, width, succ_offset, succ, reverse=True)
+            arrays['anc'] = cls._bitset_rows(count, width, pred_offset, pred, reverse=False)
+        else:
+            meta['mode'] = 'interval'
+            topological = range(count)
+            arrays.update(cls._interval_labels('d', count, pred_offset, pred, succ_offset, succ, reversed(topological)))
+            arrays.update(cls._interval_labels('a', count, succ_offset, succ, pred_offset, pred, topological))
+        return cls(arrays, meta)
+
+    @staticmethod
+    def _bitset_rows(count: int, width: int, offsets: np.ndarray, neighbours: np.ndarray,
+                     reverse: bool) -> np.ndarray:
+        """Reflexive closure rows, each the union of its (already final) neighbours' rows."""
+        rows = np.zeros((count, width), dtype=np.uint8)
+        for c in (range(count - 1, -1, -1) if reverse else range(count)):
+            start, end = offsets[c], offsets[c + 1]
+            if end > start:
+                np.bitwise_or.reduce(rows[neighbours[start:end]], axis=0, out=rows[c])
+            rows[c, c >> 3] |= 1 << (c & 7)
+        return rows
+
+    @staticmethod
+    def _interval_labels(prefix: str, count: int, parent_offset: np.ndarray, parents: np.ndarray,
+                         child_offset: np.ndarray, children: np.ndarray, order) -> Dict[str, np.ndarray]:
+        """Post-order interval labels over a spanning forest; ``order`` visits children first."""
+        tree_parent = np.full(count, -1, dtype=np.int64)
+        has_parent = parent_offset[1:] > parent_offset[:-1]
+        tree_parent[has_parent] = parents[parent_offset[:-1][has_parent]]
+        kid_offset, kids, _ = csr(tree_parent[has_parent], np.flatnonzero(has_parent), count)
+        post = np.zeros(count, dtype=np.int32)
+        low = np.zeros(count, dtype=np.int32)
+        counter = 0
+        for root in np.flatnonzero(~has_parent).tolist():
+            stack = [(root, False)]
+            while stack:
+                v, done = stack.pop()
+                if done:
+                    post[v] = counter
+                    counter += 1
+                    continue
+                low[v] = counter
+                stack.append((v, True))
+                stack.extend((k, False) for k in kids[kid_offset[v]:kid_offset[v + 1]].tolist())
+
+        los: List[np.ndarray] = [None] * count
+        his: List[np.ndarray] = [None] * count
+        for c in order:
+            own_lo, own_hi = np.array([low[c]], dtype=np.int32), np.array([post[c]], dtype=np.int32)
+            neighbours = children[child_offset[c]:child_offset[c + 1]].tolist()
+            if not neighbours:
+                los[c], his[c] = own_lo, own_hi
+                continue
+            lo = np.concatenate([own_lo] + [los[d] for d in neighbours])
+            hi = np.concatenate([own_hi] + [his[d] for d in neighbours])
+            _, los[c], his[c] = _merge_intervals(np.zeros(len(lo), dtype=np.int32), lo, hi, count)
+        offset = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(lo) for lo in los], out=offset[1:])
+        return {f'{prefix}.post': post, f'{prefix}.order': np.argsort(post).astype(np.int32),
+                f'{prefix}.offset': offset, f'{prefix}.lo': np.concatenate(los) if count else low,
+                f'{prefix}.hi': np.concatenate(his) if count else post}
+
+    def _intervals(self, prefix: str, c: int) -> Tuple[np.ndarray, np.ndarray]:
+        offset = self.arrays[f'{prefix}.offset']
+        start, end = offset[c], offset[c + 1]
+        return self.arrays[f'{prefix}.lo'][start:end], self.arrays[f'{prefix}.hi'][start:end]
+
+    def _interval_members(self, prefix: str, c: int) -> np.ndarray:
+        lo, hi = self._intervals(prefix, c)
+        return self.arrays[f'{prefix}.order'][_ranges(lo.astype(np.int64), hi.astype(np.int64) + 1)]
+
+    def _add_intervals(self, prefix: str, rows: np.ndarray, source: int):
+        """Give every component in ``rows`` the intervals of component ``source`` as well."""
+        offset = self.arrays[f'{prefix}.offset']
+        lo, hi = self._intervals(prefix, source)
+        count = len(offset) - 1
+        new_rows, new_lo, new_hi = _merge_intervals(
+            np.concatenate([np.repeat(np.arange(count), np.diff(offset)), np.repeat(rows, len(lo))]),
+            np.concatenate([self.arrays[f'{prefix}.lo'], np.tile(lo, len(rows))]),
+            np.concatenate([self.arrays[f'{prefix}.hi'], np.tile(hi, len(rows))]),
+            count)
+        offset = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(new_rows, minlength=count), out=offset[1:])
+        for name, array in (('offset', offset), ('lo', new_lo), ('hi', new_hi)):
+            self.arrays[f'{prefix}.{name}'] = array
+            setattr(self, f'{prefix}_{name}', array)
+
+    # -- component-level queries -----------------------------------------
+
+    def _unpack(self, row: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(row, bitorder='little', count=self.meta['components']))
+
+    def descendant_components(self, c: int) -> np.ndarray:
+        """Components reachable from component ``c``, including ``c``."""
+        if self.mode == 'bitset':
+            return self._unpack(self.desc[c])
+        return self._interval_members('d', c)
+
+    def ancestor_components(self, c: int) -> np.ndarray:
+        """Components that reach component ``c``, including ``c``."""
+        if self.mode == 'bitset':
+            return self._unpack(self.anc[c])
+        return self._interval_members('a', c)
+
+    def component_reaches(self, a: int, b: int) -> bool:
+        if self.mode == 'bitset':
+            return bool(self.desc[a, b >> 3] >> (b & 7) & 1)
+        lo, hi = self._intervals('d', a)
+        i = int(np.searchsorted(lo, self.d_post[b], side='right')) - 1
+        return i >= 0 and bool(hi[i] >= self.d_post[b])
+
+    # -- course-level queries --------------------------------------------
+
+    def _component_of(self, course_id: str) -> int:
+        if course_id not in self.position:
+            raise KeyError(f"Unknown course: {course_id}")
+        return int(self.n_comp[self.position[course_id]])
+
+    def _courses(self, components: np.ndarray, exclude: str) -> List[str]:
+        nodes = self.c_nodes[_ranges(self.c_offset[components], self.c_offset[components + 1])]
+        return [self.ids[i] for i in nodes.tolist() if self.ids[i] != exclude]
+
+    def ancestors(self, course_id: str) -> List[str]:
+        """Every course that is a (transitive) prerequisite of ``course_id``."""
+        return self._courses(self.ancestor_components(self._component_of(course_id)), course_id)
+
+    def descendants(self, course_id: str) -> List[str]:
+        """Every course that has ``course_id`` as a (transitive) prerequisite."""
+        return self._courses(self.descendant_components(self._component_of(course_id)), course_id)
+
+    def is_reachable(self, source_id: str, target_id: str) -> bool:
+        """Whether ``source_id`` is required, directly or transitively, before ``target_id``."""
+        a, b = self._component_of(source_id), self._component_of(target_id)
+        if source_id == target_id:
+            return bool(self.c_offset[a + 1] - self.c_offset[a] > 1)  # only within a cycle
+        return self.component_reaches(a, b)
+
+    # -- incremental update ----------------------------------------------
+
+    def update(self, graph: Dict, max_bitset_bytes: int = DEFAULT_MAX_BITSET_BYTES) -> Tuple['ReachIndex', str]:
+        """An index for ``graph``, and how it was obtained: unchanged, incremental or rebuilt."""
+        ids, sources, targets = _prerequisite_edges(graph)
+        if ids != self.ids:
+            return ReachIndex._build(ids, sources, targets, max_bitset_bytes), 'rebuilt'
+        n = max(len(ids), 1)
+        new_keys = sources.astype(np.int64) * n + targets
+        old_keys = self.e_src.astype(np.int64) * n + self.e_dst
+        if np.array_equal(new_keys, old_keys):
+            return self, 'unchanged'
+        added = np.setdiff1d(new_keys, old_keys, assume_unique=True)
+        if (len(added) + len(old_keys) != len(new_keys) or len(added) > MAX_INCREMENTAL_EDGES):
+            return ReachIndex._build(ids, sources, targets, max_bitset_bytes), 'rebuilt'
+
+        arrays = {name: np.array(array) for name, array in self.arrays.items()}
+        index = ReachIndex(arrays, dict(self.meta))
+        for key in added.tolist():
+            a, b = int(index.n_comp[key // n]), int(index.n_comp[key % n])
+            if a == b or index.component_reaches(a, b):
+                continue
+            if index.component_reaches(b, a):  # the edge closes a cycle
+                return ReachIndex._build(ids, sources, targets, max_bitset_bytes), 'rebuilt'
+            before, after = index.ancestor_components(a), index.descendant_components(b)
+            if index.mode == 'bitset':
+                index.desc[before] |= index.desc[b]
+                index.anc[after] |= index.anc[a]
+            else:
+                index._add_intervals('d', before, b)
+                index._add_intervals('a', after, a)
+        index.arrays['e.src'], index.arrays['e.dst'] = sources, targets
+        index.e_src, index.e_dst = sources, targets
+        return index, 'incremental'
+
+    # -- persistence -----------------------------------------------------
+
+    def save(self, path: Path) -> bool:
+        """Write the index atomically; returns False if the file was already identical."""
+        meta = json.dumps(self.meta, separators=(',', ':')).encode('utf-8')
+        sections = [(name, np.ascontiguousarray(array, dtype=_DTYPES[name]).tobytes())
+                    for name, array in self.arrays.items()] + [('meta', meta)]
+        with AtomicWriter(path) as writer:
+            writer.write(pack_sections(MAGIC, FORMAT_VERSION, sections))
+            return writer.commit()
+
+    @classmethod
+    def open(cls, path: Path) -> 'ReachIndex':
+        """Memory-map an index file; rows are paged in as queries touch them."""
+        path = Path(path)
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        spans = section_spans(mapping, MAGIC, FORMAT_VERSION, path, 'reachability index')
+        offset, length = spans.pop('meta')
+        meta = json.loads(mapping[offset:offset + length])
+        arrays = {}
+        for name, (offset, length) in spans.items():
+            dtype = np.dtype(_DTYPES[name])
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        for name in ('desc', 'anc'):
+            if name in arrays:
+                arrays[name] = arrays[name].reshape(meta['components'], meta['width'])
+        return cls(arrays, meta, mapping)
+
+    def close(self):
+        self.arrays = {}
+        for name in _DTYPES:
+            self.__dict__.pop(name.replace('.', '_'), None)
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def describe(self) -> str:
+        size = sum(array.nbytes for array in self.arrays.values())
+        shape = f"{len(self.d_lo) + len(self.a_lo)} intervals" if self.mode == 'interval' else 'bitsets'
+        return (f"{len(self.ids)} courses, {self.meta['components']} components, {len(self.e_src)} "
+                f"prerequisite edges; {shape}, {size / 1024:.0f} KiB")
+
+
+def build_or_update(graph: Dict, path: Path, full: bool = False,
+                    max_bitset_bytes: int = DEFAULT_MAX_BITSET_BYTES) -> Tuple[ReachIndex, str]:
+    """Bring the index at ``path`` in line with ``graph`` and write it."""
+    index: Optional[ReachIndex] = None
+    if not full and Path(path).exists():
+        try:
+            index = ReachIndex.open(path)
+        except ValueError:
+            index = None
+    if index is None:
+        updated, how = ReachIndex.build(graph, max_bitset_bytes), 'rebuilt'
+    else:
+        updated, how = index.update(graph, max_bitset_bytes)
+    if how != 'unchanged':
+        updated.save(path)
+    if index is not None and updated is not index:
+        index.close()
+    return updated, how
+
+
+def _bench(index: ReachIndex, rounds: int) -> Dict[str, float]:
+    rng = random.Random(0)
+    ids = index.ids
+    queries = {
+        'is_reachable': lambda: index.is_reachable(rng.choice(ids), rng.choice(ids)),
+        'ancestors': lambda: index.ancestors(rng.choice(ids)),
+        'descendants': lambda: index.descendants(rng.choice(ids)),
+    }
+    timings = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            query()
+        timings[name] = (time.perf_counter() - start) / rounds * 1e6
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the prerequisite reachability index")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX_PATH), help="Index file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Build the index, or update it incrementally")
+    build.add_argument("graph", nargs="?", help="Graph JSON file (default: ../public/data or ../data)")
+    build.add_argument("--full", action="store_true", help="Rebuild from scratch")
+    build.add_argument("--max-bitset-mb", type=float, default=DEFAULT_MAX_BITSET_BYTES / 2**20,
+                       help="Use interval labels when the bitsets would be larger (default: 256)")
+    for name, help_text in (("ancestors", "Every transitive prerequisite of a course"),
+                            ("descendants", "Every course a course unlocks")):
+        query = subparsers.add_parser(name, help=help_text)
+        query.add_argument("course")
+    reachable = subparsers.add_parser("reachable", help="Is SOURCE required before TARGET?")
+    reachable.add_argument("source")
+    reachable.add_argument("target")
+    bench = subparsers.add_parser("bench", help="Time random queries")
+    bench.add_argument("--rounds", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        try:
+            with open(args.graph or find_graph()) as f:
+                graph = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: Graph file not found at {args.graph or 'public/data or data'}")
+            print("Run 'python fetch_mit_ocw.py' to generate the graph first.")
+            sys.exit(1)
+        start = time.perf_counter()
+        index, how = build_or_update(graph, Path(args.index), args.full, int(args.max_bitset_mb * 2**20))
+        print(f"Reachability index {how} in {time.perf_counter() - start:.2f}s: {index.describe()}")
+        print(f"  {args.index}")
+        return
+
+    if not Path(args.index).exists():
+        print(f"Error: Reachability index not found at {args.index}")
+        print("Run 'python graph_reach.py build' to create it first.")
+        sys.exit(1)
+    with ReachIndex.open(Path(args.index)) as index:
+        try:
+            if args.command == "reachable":
+                found = index.is_reachable(args.source, args.target)
+                print(f"{args.source} is {'' if found else 'not '}required before {args.target}")
+                sys.exit(0 if found else 1)
+            elif args.command == "bench":
+                print(index.describe())
+                for name, micros in _bench(index, args.rounds).items():
+                    print(f"  {name}: {micros:.1f} µs/query")
+            else:
+                print('\n'.join(getattr(index, args.command)(args.course)))
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Local query server for the course graph.
+
+Analysis scripts re-parse ``mit-ocw-graph.json`` on every run. This server
+loads the graph once into a ``GraphIndex`` (from the JSON through its cached
+snapshot, see graph_loader.py, or memory-mapped from ``mit-ocw-graph.bin``)
+and answers lookups over HTTP on localhost:
+
+    GET /node/<id>                    the course, its prerequisites and dependents
+    GET /search?prefix=18.0&limit=20  courses whose id starts with a prefix
+    GET /ego/<id>?k=2&direction=both  every course within k hops, with the edges between them
+    GET /path?from=18.01&to=18.06     a shortest prerequisite chain between two courses
+    GET /department/<name>            a department's courses and the edges between them
+    GET /health                       graph size, load time and version
+
+Subgraphs come back in the graph file's own ``{"nodes", "edges"}`` shape.
+Every response carries an ``ETag`` made from the graph's content hash and
+the request, so a client revalidating with ``If-None-Match`` gets a bodiless
+``304`` until the graph changes. The graph file is polled for changes and
+reloaded in the background; requests already in flight finish on the
+snapshot they started with, and a replaced ``.bin`` is unmapped once they
+have. A file that fails to load is reported and the old graph kept.
+Encoded responses are memoized per snapshot, so repeated queries skip the
+work entirely.
+
+Usage:
+    python graph_server.py [graph.json|graph.bin] [--port 8765] [--poll 1.0] [--no-snapshot]
+"""
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from graph_binary import NONE, CompactGraph
+from graph_index import PREREQUISITE, GraphIndex, gather
+from graph_loader import DEFAULT_SNAPSHOT_DIR, load_index
+from graph_writer import file_digest
+
+DEFAULT_GRAPH_PATH = Path(__file__).parent.parent / 'public' / 'data' / 'mit-ocw-graph.json'
+DEFAULT_PORT = 8765
+MAX_HOPS = 6
+MAX_SUBGRAPH_NODES = 5000
+# Encoded responses kept per snapshot, least recently used first out
+RESPONSE_CACHE_SIZE = 1024
+
+
+class QueryError(Exception):
+    """A request that cannot be answered; carries the HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class GraphSnapshot:
+    """One loaded version of the graph file, with the lookups the server needs."""
+
+    def __init__(self, path: Path, snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR):
+        self.path = Path(path)
+        stat = self.path.stat()
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        self.digest = file_digest(self.path)[:16]
+        start = time.perf_counter()
+        self._compact: Optional[CompactGraph] = None
+        if self.path.suffix == '.bin':
+            compact = self._compact = CompactGraph(self.path)
+            self.index = GraphIndex.from_compact(compact)
+            self.metadata = compact.metadata
+            codes = np.asarray(compact.column('department'), dtype=np.int64)
+            names = {code: compact.string(code) for code in np.unique(codes).tolist()}
+            departments = [names[code] if code != NONE else None for code in codes.tolist()]
+        else:
+            self.index = load_index(self.path, snapshot_dir)
+            self.metadata = self.index.metadata
+            departments = [node.get('department') for node in self.index.nodes]
+        self.prerequisites = self.index.restrict(PREREQUISITE)
+        self.sorted_ids = sorted(self.index.ids)
+        by_department: Dict[str, List[int]] = {}
+        for i, department in enumerate(departments):
+            by_department.setdefault(department or 'Unknown', []).append(i)
+        self.departments = {name: np.array(members, dtype=np.int64) for name, members in by_department.items()}
+        self.load_seconds = time.perf_counter() - start
+        self._responses: 'OrderedDict[str, Tuple[int, bytes]]' = OrderedDict()
+        self._responses_lock = threading.Lock()
+        # Requests in flight on this snapshot; a retired snapshot is closed when the last one ends
+        self._users = 0
+        self._retired = False
+        self._users_lock = threading.Lock()
+
+    def acquire(self):
+        with self._users_lock:
+            self._users += 1
+
+    def release(self):
+        with self._users_lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """Mark this snapshot replaced; it is closed once no request is using it."""
+        with self._users_lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self.close()
+
+    def close(self):
+        """Unmap a memory-mapped ``.bin`` graph (JSON snapshots are freed with the object)."""
+        if self._compact is not None:
+            self._compact.close()
+            self._compact = None
+
+    def cached(self, request: str, render) -> Tuple[int, bytes]:
+        """``render()`` for ``request``, memoized; answers only depend on the snapshot."""
+        with self._responses_lock:
+            if request in self._responses:
+                self._responses.move_to_end(request)
+                return self._responses[request]
+        response = render()
+        with self._responses_lock:
+            self._responses[request] = response
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+    def _position(self, course_id: str) -> int:
+        i = self.index.index_of(course_id)
+        if i is None:
+            raise QueryError(404, f"Unknown course: {course_id}")
+        return i
+
+    def _edge(self, k: int) -> Dict:
+        kind = self.index.edge_types[self.index.kinds[k]]
+        return {'source': self.index.ids[self.index.sources[k]], 'target': self.index.ids[self.index.targets[k]],
+                'type': kind, 'label': kind}
+
+    def subgraph(self, members: np.ndarray, **extra) -> Dict:
+        """The courses in ``members`` and every edge between two of them."""
+        inside = np.zeros(self.index.node_count, dtype=bool)
+        inside[members] = True
+        edges, _ = gather(self.index.out_offsets, self.index.out_edges, members)
+        edges = np.sort(edges[inside[self.index.targets[edges]]])
+        return {'nodes': [self.index.node(i) for i in members.tolist()],
+                'edges': [self._edge(k) for k in edges.tolist()], **extra}
+
+    def node(self, course_id: str) -> Dict:
+        i = self._position(course_id)
+        index = self.index
+        incoming = index.in_edges[index.in_offsets[i]:index.in_offsets[i + 1]]
+        outgoing = index.out_edges[index.out_offsets[i]:index.out_offsets[i + 1]]
+        return {
+            'node': index.node(i),
+            'prerequisites': [{'id': index.ids[index.sources[k]], 'type': index.edge_types[index.kinds[k]]}
+                              for k in incoming.tolist()],
+            'dependents': [{'id': index.ids[index.targets[k]], 'type': index.edge_types[index.kinds[k]]}
+                           for k in outgoing.tolist()],
+        }
+
+    def search(self, prefix: str, limit: int) -> Dict:
+        start = bisect.bisect_left(self.sorted_ids, prefix)
+        matches = []
+        for course_id in self.sorted_ids[start:start + limit]:
+            if not course_id.startswith(prefix):
+                break
+            node = self.index.node(self.index.position[course_id])
+            matches.append({'id': course_id, 'title': node.get('title')})
+        return {'prefix': prefix, 'matches': matches}
+
+    def ego(self, course_id: str, hops: int, direction: str) -> Dict:
+        if direction not in ('in', 'out', 'both'):
+            raise QueryError(400, "direction must be in, out or both")
+        index = self.index
+        seen = np.zeros(index.node_count, dtype=bool)
+        frontier = np.array([self._position(course_id)], dtype=np.int64)
+        seen[frontier] = True
+        members = [frontier]
+        truncated = False
+        for _ in range(min(hops, MAX_HOPS)):
+            reached = []
+            if direction in ('out', 'both'):
+                reached.append(gather(index.out_offsets, index.out_targets, frontier)[0])
+            if direction in ('in', 'both'):
+                reached.append(gather(index.in_offsets, index.in_sources, frontier)[0])
+            frontier = np.unique(np.concatenate(reached))
+            frontier = frontier[~seen[frontier]]
+            if not frontier.size:
+                break
+            room = MAX_SUBGRAPH_NODES - sum(len(m) for m in members)
+            if frontier.size > room:
+                frontier, truncated = frontier[:room], True
+            seen[frontier] = True
+            members.append(frontier)
+            if truncated:
+                break
+        return self.subgraph(np.concatenate(members), center=course_id, truncated=truncated)
+
+    def prerequisite_path(self, source_id: str, target_id: str) -> Dict:
+        """Shortest chain of prerequisite edges from ``source_id`` to ``target_id`` (BFS)."""
+        index = self.prerequisites
+        source, target = self._position(source_id), self._position(target_id)
+        parent = np.full(index.node_count, -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        while frontier.size and parent[target] < 0:
+            targets, sources = gather(index.out_offsets, index.out_targets, frontier)
+            fresh = parent[targets] < 0
+            targets, first = np.unique(targets[fresh], return_index=True)
+            parent[targets] = sources[fresh][first]
+            frontier = targets
+        if parent[target] < 0:
+            raise QueryError(404, f"{source_id} is not a prerequisite of {target_id}")
+        chain = [target]
+        while chain[-1] != source:
+            chain.append(int(parent[chain[-1]]))
+        return {'from': source_id, 'to': target_id, 'path': [index.ids[i] for i in reversed(chain)]}
+
+    def department(self, name: str) -> Dict:
+        if name not in self.departments:
+            raise QueryError(404, f"Unknown department: {name}")
+        return self.subgraph(self.departments[name], department=name)
+
+    def health(self) -> Dict:
+        return {'path': str(self.path), 'courses': self.index.node_count, 'edges': self.index.edge_count,
+                'departments': len(self.departments), 'version': self.metadata.get('version'),
+                'digest': self.digest, 'load_seconds': round(self.load_seconds, 3)}
+
+
+class GraphService:
+    """Holds the current snapshot and swaps in a new one when the file changes."""
+
+    def __init__(self, path: Path, snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR):
+        self.path = Path(path)
+        self.snapshot_dir = snapshot_dir
+        self.snapshot = GraphSnapshot(self.path, snapshot_dir)
+        self._lock = threading.Lock()
+        # Guards taking a reference to the current snapshot against its replacement
+        self._swap_lock = threading.Lock()
+        self._failed_stamp: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+
+    def acquire(self) -> GraphSnapshot:
+        """The current snapshot, held until ``snapshot.release()``."""
+        with self._swap_lock:
+            snapshot = self.snapshot
+            snapshot.acquire()
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """Reload the graph if the file's mtime or size changed; returns True if it did."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp in (self.snapshot.stamp, self._failed_stamp):
+                return False
+            try:
+                snapshot = GraphSnapshot(self.path, self.snapshot_dir)
+            except Exception as e:  # a truncated or garbled file; keep serving the old graph
+                # Retried once the file changes again, not on every poll
+                self._failed_stamp = stamp
+                print(f"Reload of {self.path} failed: {type(e).__name__}: {e}")
+                return False
+            with self._swap_lock:
+                previous, self.snapshot = self.snapshot, snapshot
+            previous.retire()
+            print(f"Reloaded {self.path} ({snapshot.index.node_count} courses, {snapshot.load_seconds:.2f}s)")
+            return True
+
+    def watch(self, interval: float):
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception as e:  # never let one bad poll end hot reloading
+                    print(f"Checking {self.path} for changes failed: {type(e).__name__}: {e}")
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def answer(self, snapshot: GraphSnapshot, path: str, query: Dict[str, List[str]]) -> Dict:
+        def param(name: str, default: Optional[str] = None) -> str:
+            values = query.get(name)
+            if values:
+                return values[0]
+            if default is None:
+                raise QueryError(400, f"Missing query parameter: {name}")
+            return default
+
+        def number(name: str, default: int) -> int:
+            try:
+                return int(param(name, str(default)))
+            except ValueError:
+                raise QueryError(400, f"{name} must be an integer")
+
+        route, _, rest = path.strip('/').partition('/')
+        rest = unquote(rest)
+        if route == 'node' and rest:
+            return snapshot.node(rest)
+        if route == 'search':
+            return snapshot.search(param('prefix', ''), max(1, min(number('limit', 20), 1000)))
+        if route == 'ego' and rest:
+            return snapshot.ego(rest, max(0, number('k', 1)), param('direction', 'both'))
+        if route == 'path':
+            return snapshot.prerequisite_path(param('from'), param('to'))
+        if route == 'department' and rest:
+            return snapshot.department(rest)
+        if route == 'health':
+            return snapshot.health()
+        raise QueryError(404, f"No such endpoint: {path}")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+def make_server(service: GraphService, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """An HTTP server answering queries from ``service`` (not yet serving)."""
+
+    class GraphHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle on, keep-alive
+        # clients wait out a delayed ACK (~40 ms) on every response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            snapshot = service.acquire()
+            try:
+                self.respond(snapshot)
+            finally:
+                snapshot.release()
+
+        def respond(self, snapshot: GraphSnapshot):
+            etag = f'"{snapshot.digest}-{zlib.crc32(self.path.encode("utf-8")):08x}"'
+            if _etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status, body = snapshot.cached(self.path, lambda: self.render(snapshot))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 200:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def render(self, snapshot: GraphSnapshot) -> Tuple[int, bytes]:
+            url = urlsplit(self.path)
+            try:
+                status, payload = 200, service.answer(snapshot, url.path, parse_qs(url.query))
+            except QueryError as e:
+                status, payload = e.status, {'error': str(e)}
+            except Exception as e:  # report it rather than dropping the connection
+                status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+            return status, json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+        def log_message(self, format, *args):
+            pass
+
+    class GraphHTTPServer(ThreadingHTTPServer):
+        daemon_threads = True
+        # The default backlog of 5 drops SYNs when many clients connect at once
+        request_queue_size = 128
+
+    server = GraphHTTPServer((host, port), GraphHandler)
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve course graph queries over local HTTP")
+    parser.add_argument("graph", nargs="?", default=str(DEFAULT_GRAPH_PATH),
+                        help="Graph file: JSON, or .bin to memory-map the binary encoding")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--poll", type=float, default=1.0,
+                        help="Seconds between checks for a changed graph file (0 disables reloading)")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Parse a JSON graph directly instead of through its cached snapshot")
+    args = parser.parse_args()
+
+    service = GraphService(Path(args.graph), None if args.no_snapshot else DEFAULT_SNAPSHOT_DIR)
+    snapshot = service.snapshot
+    print(f"Loaded {args.graph}: {snapshot.index.node_count} courses, {snapshot.index.edge_count} edges "
+          f"in {snapshot.load_seconds:.2f}s")
+    if args.poll > 0:
+        service.watch(args.poll)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Department-sharded graph output for lazy loading in the frontend.
+
+The graph is split into one shard per department: the department's nodes
+and the edges between them. Edges that cross departments go into a single
+cross-shard file. Shard files are named after their content hash
+(``mathematics.3f2a9c01b7d4.json``), so they can be cached immutably. The
+small ``manifest.json`` lists every shard with its department, node and
+edge counts, byte size and hash; it is the only file whose name stays the
+same between builds. A build keeps the shards of the previous manifest
+next to its own, so a client that loaded the old manifest can still fetch
+its shards; they are removed by the build after.
+
+Layout of the output directory::
+
+    manifest.json
+    <department-slug>.<hash>.json   {"department", "nodes", "edges"}
+    cross.<hash>.json               {"edges"}
+"""
+
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from graph_writer import AtomicWriter
+
+SHARD_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+UNKNOWN_DEPARTMENT = 'Unknown'
+HASH_LENGTH = 12
+SHARD_FILE_PATTERN = re.compile(r'^[a-z0-9-]+\.[0-9a-f]{%d}\.json$' % HASH_LENGTH)
+
+
+def slugify(department: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', department.lower()).strip('-')
+    return slug or 'unknown'
+
+
+def shard_graph(graph: Dict) -> Tuple[Dict[str, Dict], List[Dict]]:
+    """Split a graph into per-department shards and the cross-shard edges.
+
+    Returns ``({department: {"department", "nodes", "edges"}}, cross_edges)``.
+    Nodes and edges keep their order from the graph.
+    """
+    shards: Dict[str, Dict] = {}
+    department_of: Dict[str, str] = {}
+    for node in graph.get('nodes', []):
+        department = node.get('department') or UNKNOWN_DEPARTMENT
+        department_of[node['id']] = department
+        shard = shards.setdefault(department, {'department': department, 'nodes': [], 'edges': []})
+        shard['nodes'].append(node)
+    cross_edges = []
+    for edge in graph.get('edges', []):
+        source, target = department_of.get(edge['source']), department_of.get(edge['target'])
+        if source is not None and source == target:
+            shards[source]['edges'].append(edge)
+        else:
+            cross_edges.append(edge)
+    return shards, cross_edges
+
+
+def _encode(data: Dict) -> Tuple[bytes, str]:
+    text = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return text, hashlib.sha256(text).hexdigest()
+
+
+def _write(directory: Path, name: str, text: bytes) -> bool:
+    writer = AtomicWriter(directory / name)
+    writer.write(text)
+    return writer.commit()
+
+
+def _manifest_files(path: Path) -> Set[str]:
+    """The shard files a manifest references; empty if there is none or it is unreadable."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        return {entry['file'] for entry in manifest['shards']} | {manifest['cross']['file']}
+    except (OSError, ValueError, KeyError, TypeError):
+        return set()
+
+
+def write_shards(graph: Dict, directory: Path) -> Dict:
+    """Write the sharded graph and its manifest into ``directory``.
+
+    Shards are written before the manifest that references them. Shard
+    files referenced by neither the new manifest nor the one it replaces
+    are removed afterwards. Returns the manifest.
+    """
+    directory = Path(directory)
+    previous = _manifest_files(directory / MANIFEST_NAME)
+    shards, cross_edges = shard_graph(graph)
+    department_of = {node['id']: shard['department'] for shard in shards.values() for node in shard['nodes']}
+    cross_count = Counter(department_of.get(edge[end]) for edge in cross_edges for end in ('source', 'target'))
+
+    entries = []
+    written = set()
+    for department in sorted(shards):
+        text, digest = _encode(shards[department])
+        name = f"{slugify(department)}.{digest[:HASH_LENGTH]}.json"
+        _write(directory, name, text)
+        written.add(name)
+        entries.append({
+            'department': department,
+            'file': name,
+            'nodes': len(shards[department]['nodes']),
+            'edges': len(shards[department]['edges']),
+            'cross_edges': cross_count[department],
+            'bytes': len(text),
+            'sha256': digest,
+        })
+    text, digest = _encode({'edges': cross_edges})
+    cross_name = f"cross.{digest[:HASH_LENGTH]}.json"
+    _write(directory, cross_name, text)
+    written.add(cross_name)
+
+    manifest = {
+        'version': SHARD_VERSION,
+        'metadata': graph.get('metadata', {}),
+        'shards': entries,
+        'cross': {'file': cross_name, 'edges': len(cross_edges), 'bytes': len(text), 'sha256': digest},
+    }
+    _write(directory, MANIFEST_NAME, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    keep = written | previous
+    for path in directory.iterdir():
+        if SHARD_FILE_PATTERN.match(path.name) and path.name not in keep:
+            path.unlink()
+    return manifest
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Crash-safe, streaming output files for the graph builder.
+
+``AtomicWriter`` streams data into a temporary file next to its target,
+optionally through a compressor, hashing it on the way. On commit the file
+is fsynced and renamed over the target, so readers (the Astro dev server, a
+concurrent build) see either the old file or the new one, never a torn one.
+When the new content hashes the same as the existing file, the temporary
+file is dropped and the target is left untouched, keeping its mtime so
+that nothing downstream is invalidated.
+
+``iter_json`` yields a graph's JSON in small pieces, byte-for-byte the same
+as ``json.dumps(graph, indent=2)``, so one serialization can feed several
+writers (plain and compressed) without the whole text in memory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def iter_json(graph: Dict) -> Iterator[str]:
+    """Yield ``json.dumps(graph, indent=2)`` piecewise, one list item at a time."""
+    if not graph:
+        yield '{}'
+        return
+    yield '{'
+    for n, (key, value) in enumerate(graph.items()):
+        yield (',\n  ' if n else '\n  ') + json.dumps(key) + ': '
+        if isinstance(value, list) and value:
+            for i, item in enumerate(value):
+                yield ('[\n    ' if i == 0 else ',\n    ') + json.dumps(item, indent=2).replace('\n', '\n    ')
+            yield '\n  ]'
+        else:
+            yield json.dumps(value, indent=2).replace('\n', '\n  ')
+    yield '\n}'
+
+
+class GzipCodec:
+    """Streaming gzip with a zeroed timestamp, so equal input gives equal bytes."""
+
+    def __init__(self, level: int = 9):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCodec:
+    """Streaming brotli; requires the optional ``brotli`` package."""
+
+    def __init__(self, quality: int = 11):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _fsync_dir(directory: Path):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicWriter:
+    """Write ``path`` through a temporary file; see the module docstring.
+
+    ``codec``, if given, compresses the data on its way to disk (an object
+    with ``compress(bytes)`` and ``flush()``, e.g. ``GzipCodec()``).
+    """
+
+    def __init__(self, path: Path, codec=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._file = open(self.tmp_path, 'wb')
+        self._digest = hashlib.sha256()
+        self._size = 0
+        self.digest: Optional[str] = None
+
+    def write(self, data: bytes):
+        if self.codec is not None:
+            data = self.codec.compress(data)
+        self._emit(data)
+
+    def _emit(self, data: bytes):
+        if data:
+            self._file.write(data)
+            self._digest.update(data)
+            self._size += len(data)
+
+    def commit(self) -> bool:
+        """Finish the file; returns False (and keeps the old file) if unchanged."""
+        if self.codec is not None:
+            self._emit(self.codec.flush())
+        self.digest = self._digest.hexdigest()
+        try:
+            unchanged = (self.path.exists() and self.path.stat().st_size == self._size
+                         and file_digest(self.path) == self.digest)
+            if not unchanged:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        except BaseException:
+            self.abort()
+            raise
+        self._file.close()
+        if unchanged:
+            self.tmp_path.unlink()
+            return False
+        os.replace(self.tmp_path, self.path)
+        _fsync_dir(self.path.parent)
+        return True
+
+    def abort(self):
+        """Discard the temporary file; the target is left as it was."""
+        self._file.close()
+        try:
+            self.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        elif not self._file.closed:
+            self.commit()
+
+
+def replicate(source: Path, target: Path, digest: Optional[str] = None) -> bool:
+    """Atomically make ``target`` a copy of ``source``, hardlinked where possible.
+
+    Returns False (leaving ``target`` untouched) if it already has the same
+    content. ``digest`` is the source's SHA-256, if already known.
+    """
+    source, target = Path(source), Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        if os.path.samefile(source, target):
+            return False
+        if file_digest(target) == (digest or file_digest(source)):
+            return False
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(source, tmp_path)
+    except OSError:  # cross-device, or no hardlink support
+        shutil.copyfile(source, tmp_path)
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    _fsync_dir(target.parent)
+    return True
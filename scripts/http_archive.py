@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Record and replay HTTP traffic for the OCW scraper.
+
+An archive is a zip file: ``index.json`` maps each requested URL to its
+status, a few headers and the SHA-256 of its body, and every distinct body
+is stored once, deflated, under ``bodies/``. Record one from a live crawl
+with ``RecordingAdapter`` and replay it offline either by mounting
+``ReplayAdapter`` on the scraper's session, or by serving it from a local
+stand-in HTTP server with ``serve_archive``.
+
+Usage:
+    python http_archive.py info ARCHIVE
+    python http_archive.py serve ARCHIVE [--port 8000] [--latency MS]
+"""
+
+import argparse
+import gzip
+import hashlib
+import http
+import io
+import json
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+ARCHIVE_VERSION = 1
+INDEX_NAME = 'index.json'
+# Response headers worth replaying; bodies are stored decoded, so
+# Content-Encoding and Content-Length are not among them
+KEPT_HEADERS = ('Content-Type', 'Location', 'ETag', 'Last-Modified')
+
+
+class ArchiveWriter:
+    """Write responses into a new archive as they are recorded."""
+
+    def __init__(self, path: Path, meta: Optional[Dict] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.meta = dict(meta or {})
+        self.entries: Dict[str, Dict] = {}
+        self._bodies = set()
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED)
+
+    def add(self, url: str, status: int, headers, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            if digest not in self._bodies:
+                self._zip.writestr(f"bodies/{digest}", body)
+                self._bodies.add(digest)
+            self.entries[url] = {
+                'status': status,
+                'headers': {name: headers[name] for name in KEPT_HEADERS if name in headers},
+                'body': digest,
+            }
+
+    def close(self):
+        """Write the index and finish the archive."""
+        with self._lock:
+            if self._zip is None:
+                return
+            self.meta.setdefault('recorded_at', time.time())
+            index = {'version': ARCHIVE_VERSION, 'meta': self.meta, 'entries': self.entries}
+            self._zip.writestr(INDEX_NAME, json.dumps(index))
+            self._zip.close()
+            self._zip = None
+
+
+class HTTPArchive:
+    """Read-only view of a recorded archive."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.path, 'r')
+        index = json.loads(self._zip.read(INDEX_NAME))
+        if index.get('version') != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {index.get('version')} in {self.path}")
+        self.meta: Dict = index.get('meta', {})
+        self.entries: Dict[str, Dict] = index['entries']
+
+    def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Return ``(status, headers, body)`` recorded for ``url``, or None."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        with self._lock:
+            body = self._zip.read(f"bodies/{entry['body']}")
+        return entry['status'], dict(entry['headers']), body
+
+    def origins(self):
+        """Distinct ``scheme://host`` prefixes of the recorded URLs."""
+        return sorted({'{0.scheme}://{0.netloc}'.format(urlsplit(url)) for url in self.entries})
+
+    def close(self):
+        with self._lock:
+            self._zip.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` that also writes every response into an archive.
+
+    Conditional request headers are dropped, so a 304 is never recorded in
+    place of the page.
+    """
+
+    def __init__(self, writer: ArchiveWriter, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    def send(self, request, **kwargs):
+        # Always record full bodies, even behind a revalidating cache
+        request.headers.pop('If-None-Match', None)
+        request.headers.pop('If-Modified-Since', None)
+        response = super().send(request, **kwargs)
+        # Reading the body here leaves it available to stream=True callers
+        self.writer.add(request.url, response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers requests from an archive.
+
+    URLs missing from the archive fail with ``requests.ConnectionError``,
+    as they would offline. ``latency`` (seconds) is added to every request
+    to simulate the network.
+    """
+
+    def __init__(self, archive: HTTPArchive, latency: float = 0.0):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = self.archive.get(request.url)
+        if recorded is None:
+            raise requests.ConnectionError(f"{request.url} is not in the archive", request=request)
+        status, headers, body = recorded
+        response = requests.Response()
+        response.status_code = status
+        try:
+            response.reason = http.HTTPStatus(status).phrase
+        except ValueError:
+            response.reason = ''
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers['Content-Length'] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def mount(session: requests.Session, adapter: BaseAdapter):
+    """Route all of a session's HTTP(S) traffic through ``adapter``."""
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def serve_archive(archive: HTTPArchive, host: str = '127.0.0.1', port: int = 0,
+                  latency: float = 0.0) -> ThreadingHTTPServer:
+    """Serve an archive over HTTP from a background thread.
+
+    Requests are matched on path and query. Absolute URLs of the recorded
+    origins in bodies (gzipped ones included) and ``Location`` headers are
+    rewritten to point at this server, so links (sitemap locs, redirects)
+    stay local. Use
+    ``server.rewrite(url)`` to map a recorded URL to its local address.
+    """
+    by_path: Dict[str, str] = {}
+    for url in archive.entries:
+        parts = urlsplit(url)
+        by_path.setdefault(parts.path + (f"?{parts.query}" if parts.query else ''), url)
+    origins = [origin.encode('utf-8') for origin in archive.origins()]
+
+    def rewrite_body(body: bytes) -> bytes:
+        # Gzipped bodies (.xml.gz sitemaps) are rewritten inside the gzip
+        gzipped = body[:2] == b'\x1f\x8b'
+        if gzipped:
+            body = gzip.decompress(body)
+        for origin in origins:
+            body = body.replace(origin, server.base_url.encode('utf-8'))
+        return gzip.compress(body, mtime=0) if gzipped else body
+
+    class ArchiveHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            url = by_path.get(self.path)
+            recorded = archive.get(url) if url else None
+            if recorded is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status, headers, body = recorded
+            body = rewrite_body(body)
+            if headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+                self.send_response(304)
+                self.send_header("ETag", headers['ETag'])
+                self.end_headers()
+                return
+            self.send_response(status)
+            for name, value in headers.items():
+                if name == 'Location':
+                    value = server.rewrite(value)
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), ArchiveHandler)
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+
+    def rewrite(url: str) -> str:
+        for origin in archive.origins():
+            if url.startswith(origin):
+                return server.base_url + url[len(origin):]
+        return url
+
+    server.rewrite = rewrite
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or serve a recorded HTTP archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    info = subparsers.add_parser("info", help="Summarize an archive")
+    info.add_argument("archive")
+    serve = subparsers.add_parser("serve", help="Serve an archive from a local HTTP server")
+    serve.add_argument("archive")
+    serve.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    serve.add_argument("--latency", type=float, default=0, help="Per-request latency in ms (default: 0)")
+    args = parser.parse_args()
+
+    archive = HTTPArchive(Path(args.archive))
+    if args.command == "info":
+        statuses: Dict[int, int] = {}
+        for entry in archive.entries.values():
+            statuses[entry['status']] = statuses.get(entry['status'], 0) + 1
+        print(f"{args.archive}: {len(archive.entries)} responses, "
+              f"{Path(args.archive).stat().st_size / 1e6:.1f} MB")
+        print(f"  origins: {', '.join(archive.origins())}")
+        print(f"  status: {', '.join(f'{status}={count}' for status, count in sorted(statuses.items()))}")
+        for key, value in sorted(archive.meta.items()):
+            print(f"  {key}: {value}")
+        return
+
+    server = serve_archive(archive, port=args.port, latency=args.latency / 1000)
+    print(f"Serving {args.archive} at {server.base_url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache for the OCW scraper.
+
+Response bodies are stored content-addressed (by SHA-256) under
+``<cache_dir>/objects/``; a small SQLite index maps each URL to its body
+digest and the validators (``ETag`` / ``Last-Modified``) the server sent.
+On later runs ``CachedSession`` turns GETs into conditional requests, and a
+``304 Not Modified`` is answered from disk without downloading the body.
+
+The cache also keeps a memo table so callers can store derived data (such as
+a parsed course) keyed by the digests of the bodies it was derived from, and
+a negative cache of URLs known to be missing (404/410) so they are not
+requested again until the entry expires.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+MAX_MEMOS = 50000
+# Known-missing URLs are rechecked after this long
+DEFAULT_MISSING_TTL = 30 * 24 * 3600
+
+
+@dataclass
+class CacheEntry:
+    """Index record for a cached response."""
+    url: str
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class ResponseCache:
+    """Content-addressed response store with size-bounded LRU eviction."""
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.directory / 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS memos (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS missing (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                checked REAL NOT NULL
+            );
+        """)
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for ``url`` and mark it recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, etag, last_modified, content_type FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return CacheEntry(url, *row)
+
+    def read_body(self, digest: str) -> Optional[bytes]:
+        """Read a stored body, or None if it has been evicted."""
+        try:
+            return self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def store(self, url: str, body: bytes, headers) -> str:
+        """Store a response body and its validators; return the body digest."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not known or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, path)
+                if not known:
+                    self._db.execute("INSERT INTO blobs (digest, size) VALUES (?, ?)", (digest, len(body)))
+                    self._total_bytes += len(body)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, digest, etag, last_modified, content_type, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, headers.get('ETag'), headers.get('Last-Modified'),
+                 headers.get('Content-Type'), time.time()),
+            )
+            self._evict()
+            self._db.commit()
+        return digest
+
+    def _evict(self):
+        """Drop least-recently-used responses until the store fits ``max_bytes``."""
+        while self._total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, digest FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            url, digest = row
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            shared = self._db.execute("SELECT 1 FROM responses WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if shared:
+                continue
+            size = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._total_bytes -= size[0] if size else 0
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def memo_key(*parts: Optional[str]) -> str:
+        """Build a memo key from URLs, digests and version strings."""
+        return hashlib.sha256('\0'.join(p or '' for p in parts).encode('utf-8')).hexdigest()
+
+    def get_memo(self, key: str) -> Optional[str]:
+        """Return a memoized value, or None if absent."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM memos WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE memos SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return row[0]
+
+    def put_memo(self, key: str, value: str):
+        """Memoize a value, pruning the oldest memos beyond ``MAX_MEMOS``."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO memos (key, value, last_access) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM memos WHERE key IN "
+                "(SELECT key FROM memos ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (MAX_MEMOS,),
+            )
+            self._db.commit()
+
+    def is_missing(self, url: str, max_age: float = DEFAULT_MISSING_TTL) -> bool:
+        """True if ``url`` was found missing within the last ``max_age`` seconds."""
+        with self._lock:
+            row = self._db.execute("SELECT checked FROM missing WHERE url = ?", (url,)).fetchone()
+        return row is not None and time.time() - row[0] < max_age
+
+    def mark_missing(self, url: str, status: int):
+        """Remember that ``url`` answered with a not-found ``status``."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO missing (url, status, checked) VALUES (?, ?, ?)",
+                (url, status, time.time()),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedSession(requests.Session):
+    """``requests.Session`` that revalidates GETs against a ``ResponseCache``.
+
+    Every response gets a ``content_digest`` attribute (SHA-256 of the body)
+    and a ``from_cache`` flag that is True when the body came from disk after
+    a ``304``. Streaming requests bypass the cache.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        super().__init__()
+        self.cache = cache
+
+    def request(self, method, url, **kwargs):
+        if self.cache is None or method.upper() != 'GET' or kwargs.get('stream'):
+            return super().request(method, url, **kwargs)
+
+        entry = self.cache.lookup(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        conditional = dict(headers)
+        if entry:
+            if entry.etag:
+                conditional['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                conditional['If-Modified-Since'] = entry.last_modified
+
+        response = super().request(method, url, headers=conditional, **kwargs)
+        if response.status_code == 304 and entry:
+            body = self.cache.read_body(entry.digest)
+            if body is not None:
+                response.status_code = 200
+                response.reason = 'OK'
+                response._content = body
+                if entry.content_type:
+                    response.headers['Content-Type'] = entry.content_type
+                response.content_digest = entry.digest
+                response.from_cache = True
+                return response
+            # Body was evicted underneath the index; fetch it again in full
+            response = super().request(method, url, headers=headers, **kwargs)
+
+        response.from_cache = False
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            response.content_digest = self.cache.store(url, response.content, response.headers)
+        else:
+            response.content_digest = hashlib.sha256(response.content).hexdigest()
+        return response
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Keyword tables compiled once, matched against text in a single pass.
+
+Analysis scripts classify records by looking for the keywords of several
+categories (colleges, multidisciplinary indicators, subject areas) in their
+text. Testing every keyword of every category with ``in`` costs
+O(keywords x text length) per record, and matches inside words: ``'ai'``
+is found in "chain" and ``'art'`` in "partial".
+
+``KeywordClassifier`` compiles all keywords of a table into one regular
+expression, shaped as a trie of the keywords so that its cost per
+character does not grow with the table. A keyword must stand as a whole
+word, in any case, optionally followed by a plural ``s``/``es``; the
+longest keyword at a position wins. A keyword ending in ``*`` is a stem
+instead: it matches any word that starts with it, so ``'mathemat*'``
+covers "mathematics", "Mathematical" and "mathematician" without letting
+``'ai'`` match "chain". One scan of a text then finds every keyword
+occurrence. A keyword that occurs whole inside another one
+(``'health'`` in ``'public health'``, ``'learning'`` in ``'machine
+learning'``) is reported along with it, as an automaton would. A keyword
+may belong to several categories (``'literature'``). Keywords that overlap
+without one containing the other are matched leftmost first; none of the
+tables in this repo have such pairs.
+
+    classifier = KeywordClassifier({'MATH': ['mathemat*', 'algebra'], ...})
+    classifier.hits("Linear algebra")   # {'MATH': [(7, 'algebra')]}
+    classifier.found("Mathematical")    # {'mathemat*'}
+    classifier.counts(text)             # {'MATH': 1}: distinct keywords per category
+    classifier.best(text, 'META')       # category with the most distinct keywords
+
+Usage (see bench_classifier.py for timings):
+    python keyword_classifier.py "text to classify" [more texts ...]
+"""
+
+import argparse
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """A regular expression matching any of ``keywords``, with common prefixes factored out.
+
+    ``re`` tries the alternatives of ``a|b|c`` one after the other at every
+    position; as a trie, a position that starts no keyword is rejected after
+    one character, so the cost no longer grows with the number of keywords.
+    Longer keywords are tried first. A stem (``'mathemat*'``) continues with
+    the rest of its word, tried after any longer keyword sharing its prefix.
+    """
+    trie: Dict[str, Dict] = {}
+    for keyword in keywords:
+        stem = keyword.endswith('*')
+        node = trie
+        for char in keyword[:-1] if stem else keyword:
+            node = node.setdefault(char, {})
+        node['*' if stem else ''] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char and char != '*']
+        if '*' in node:
+            branches.append(r'\w*')
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return emit(trie)
+
+
+def _word_pattern(keyword: str) -> str:
+    """The regular expression for one keyword, as the trie spells it."""
+    if keyword.endswith('*'):
+        return re.escape(keyword[:-1]) + r'\w*'
+    return re.escape(keyword) + '(?:e?s)?'
+
+
+class KeywordClassifier:
+    """Finds the keywords of several categories in text with one compiled pattern."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = {name: list(dict.fromkeys(keyword.lower() for keyword in keywords))
+                           for name, keywords in categories.items()}
+        owners: Dict[str, List[str]] = {}
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, []).append(name)
+        self._owners = owners
+        self.keywords = list(owners)
+        # Stems without their '*', longest first, to map a matched word back to its stem
+        self._stems = sorted((keyword[:-1] for keyword in self.keywords if keyword.endswith('*')),
+                             key=len, reverse=True)
+        # Matched word -> its stem keyword; only words that start with a stem get here
+        self._stem_words: Dict[str, Optional[str]] = {}
+        # The keyword (group 1) as a whole word, optionally pluralized
+        pattern = rf"(?<!\w)({_trie_pattern(self.keywords)})(?:e?s)?(?!\w)"
+        self._pattern = re.compile(pattern)
+        # For the rare text whose lowercase form has a different length ('İ'),
+        # so that positions still refer to the original text
+        self._folding_pattern = re.compile(pattern, re.IGNORECASE)
+        # keyword -> [(offset, keyword)] for the other keywords found whole inside it
+        self._nested: Dict[str, List[Tuple[int, str]]] = {}
+        for keyword in self.keywords:
+            if keyword.endswith('*'):  # a stem matches within a single word
+                continue
+            inner = [(match.start(), other) for other in self.keywords if other != keyword and other.rstrip('*') in keyword
+                     for match in re.finditer(rf"(?<!\w){_word_pattern(other)}(?!\w)", keyword)]
+            if inner:
+                self._nested[keyword] = sorted(inner)
+
+    def _keyword(self, word: str) -> Optional[str]:
+        """The keyword a matched word stands for: itself, or the stem it starts with."""
+        if word in self._owners:
+            return word
+        try:
+            return self._stem_words[word]
+        except KeyError:
+            pass
+        # None for a case-folded match, e.g. 'ſ' for 's'
+        keyword = next((stem + '*' for stem in self._stems if word.startswith(stem)), None)
+        self._stem_words[word] = keyword
+        return keyword
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """``(position, keyword)`` for every keyword occurrence in ``text``."""
+        owners = self._owners
+        nested = self._nested
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self._pattern.finditer(lowered)
+        else:
+            matches = self._folding_pattern.finditer(text)
+        for match in matches:
+            keyword = match.group(1).lower()
+            if keyword not in owners:
+                keyword = self._keyword(keyword)
+                if keyword is None:
+                    continue
+            start = match.start()
+            yield start, keyword
+            for offset, inner in nested.get(keyword, ()):
+                yield start + offset, inner
+
+    def found(self, text: str) -> Set[str]:
+        """The distinct keywords in ``text``: ``finditer`` without building match objects."""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            found = set(self._pattern.findall(lowered))
+        else:
+            found = {word.lower() for word in self._folding_pattern.findall(text)}
+        owners = self._owners
+        other = [word for word in found if word not in owners]
+        if other:
+            found.difference_update(other)
+            found.update(filter(None, map(self._keyword, other)))
+        for word in found & self._nested.keys():
+            found.update(inner for _, inner in self._nested[word])
+        return found
+
+    def hits(self, text: str) -> Dict[str, List[Tuple[int, str]]]:
+        """``{category: [(position, keyword), ...]}`` for the categories found in ``text``."""
+        found: Dict[str, List[Tuple[int, str]]] = {}
+        owners = self._owners
+        for position, keyword in self.finditer(text):
+            for name in owners[keyword]:
+                found.setdefault(name, []).append((position, keyword))
+        return found
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category found in ``text``, in table order."""
+        tally: Dict[str, int] = {}
+        owners = self._owners
+        for keyword in self.found(text):
+            for name in owners[keyword]:
+                tally[name] = tally.get(name, 0) + 1
+        return {name: tally[name] for name in self.categories if name in tally}
+
+    def best(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """The category with the most distinct keywords in ``text``; ties go to the earlier category."""
+        counts = self.counts(text)
+        if not counts:
+            return default
+        return max(counts.items(), key=lambda item: item[1])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify texts with the thesis college keyword table")
+    parser.add_argument("texts", nargs="+", help="Texts to classify")
+    args = parser.parse_args()
+
+    from fetch_phd_thesis_topics import COLLEGE_MAPPINGS
+
+    classifier = KeywordClassifier(COLLEGE_MAPPINGS)
+    for text in args.texts:
+        print(json.dumps({'text': text, 'college': classifier.best(text, 'META'),
+                          'hits': classifier.hits(text)}))
+
+
+if __name__ == "__main__":
+    main()
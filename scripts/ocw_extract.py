@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Extract course fields from MIT OCW pages.
+
+``extract_page`` parses a page with lxml and walks the tree once. Instead of
+calling ``get_text()`` on elements, it records where each element's text
+starts and ends inside the page text. The prerequisite and corequisite
+heuristics are then answered from those spans with precompiled patterns, so
+no element's text is materialized more than once.
+
+``extract_page_soup`` is the original BeautifulSoup implementation, which
+walks the parse tree several times per page. It is kept as the reference
+``extract_page`` must agree with (see bench_extract.py) and can be selected
+with ``fetch_mit_ocw.py --parser soup``.
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import lxml.html
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+from lxml import etree
+
+COURSE_ID_PATTERN = re.compile(r'(\d{2}\.\d{2,3}[A-Z]?)', re.IGNORECASE)
+
+GRADUATE_WORDS = ['graduate', 'graduate-level', 'grad']
+UNDERGRADUATE_WORDS = ['undergraduate', 'undergrad', 'freshman', 'sophomore', 'junior', 'senior']
+
+# Elements scanned for a prerequisite mention, and the ancestors whose text
+# is then searched for course numbers
+PREREQ_TAGS = frozenset(['p', 'div', 'li', 'td', 'th', 'span', 'strong', 'em'])
+PREREQ_CONTEXT_TAGS = frozenset(['div', 'section', 'article', 'td'])
+COREQ_TAGS = frozenset(['p', 'div', 'li', 'td', 'th'])
+COREQ_CONTEXT_TAGS = frozenset(['div', 'section', 'article'])
+SECTION_TAGS = frozenset(['section', 'div'])
+
+PREREQ_WORD = re.compile(r'\bprerequisite', re.I)
+PREREQ_ANY = re.compile(r'prerequisite', re.I)
+COREQ_WORD = re.compile(r'\bcorequisite', re.I)
+COREQ_ANY = re.compile(r'corequisite', re.I)
+PREREQ_LABEL = re.compile(r'prerequisite[s]?:', re.I)
+PREREQ_RUN = re.compile(r'prerequisite[s]?[:\s]+([^\.\n]+)', re.I)
+SECTION_CLASS = re.compile(r'course|syllabus|info', re.I)
+
+# BeautifulSoup gives strings inside these tags their own string type, which
+# get_text() on any other tag skips
+STRING_CONTAINER_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+# ...and collapses whitespace-only strings outside these to one character
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+@dataclass
+class PageInfo:
+    """Fields extracted from a single OCW page."""
+    title_text: Optional[str] = None  # text of the first <h1>, else <title>
+    description: Optional[str] = None
+    prerequisites: Set[str] = field(default_factory=set)
+    corequisites: Set[str] = field(default_factory=set)
+    level_hint: Optional[str] = None
+
+
+def course_ids(text: str, start: int = 0, end: Optional[int] = None) -> Set[str]:
+    """Find course IDs in ``text[start:end]`` without slicing it."""
+    if end is None:
+        end = len(text)
+    return {match.group(1).upper() for match in COURSE_ID_PATTERN.finditer(text, start, end)}
+
+
+def level_hint(text_lower: str) -> Optional[str]:
+    """Guess Graduate/Undergraduate from lowercased page text."""
+    if any(word in text_lower for word in GRADUATE_WORDS):
+        return 'Graduate'
+    if any(word in text_lower for word in UNDERGRADUATE_WORDS):
+        return 'Undergraduate'
+    return None
+
+
+def extract_page_soup(content: bytes) -> PageInfo:
+    """Extract page fields with BeautifulSoup (reference implementation)."""
+    soup = BeautifulSoup(content, 'html.parser')
+    info = PageInfo()
+
+    title_elem = soup.find('h1') or soup.find('title')
+    if title_elem:
+        info.title_text = title_elem.get_text()
+
+    # Method 1: Look for prerequisite text in various elements
+    for elem in soup.find_all(['p', 'div', 'li', 'td', 'th', 'span', 'strong', 'em']):
+        text = elem.get_text()
+        if re.search(r'\bprerequisite', text, re.I):
+            # Get surrounding context
+            parent = elem.find_parent(['div', 'section', 'article', 'td'])
+            if parent:
+                info.prerequisites |= course_ids(parent.get_text())
+
+    # Method 2: Look for "Prerequisites:" label followed by course numbers
+    for label in soup.find_all(string=re.compile(r'prerequisite[s]?:', re.I)):
+        parent = label.find_parent()
+        if parent:
+            info.prerequisites |= course_ids(parent.get_text())
+
+    # Method 3: Look in course info/syllabus sections
+    for section in soup.find_all(['section', 'div'], class_=re.compile(r'course|syllabus|info', re.I)):
+        text = section.get_text()
+        if 'prerequisite' in text.lower():
+            info.prerequisites |= course_ids(text)
+
+    # Method 4: Look for course numbers near prerequisite keywords in the full page
+    page_text = soup.get_text()
+    for match in re.finditer(r'prerequisite[s]?[:\s]+([^\.\n]+)', page_text, re.I):
+        info.prerequisites |= course_ids(match.group(1))
+
+    # Look for corequisites
+    for elem in soup.find_all(['p', 'div', 'li', 'td', 'th']):
+        text = elem.get_text()
+        if re.search(r'\bcorequisite', text, re.I):
+            parent = elem.find_parent(['div', 'section', 'article'])
+            if parent:
+                info.corequisites |= course_ids(parent.get_text())
+
+    desc_elem = soup.find('meta', {'name': 'description'})
+    if desc_elem:
+        info.description = desc_elem.get('content', '').strip()
+
+    info.level_hint = level_hint(page_text.lower())
+    return info
+
+
+class _Span:
+    """Position of an element's text within the text buffer of its kind.
+
+    ``kind`` is '' for ordinary elements, or the tag name for string
+    container tags such as <script>, whose text lives in a separate buffer.
+    """
+    __slots__ = ('kind', 'start', 'end')
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.end = start
+
+    def key(self) -> Tuple[str, int, int]:
+        return (self.kind, self.start, self.end)
+
+
+def _contains(span: _Span, any_pos: List[int], word_pos: List[int], length: int) -> bool:
+    """Whether a word-boundary match of a keyword lies inside ``span``.
+
+    ``word_pos`` holds matches with a word boundary in the full text. A match
+    starting exactly at the span start is a boundary within the span even if
+    it is not one in the full text, so ``any_pos`` is consulted for that case.
+    """
+    i = bisect_left(any_pos, span.start)
+    if i < len(any_pos) and any_pos[i] == span.start and span.start + length <= span.end:
+        return True
+    j = bisect_left(word_pos, span.start)
+    return j < len(word_pos) and word_pos[j] + length <= span.end
+
+
+def decode_html(content: bytes) -> str:
+    """Decode page bytes the way BeautifulSoup would for a typical page.
+
+    Tries a byte-order mark, then the declared charset, then UTF-8, then
+    windows-1252 (BeautifulSoup would also consult a charset detector when
+    none is declared, which rarely disagrees with UTF-8 and is slow).
+    """
+    data, encoding = EncodingDetector.strip_byte_order_mark(content)
+    declared = EncodingDetector.find_declared_encoding(data, is_html=True)
+    for candidate in (encoding, declared, 'utf-8', 'windows-1252'):
+        if candidate:
+            try:
+                return data.decode(candidate)
+            except (LookupError, UnicodeDecodeError):
+                continue
+    return data.decode('utf-8', 'replace')
+
+
+def extract_page(content: bytes) -> PageInfo:
+    """Extract page fields in a single lxml tree walk.
+
+    Produces the same result as ``extract_page_soup``.
+    """
+    info = PageInfo()
+    try:
+        root = lxml.html.document_fromstring(decode_html(content))
+    except (etree.ParserError, ValueError):
+        return info
+
+    buffers: Dict[str, List[str]] = {'': []}
+    lengths: Dict[str, int] = {'': 0}
+    containers: List[str] = []
+    preserve_depth = 0
+    open_spans: List[_Span] = []
+    prereq_context: List[_Span] = []
+    coreq_context: List[_Span] = []
+    prereq_checks: List[Tuple[_Span, _Span]] = []
+    coreq_checks: List[Tuple[_Span, _Span]] = []
+    sections: List[_Span] = []
+    label_parents: List[_Span] = []
+    first_h1 = first_title = None
+    document = _Span('', 0)
+
+    def add_text(text: str, parent: _Span):
+        if not preserve_depth and not text.strip(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        kind = containers[-1] if containers else ''
+        buffers.setdefault(kind, []).append(text)
+        lengths[kind] = lengths.get(kind, 0) + len(text)
+        if PREREQ_LABEL.search(text):
+            label_parents.append(parent)
+
+    def add_comment(node, parent: _Span):
+        # Comments never count towards get_text(), but a string search
+        # still matches them
+        if node.text and PREREQ_LABEL.search(node.text):
+            label_parents.append(parent)
+
+    for node in reversed(list(root.itersiblings(preceding=True))):
+        add_comment(node, document)
+
+    stack = [(root, False)]
+    while stack:
+        node, closing = stack.pop()
+        tag = node.tag
+        if not isinstance(tag, str):
+            add_comment(node, open_spans[-1] if open_spans else document)
+            if node.tail:
+                add_text(node.tail, open_spans[-1] if open_spans else document)
+            continue
+
+        if closing:
+            span = open_spans.pop()
+            span.end = lengths.get(span.kind, 0)
+            if tag in STRING_CONTAINER_TAGS:
+                containers.pop()
+            if tag in PRESERVE_WHITESPACE_TAGS:
+                preserve_depth -= 1
+            if tag in PREREQ_CONTEXT_TAGS:
+                prereq_context.pop()
+            if tag in COREQ_CONTEXT_TAGS:
+                coreq_context.pop()
+            if node.tail:
+                add_text(node.tail, open_spans[-1] if open_spans else document)
+            continue
+
+        if tag in STRING_CONTAINER_TAGS:
+            containers.append(tag)
+            span = _Span(tag, lengths.get(tag, 0))
+        else:
+            span = _Span('', lengths[''])
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            preserve_depth += 1
+
+        if tag in PREREQ_TAGS and prereq_context:
+            prereq_checks.append((span, prereq_context[-1]))
+        if tag in COREQ_TAGS and coreq_context:
+            coreq_checks.append((span, coreq_context[-1]))
+        if tag in PREREQ_CONTEXT_TAGS:
+            prereq_context.append(span)
+        if tag in COREQ_CONTEXT_TAGS:
+            coreq_context.append(span)
+        if tag in SECTION_TAGS and SECTION_CLASS.search(node.get('class') or ''):
+            sections.append(span)
+        if tag == 'h1' and first_h1 is None:
+            first_h1 = span
+        elif tag == 'title' and first_title is None:
+            first_title = span
+        elif tag == 'meta' and info.description is None and node.get('name') == 'description':
+            info.description = (node.get('content') or '').strip()
+
+        open_spans.append(span)
+        if node.text:
+            add_text(node.text, span)
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node))
+
+    for node in root.itersiblings():
+        add_comment(node, document)
+
+    text = ''.join(buffers[''])
+    document.end = len(text)
+    texts = {'': text}
+
+    def text_of(kind: str) -> str:
+        if kind not in texts:
+            texts[kind] = ''.join(buffers.get(kind, []))
+        return texts[kind]
+
+    lower = text.lower()
+    title_span = first_h1 or first_title
+    if title_span:
+        info.title_text = text[title_span.start:title_span.end]
+
+    # Spans whose course IDs count as prerequisites; several mentions usually
+    # share a context element, so each distinct span is scanned once
+    prereq_spans = set()
+
+    # Method 1: elements mentioning a prerequisite -> their context element
+    any_pos = [m.start() for m in PREREQ_ANY.finditer(text)]
+    word_pos = [m.start() for m in PREREQ_WORD.finditer(text)]
+    for span, context in prereq_checks:
+        if _contains(span, any_pos, word_pos, len('prerequisite')):
+            prereq_spans.add(context.key())
+
+    # Method 2: "Prerequisites:" strings -> their parent element
+    prereq_spans.update(parent.key() for parent in label_parents)
+
+    # Method 3: course/syllabus/info sections mentioning prerequisites
+    if len(lower) == len(text):
+        lower_pos = [m.start() for m in re.finditer('prerequisite', lower)]
+        for span in sections:
+            i = bisect_left(lower_pos, span.start)
+            if i < len(lower_pos) and lower_pos[i] + len('prerequisite') <= span.end:
+                prereq_spans.add(span.key())
+    else:
+        # Lowercasing changed some character's length, so offsets don't line up
+        for span in sections:
+            if 'prerequisite' in text[span.start:span.end].lower():
+                prereq_spans.add(span.key())
+
+    for kind, start, end in prereq_spans:
+        info.prerequisites |= course_ids(text_of(kind), start, end)
+
+    # Method 4: runs of text following a prerequisite keyword
+    for match in PREREQ_RUN.finditer(text):
+        info.prerequisites |= course_ids(text, match.start(1), match.end(1))
+
+    coreq_spans = set()
+    any_pos = [m.start() for m in COREQ_ANY.finditer(text)]
+    word_pos = [m.start() for m in COREQ_WORD.finditer(text)]
+    for span, context in coreq_checks:
+        if _contains(span, any_pos, word_pos, len('corequisite')):
+            coreq_spans.add(context.key())
+    for kind, start, end in coreq_spans:
+        info.corequisites |= course_ids(text_of(kind), start, end)
+
+    info.level_hint = level_hint(lower)
+    return info
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offering analysis for MIT OCW course URLs.
+
+OCW publishes many offerings of the same subject under different slugs,
+e.g. ``18-01-single-variable-calculus-fall-2006`` and
+``18-01sc-single-variable-calculus-fall-2010``. Every offering parses to the
+same course id, so fetching all of them only for later ones to overwrite
+earlier ones wastes requests. This module derives the course id, term and
+year from the slug alone, so one offering per course can be chosen before
+anything is fetched.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Same derivation as the URL fallback in MITOCWScraper.course_from_pages,
+# plus the letters that follow the number ("sc", "j", ...)
+SLUG_ID_PATTERN = re.compile(r'(\d+[-.]\d+)([a-z]*)', re.IGNORECASE)
+TERM_PATTERN = re.compile(r'-(january-iap|iap|spring|summer|fall|winter)-(\d{4})$', re.IGNORECASE)
+# Order of terms within a calendar year
+TERM_ORDER = {'january-iap': 0, 'iap': 0, 'winter': 0, 'spring': 1, 'summer': 2, 'fall': 3}
+
+POLICIES = ['all', 'latest', 'earliest', 'prefer-sc']
+
+
+@dataclass(frozen=True)
+class Offering:
+    """What a course URL's slug says about the offering it points to."""
+    url: str
+    course_id: Optional[str]
+    term: Optional[str] = None
+    year: Optional[int] = None
+    scholar: bool = False  # OCW Scholar ("SC") edition
+
+    @property
+    def when(self) -> Tuple[int, int]:
+        """Sort key for the offering's term; unknown terms sort first."""
+        return (self.year or 0, TERM_ORDER.get(self.term, -1))
+
+
+def parse_offering(url: str) -> Offering:
+    """Derive course id, term, year and Scholar flag from a course URL."""
+    slug = url.rstrip('/').rsplit('/', 1)[-1].lower()
+    course_id = None
+    scholar = False
+    match = SLUG_ID_PATTERN.search(slug)
+    if match:
+        course_id = match.group(1).replace('-', '.').upper()
+        scholar = 'sc' in match.group(2)
+    term = year = None
+    match = TERM_PATTERN.search(slug)
+    if match:
+        term, year = match.group(1), int(match.group(2))
+    return Offering(url, course_id, term, year, scholar)
+
+
+# For each policy, the offering with the largest key is kept; ties go to
+# the later URL in discovery order
+_POLICY_KEYS: Dict[str, Callable[[Offering], tuple]] = {
+    'latest': lambda o: o.when,
+    'earliest': lambda o: tuple(-part for part in o.when),
+    'prefer-sc': lambda o: (o.scholar, o.when),
+}
+
+
+def select_offerings(urls: List[str], policy: str = 'latest') -> Tuple[List[str], Dict[str, List[str]]]:
+    """Pick one URL per course id under ``policy``.
+
+    Returns the kept URLs, in their original order, and a map from each
+    kept URL to the other offerings of the same course. URLs whose slug
+    has no course id are always kept. Policy ``'all'`` keeps everything.
+    """
+    if policy == 'all':
+        return list(urls), {}
+    if policy not in _POLICY_KEYS:
+        raise ValueError(f"Unknown offering policy {policy!r} (expected one of {', '.join(POLICIES)})")
+    key = _POLICY_KEYS[policy]
+
+    groups: Dict[str, List[Tuple[int, Offering]]] = {}
+    kept = set()
+    for index, url in enumerate(urls):
+        offering = parse_offering(url)
+        if offering.course_id is None:
+            kept.add(url)
+        else:
+            groups.setdefault(offering.course_id, []).append((index, offering))
+
+    alternates: Dict[str, List[str]] = {}
+    for offerings in groups.values():
+        _, best = max(offerings, key=lambda item: (key(item[1]), item[0]))
+        kept.add(best.url)
+        others = [o.url for _, o in offerings if o.url != best.url]
+        if others:
+            alternates[best.url] = others
+    return [url for url in urls if url in kept], alternates
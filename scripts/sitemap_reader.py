@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for XML sitemaps and sitemap indexes.
+
+Sitemaps are parsed incrementally with a pull parser straight off the HTTP
+response, so a large ``urlset`` is never held in memory as a whole. Bodies
+are transparently gunzipped, whether the server sent them with
+``Content-Encoding: gzip`` or as ``.xml.gz`` files.
+
+Child sitemaps listed in a ``sitemapindex`` are fetched concurrently on a
+small thread pool, but entries are yielded in document order (children are
+expanded in place), so the output is the same as a serial depth-first walk.
+"""
+
+import itertools
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Set
+
+# Nested sitemap indexes deeper than this are not followed
+MAX_DEPTH = 4
+# Entries buffered behind a child sitemap that is still being fetched
+MAX_BUFFERED = 10000
+
+_END = object()
+
+
+@dataclass
+class SitemapEntry:
+    """A ``<url>`` or ``<sitemap>`` entry from a sitemap document."""
+    loc: str
+    lastmod: Optional[str] = None
+    kind: str = 'url'  # 'url' or 'sitemap'
+
+
+def iter_body(response, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield a streamed response body in chunks, gunzipping ``.xml.gz`` payloads.
+
+    ``Content-Encoding: gzip`` is already undone by ``requests``; a body that
+    still starts with the gzip magic number is a gzipped file.
+    """
+    decompressor = None
+    for chunk in response.iter_content(chunk_size):
+        if decompressor is None:
+            decompressor = zlib.decompressobj(wbits=31) if chunk[:2] == b'\x1f\x8b' else False
+        yield decompressor.decompress(chunk) if decompressor else chunk
+
+
+def parse_entries(chunks: Iterable[bytes]) -> Iterator[SitemapEntry]:
+    """Incrementally parse ``<url>`` and ``<sitemap>`` entries from sitemap bytes.
+
+    Only ``<loc>`` and ``<lastmod>`` directly inside an entry are read, so
+    extension elements such as ``<image:loc>`` are ignored. Processed
+    entries are cleared from the tree as parsing proceeds.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    depth = 0
+    loc = lastmod = None
+    for chunk in itertools.chain(chunks, (None,)):
+        if chunk is None:
+            parser.close()
+        else:
+            parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                continue
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if depth == 3 and tag == 'loc':
+                loc = (elem.text or '').strip()
+            elif depth == 3 and tag == 'lastmod':
+                lastmod = (elem.text or '').strip() or None
+            elif depth == 2:
+                if tag in ('url', 'sitemap') and loc:
+                    yield SitemapEntry(loc, lastmod, tag)
+                loc = lastmod = None
+                root.clear()
+            depth -= 1
+
+
+class SitemapReader:
+    """Walk a sitemap tree, following child sitemaps concurrently.
+
+    ``get`` is called as ``get(url, stream=True, timeout=...)`` and must
+    return a ``requests.Response``. ``follow`` decides whether a child
+    sitemap is fetched and expanded; child sitemaps that are not followed
+    are yielded as entries of kind ``'sitemap'``.
+    """
+
+    def __init__(self, get: Callable, workers: int = 4, follow: Optional[Callable[[str], bool]] = None,
+                 timeout: float = 60):
+        self.get = get
+        self.workers = max(1, workers)
+        self.follow = follow or (lambda loc: True)
+        self.timeout = timeout
+
+    def iter_entries(self, url: str) -> Iterator[SitemapEntry]:
+        """Yield every entry reachable from the sitemap at ``url``.
+
+        The root document is streamed on the calling thread; child sitemaps
+        are read on the pool. Closing the iterator early cancels pending
+        child fetches.
+        """
+        seen = {url}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            yield from self._expand(self._stream(url), executor, seen, depth=0)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _expand(self, entries: Iterator[SitemapEntry], executor: ThreadPoolExecutor,
+                seen: Set[str], depth: int) -> Iterator[SitemapEntry]:
+        """Yield ``entries`` in order, splicing in the contents of child sitemaps."""
+        window: Deque = deque()
+        pending = 0
+        for entry in itertools.chain(entries, (_END,)):
+            if entry is not _END:
+                if entry.kind == 'sitemap' and depth < MAX_DEPTH and self.follow(entry.loc):
+                    if entry.loc in seen:
+                        continue
+                    seen.add(entry.loc)
+                    window.append(executor.submit(self._read, entry.loc))
+                    pending += 1
+                else:
+                    window.append(entry)
+            # Release the finished prefix; block on the oldest child sitemap
+            # only once too much is waiting behind it (or the input is done)
+            while window:
+                head = window[0]
+                if isinstance(head, Future):
+                    blocked = entry is _END or pending > self.workers or len(window) > MAX_BUFFERED
+                    if not (blocked or head.done()):
+                        break
+                    window.popleft()
+                    pending -= 1
+                    yield from self._expand(iter(head.result()), executor, seen, depth + 1)
+                else:
+                    yield window.popleft()
+
+    def _stream(self, url: str) -> Iterator[SitemapEntry]:
+        """Stream entries from one sitemap document."""
+        print(f"    Fetching sitemap: {url}")
+        response = self.get(url, stream=True, timeout=self.timeout)
+        with closing(response):
+            if response.status_code != 200:
+                print(f"    Sitemap {url} returned HTTP {response.status_code}")
+                return
+            yield from parse_entries(iter_body(response))
+
+    def _read(self, url: str) -> List[SitemapEntry]:
+        """Read a child sitemap on a worker thread.
+
+        The protocol caps a sitemap at 50,000 entries, so a child's entries
+        are collected in full before being handed back.
+        """
+        try:
+            return list(self._stream(url))
+        except Exception as e:
+            print(f"    Sitemap error ({url}): {e}")
+            return []
@@ -1,154 +1,212 @@
 #!/usr/bin/env python3
 """
 Generate statistics about the MIT OCW course graph.
+
+The graph is loaded through the shared snapshot cache (graph_loader.py)
+as a ``graph_index.GraphIndex``, and every statistic is computed with
+vectorized passes over its CSR arrays, so this stays fast on catalogs with
+millions of courses.
+
+Usage:
+    python stats.py [graph.json] [--json] [--no-snapshot]
 """
 
+import argparse
 import json
 import sys
-from collections import defaultdict
-from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
 
-def analyze_graph(graph_path: str):
-    """Analyze the graph and print statistics."""
-    try:
-        with open(graph_path, 'r') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: Graph file not found at {graph_path}")
-        print("Run 'python fetch_mit_ocw.py' to generate the graph first.")
-        sys.exit(1)
-    
-    nodes = data.get('nodes', [])
-    edges = data.get('edges', [])
-    metadata = data.get('metadata', {})
-    
-    # Basic statistics
+import numpy as np
+
+from graph_index import PREREQUISITE, GraphIndex, chain_to, longest_paths, weak_components
+from graph_loader import DEFAULT_SNAPSHOT_DIR, load_index
+
+COREQUISITE = 'corequisite'
+
+
+def _distribution(values: np.ndarray) -> Dict[int, int]:
+    """``{value: count}`` for the values that occur."""
+    counts = np.bincount(values) if values.size else np.zeros(0, dtype=np.int64)
+    return {int(value): int(counts[value]) for value in np.flatnonzero(counts)}
+
+
+def _course(index: GraphIndex, i: int) -> Dict:
+    node = index.node(i)
+    return {'id': node['id'], 'title': node.get('title') or node['id']}
+
+
+def graph_statistics(index: GraphIndex, top: int = 5) -> Dict:
+    """Compute every statistic of an indexed graph into a JSON-serializable report."""
+    nodes = index.nodes
+    metadata = index.metadata
+    prerequisites = index.restrict(PREREQUISITE)
+    corequisites = index.restrict(COREQUISITE)
+
+    departments = Counter(node.get('department') or 'Unknown' for node in nodes)
+    levels = Counter(node.get('level') or 'Unknown' for node in nodes)
+
+    prereq_in = prerequisites.in_degree()
+    prereq_out = prerequisites.out_degree()
+    with_prereqs = np.flatnonzero(prereq_in)
+    most = with_prereqs[np.argsort(-prereq_in[with_prereqs], kind='stable')[:top]]
+
+    labels = weak_components(index)
+    _, sizes = np.unique(labels, return_counts=True)
+    sizes = np.sort(sizes)[::-1]
+
+    # Self-loops are misparsed prerequisites; they would leave the course unlayered
+    depth, parent = longest_paths(prerequisites.without_self_loops())
+    layered = depth[depth >= 0]
+    chain = chain_to(parent, int(np.argmax(depth))) if layered.size else []
+
+    return {
+        'courses': len(nodes),
+        'edges': index.edge_count,
+        'prerequisite_relationships': metadata.get('total_prerequisites', 0),
+        'corequisite_relationships': metadata.get('total_corequisites', 0),
+        'departments': dict(departments.most_common()),
+        'levels': dict(levels.most_common()),
+        'prerequisites': {
+            'courses_with': int(with_prereqs.size),
+            'courses_without': int(index.node_count - with_prereqs.size),
+            'max': int(prereq_in.max()) if with_prereqs.size else 0,
+            'mean': float(prereq_in[with_prereqs].mean()) if with_prereqs.size else 0.0,
+            'most': [{**_course(index, i), 'prerequisites': int(prereq_in[i])} for i in most],
+            'in_degree': _distribution(prereq_in),
+            'out_degree': _distribution(prereq_out),
+        },
+        'corequisites': {
+            'courses_with': int(np.count_nonzero(corequisites.in_degree())),
+            'relationships': corequisites.edge_count,
+        },
+        'connectivity': {
+            'entry_points': [index.ids[i] for i in np.flatnonzero(index.in_degree() == 0)],
+            'end_points': [index.ids[i] for i in np.flatnonzero(index.out_degree() == 0)],
+            'components': int(sizes.size),
+            'largest_component': int(sizes[0]) if sizes.size else 0,
+            'isolated_courses': int(np.count_nonzero((index.in_degree() == 0) & (index.out_degree() == 0))),
+            'component_sizes': _distribution(sizes),
+        },
+        'depth': {
+            'histogram': _distribution(layered),
+            'unlayered_courses': int(index.node_count - layered.size),
+            'longest_chain': [index.ids[i] for i in chain],
+        },
+    }
+
+
+def _print_list(ids: List[str], limit: int = 10):
+    if ids and len(ids) <= limit:
+        print(f"    {', '.join(ids)}")
+
+
+def print_statistics(stats: Dict, department_courses: Dict[str, List[str]]):
+    """Print a report from ``graph_statistics`` in human-readable form."""
     print("=" * 60)
     print("MIT OpenCourseWare Course Graph Statistics")
     print("=" * 60)
     print()
-    
+
     print("📊 Overall Statistics")
-    print(f"  Total Courses: {len(nodes)}")
-    print(f"  Total Edges: {len(edges)}")
-    print(f"  Prerequisite Relationships: {metadata.get('total_prerequisites', 0)}")
-    print(f"  Corequisite Relationships: {metadata.get('total_corequisites', 0)}")
+    print(f"  Total Courses: {stats['courses']}")
+    print(f"  Total Edges: {stats['edges']}")
+    print(f"  Prerequisite Relationships: {stats['prerequisite_relationships']}")
+    print(f"  Corequisite Relationships: {stats['corequisite_relationships']}")
     print()
-    
-    # Department breakdown
-    dept_counts = defaultdict(int)
-    dept_courses = defaultdict(list)
-    
-    for node in nodes:
-        dept = node.get('department') or 'Unknown'
-        dept_counts[dept] += 1
-        dept_courses[dept].append(node['id'])
-    
+
     print("📚 Courses by Department")
-    if dept_counts:
-        for dept, count in sorted(dept_counts.items(), key=lambda x: -x[1]):
+    if stats['departments']:
+        for dept, count in stats['departments'].items():
             print(f"  {dept}: {count} courses")
-            if count <= 10:  # Show course IDs for small departments
-                print(f"    {', '.join(dept_courses[dept])}")
+            _print_list(department_courses[dept])  # Show course IDs for small departments
     else:
         print("  No department information available")
     print()
-    
-    # Level breakdown
-    level_counts = defaultdict(int)
-    for node in nodes:
-        level = node.get('level') or 'Unknown'
-        level_counts[level] += 1
-    
+
     print("🎓 Courses by Level")
-    if level_counts:
-        for level, count in sorted(level_counts.items(), key=lambda x: -x[1]):
+    if stats['levels']:
+        for level, count in stats['levels'].items():
             print(f"  {level}: {count} courses")
     else:
         print("  No level information available")
     print()
-    
-    # Prerequisite analysis
-    prereq_counts = defaultdict(int)
-    for edge in edges:
-        if edge.get('type') == 'prerequisite':
-            target = edge.get('target')
-            prereq_counts[target] += 1
-    
+
+    prereqs = stats['prerequisites']
     print("🔗 Prerequisite Analysis")
-    if prereq_counts:
-        courses_with_prereqs = len(prereq_counts)
-        courses_without_prereqs = len(nodes) - courses_with_prereqs
-        print(f"  Courses with prerequisites: {courses_with_prereqs}")
-        print(f"  Courses without prerequisites: {courses_without_prereqs}")
-        
-        if prereq_counts:
-            max_prereqs = max(prereq_counts.values())
-            avg_prereqs = sum(prereq_counts.values()) / len(prereq_counts)
-            print(f"  Maximum prerequisites for a course: {max_prereqs}")
-            print(f"  Average prerequisites per course: {avg_prereqs:.2f}")
-            
-            # Show courses with most prerequisites
-            top_prereqs = sorted(prereq_counts.items(), key=lambda x: -x[1])[:5]
-            if top_prereqs:
-                print(f"  Courses with most prerequisites:")
-                for course_id, count in top_prereqs:
-                    course = next((n for n in nodes if n['id'] == course_id), None)
-                    title = course['title'] if course else course_id
-                    print(f"    {course_id}: {count} prerequisites ({title})")
+    if prereqs['courses_with']:
+        print(f"  Courses with prerequisites: {prereqs['courses_with']}")
+        print(f"  Courses without prerequisites: {prereqs['courses_without']}")
+        print(f"  Maximum prerequisites for a course: {prereqs['max']}")
+        print(f"  Average prerequisites per course: {prereqs['mean']:.2f}")
+        print(f"  Courses with most prerequisites:")
+        for course in prereqs['most']:
+            print(f"    {course['id']}: {course['prerequisites']} prerequisites ({course['title']})")
+        for direction in ('in_degree', 'out_degree'):
+            histogram = ', '.join(f"{degree}: {count}" for degree, count in prereqs[direction].items())
+            print(f"  {direction.replace('_', '-')} distribution: {histogram}")
     else:
         print("  No prerequisite relationships found")
     print()
-    
-    # Corequisite analysis
-    coreq_counts = defaultdict(int)
-    for edge in edges:
-        if edge.get('type') == 'corequisite':
-            target = edge.get('target')
-            coreq_counts[target] += 1
-    
-    if coreq_counts:
+
+    coreqs = stats['corequisites']
+    if coreqs['relationships']:
         print("🔗 Corequisite Analysis")
-        print(f"  Courses with corequisites: {len(coreq_counts)}")
-        print(f"  Total corequisite relationships: {sum(coreq_counts.values())}")
+        print(f"  Courses with corequisites: {coreqs['courses_with']}")
+        print(f"  Total corequisite relationships: {coreqs['relationships']}")
         print()
-    
-    # Graph connectivity
+
+    connectivity = stats['connectivity']
     print("🌐 Graph Connectivity")
-    # Find courses with no prerequisites (entry points)
-    all_targets = {edge['target'] for edge in edges}
-    entry_points = [node['id'] for node in nodes if node['id'] not in all_targets]
-    print(f"  Entry points (no prerequisites): {len(entry_points)}")
-    if entry_points and len(entry_points) <= 10:
-        print(f"    {', '.join(entry_points)}")
-    
-    # Find courses with no dependents (end points)
-    all_sources = {edge['source'] for edge in edges}
-    end_points = [node['id'] for node in nodes if node['id'] not in all_sources]
-    print(f"  End points (no dependents): {len(end_points)}")
-    if end_points and len(end_points) <= 10:
-        print(f"    {', '.join(end_points)}")
+    print(f"  Entry points (no prerequisites): {len(connectivity['entry_points'])}")
+    _print_list(connectivity['entry_points'])
+    print(f"  End points (no dependents): {len(connectivity['end_points'])}")
+    _print_list(connectivity['end_points'])
+    print(f"  Weakly connected components: {connectivity['components']}")
+    print(f"  Largest component: {connectivity['largest_component']} courses")
+    print(f"  Isolated courses: {connectivity['isolated_courses']}")
     print()
-    
+
+    depth = stats['depth']
+    print("🪜 Prerequisite Depth")
+    for level, count in depth['histogram'].items():
+        print(f"  Depth {level}: {count} courses")
+    if depth['unlayered_courses']:
+        print(f"  On or after a prerequisite cycle: {depth['unlayered_courses']} courses")
+    if depth['longest_chain']:
+        print(f"  Longest prerequisite chain ({len(depth['longest_chain'])} courses):")
+        print(f"    {' -> '.join(depth['longest_chain'])}")
+    print()
+
     print("=" * 60)
 
-if __name__ == "__main__":
-    # Try to find the graph file
-    script_dir = Path(__file__).parent
-    possible_paths = [
-        script_dir.parent / 'public' / 'data' / 'mit-ocw-graph.json',
-        script_dir.parent / 'data' / 'mit-ocw-graph.json',
-    ]
-    
-    graph_path = None
-    for path in possible_paths:
-        if path.exists():
-            graph_path = str(path)
-            break
-    
-    if not graph_path:
-        print("Error: Could not find mit-ocw-graph.json")
+
+def analyze_graph(graph_path: Optional[str] = None, as_json: bool = False, snapshots: bool = True):
+    """Analyze the graph and print statistics."""
+    try:
+        index = load_index(graph_path, DEFAULT_SNAPSHOT_DIR if snapshots else None)
+    except FileNotFoundError:
+        print(f"Error: Graph file not found at {graph_path or 'public/data or data'}")
         print("Run 'python fetch_mit_ocw.py' to generate the graph first.")
         sys.exit(1)
-    
-    analyze_graph(graph_path)
+
+    stats = graph_statistics(index)
+    if as_json:
+        json.dump(stats, sys.stdout, indent=2)
+        print()
+        return stats
+
+    department_courses = defaultdict(list)
+    for node in index.nodes:
+        department_courses[node.get('department') or 'Unknown'].append(node['id'])
+    print_statistics(stats, department_courses)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print statistics about the MIT OCW course graph")
+    parser.add_argument("graph", nargs="?", help="Graph JSON file (default: ../public/data or ../data)")
+    parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    parser.add_argument("--no-snapshot", action="store_true", help="Parse the JSON instead of using its cached snapshot")
+    args = parser.parse_args()
+    analyze_graph(args.graph, as_json=args.json, snapshots=not args.no_snapshot)
@@ -1,6 +1,10 @@
 import { useEffect, useRef, useState, useMemo } from 'react';
 import ELK from 'elkjs';
-import type { MITOCWGraph, MITOCWNode } from '../types/mit-ocw';
+import type { MITOCWGraph, MITOCWNode, MITOCWShardManifest } from '../types/mit-ocw';
+import { MITOCWShardLoader } from '../utils/mit-ocw-shards';
+
+// Department shards (fetch_mit_ocw.py --shards), shared across mounts so each is fetched once
+const shardLoader = new MITOCWShardLoader();
 
 // Map course number prefixes to topics (same as MITOCWTopics)
 const COURSE_PREFIX_TO_TOPIC: Record<string, string> = {
@@ -115,12 +119,23 @@ export function MITOCWGraphELK() {
   const [layout, setLayout] = useState<{ nodes: ELKNode[]; edges: ELKEdge[] } | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [manifest, setManifest] = useState<MITOCWShardManifest | null>(null);
+  const [department, setDepartment] = useState<string | null>(null);
 
   // Load graph data
   useEffect(() => {
     async function loadData() {
       try {
-        // Try different paths (with and without base path)
+        // With shards, first paint needs only the largest department's shard
+        const shards = await shardLoader.getManifest().catch(() => null);
+        if (shards && shards.shards.length > 0) {
+          const largest = shards.shards.reduce((a, b) => (b.nodes > a.nodes ? b : a));
+          setManifest(shards);
+          setDepartment(largest.department);
+          return;
+        }
+
+        // Otherwise the whole graph; try different paths (with and without base path)
         let response = await fetch('/data/mit-ocw-graph.json');
         if (!response.ok) {
           // Try with base path
@@ -143,12 +158,52 @@ export function MITOCWGraphELK() {
     loadData();
   }, []);
 
+  // Load the selected department with the cross-department edges between its courses
+  useEffect(() => {
+    if (!department) return;
+    let cancelled = false;
+    setLoading(true);
+    shardLoader.loadGraph([department]).then(
+      (data) => {
+        if (!cancelled) setGraphData(data);
+      },
+      (err) => {
+        if (cancelled) return;
+        setError(err instanceof Error ? err.message : 'Failed to load graph data');
+        setLoading(false);
+      },
+    );
+    return () => {
+      cancelled = true;
+    };
+  }, [department]);
+
   // Compute ELK layout
   useEffect(() => {
     if (!graphData) return;
 
     async function computeLayout() {
       try {
+        // Use the layout precomputed by the graph builder (fetch_mit_ocw.py --layout) if present
+        if (graphData.nodes.length > 0 && graphData.nodes.every(node => node.x !== undefined && node.y !== undefined)) {
+          setLayout({
+            nodes: graphData.nodes.map((node): ELKNode => ({
+              id: node.id,
+              width: 120,
+              height: 60,
+              x: node.x,
+              y: node.y,
+            })),
+            edges: graphData.edges.map((edge): ELKEdge => ({
+              id: `${edge.source}-${edge.target}`,
+              sources: [edge.source],
+              targets: [edge.target],
+            })),
+          });
+          setLoading(false);
+          return;
+        }
+
         const elk = new ELK();
 
         // Convert to ELK format
@@ -251,6 +306,24 @@ export function MITOCWGraphELK() {
 
   return (
     <div className="w-full h-full border border-gray-300 rounded-lg bg-white overflow-auto">
+      {manifest && (
+        <div className="p-2 border-b border-gray-200">
+          <label className="text-sm text-gray-700">
+            Department:{' '}
+            <select
+              value={department ?? ''}
+              onChange={(event) => setDepartment(event.target.value)}
+              className="border border-gray-300 rounded px-2 py-1 text-sm"
+            >
+              {manifest.shards.map((shard) => (
+                <option key={shard.department} value={shard.department}>
+                  {shard.department} ({shard.nodes} courses)
+                </option>
+              ))}
+            </select>
+          </label>
+        </div>
+      )}
       <svg
         ref={svgRef}
         width="100%"
@@ -298,6 +371,22 @@ export function MITOCWGraphELK() {
             const x2 = targetNode.x + targetNode.width / 2;
             const y2 = targetNode.y;
 
+            if (edgeData?.points?.length) {
+              // Precomputed bend points of an edge spanning several layers
+              const points = [[x1, y1], ...edgeData.points, [x2, y2]].map(([x, y]) => `${x},${y}`).join(' ');
+              return (
+                <polyline
+                  key={edge.id}
+                  points={points}
+                  fill="none"
+                  stroke={edgeData.type === 'prerequisite' ? '#2563eb' : '#10b981'}
+                  strokeWidth="2"
+                  opacity="0.6"
+                  markerEnd={`url(#arrowhead-${edgeData.type})`}
+                />
+              );
+            }
+
             return (
               <line
                 key={edge.id}
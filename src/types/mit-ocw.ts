@@ -10,6 +10,13 @@ export interface MITOCWNode {
   department?: string;
   level?: string;
   description?: string;
+  // Build-time analytics (graph_analytics.py)
+  depth?: number;
+  in_degree?: number;
+  out_degree?: number;
+  // Precomputed layout (graph_layout.py): top-left corner of a 120x60 box
+  x?: number;
+  y?: number;
 }
 
 export interface MITOCWEdge {
@@ -17,6 +24,8 @@ export interface MITOCWEdge {
   target: string;
   type: 'prerequisite' | 'corequisite';
   label: string;
+  // Bend points (node centers) of an edge spanning several layers
+  points?: [number, number][];
 }
 
 export interface MITOCWGraph {
@@ -26,5 +35,54 @@ export interface MITOCWGraph {
     total_courses: number;
     total_prerequisites: number;
     total_corequisites: number;
+    // Version chain (graph_delta.py)
+    version?: number;
+    deltas?: Array<{ from: number; to: number; file: string; bytes: number; sha256: string }>;
+    analytics?: {
+      cycles: string[][];
+      self_loops: string[];
+      layers: number;
+      duplicate_edges: number;
+      redundant_edges: number;
+      edges_reduced: boolean;
+    };
+    layout?: {
+      algorithm: string;
+      node_width: number;
+      node_height: number;
+      width: number;
+      height: number;
+      layers: number;
+      dummy_nodes: number;
+      crossings: number;
+    };
   };
 }
+
+export interface MITOCWShardEntry {
+  department: string;
+  file: string;
+  nodes: number;
+  edges: number;
+  cross_edges: number;
+  bytes: number;
+  sha256: string;
+}
+
+export interface MITOCWShardManifest {
+  version: number;
+  metadata: MITOCWGraph['metadata'];
+  shards: MITOCWShardEntry[];
+  cross: {
+    file: string;
+    edges: number;
+    bytes: number;
+    sha256: string;
+  };
+}
+
+export interface MITOCWShard {
+  department: string;
+  nodes: MITOCWNode[];
+  edges: MITOCWEdge[];
+}
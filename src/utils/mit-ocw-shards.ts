@@ -0,0 +1,107 @@
+// Lazy loading of the department-sharded MIT OCW graph
+// (written by `python fetch_mit_ocw.py --shards` to public/data/mit-ocw-shards/)
+
+import type {
+  MITOCWEdge,
+  MITOCWGraph,
+  MITOCWShard,
+  MITOCWShardManifest,
+} from '../types/mit-ocw';
+
+const SHARD_BASES = ['/data/mit-ocw-shards', '/arbor/data/mit-ocw-shards', './data/mit-ocw-shards'];
+
+/**
+ * Loads the shard manifest once, then fetches department shards on demand.
+ * Shard files are named by content hash, so each is fetched at most once
+ * per session and can be cached immutably by the browser.
+ */
+export class MITOCWShardLoader {
+  private base: string | null = null;
+  private manifest: Promise<MITOCWShardManifest> | null = null;
+  private shards = new Map<string, Promise<MITOCWShard>>();
+  private crossEdges: Promise<MITOCWEdge[]> | null = null;
+
+  getManifest(): Promise<MITOCWShardManifest> {
+    if (!this.manifest) {
+      const manifest = this.findManifest();
+      // Any failure is retried on the next call rather than cached
+      manifest.catch(() => {
+        if (this.manifest === manifest) {
+          this.manifest = null;
+        }
+      });
+      this.manifest = manifest;
+    }
+    return this.manifest;
+  }
+
+  private async findManifest(): Promise<MITOCWShardManifest> {
+    for (const base of SHARD_BASES) {
+      try {
+        const response = await fetch(`${base}/manifest.json`);
+        if (response.ok) {
+          const manifest: MITOCWShardManifest = await response.json();
+          this.base = base;
+          return manifest;
+        }
+      } catch {
+        // Network error or a malformed manifest: try the next base
+      }
+    }
+    throw new Error('Graph shards not found. Run the Python script with --shards to generate them.');
+  }
+
+  private fetchJSON<T>(file: string): Promise<T> {
+    return fetch(`${this.base}/${file}`).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load ${file}: HTTP ${response.status}`);
+      }
+      return response.json() as Promise<T>;
+    });
+  }
+
+  async loadDepartment(department: string): Promise<MITOCWShard> {
+    const manifest = await this.getManifest();
+    const entry = manifest.shards.find((shard) => shard.department === department);
+    if (!entry) {
+      throw new Error(`Unknown department: ${department}`);
+    }
+    let shard = this.shards.get(entry.file);
+    if (!shard) {
+      shard = this.fetchJSON<MITOCWShard>(entry.file);
+      shard.catch(() => this.shards.delete(entry.file));
+      this.shards.set(entry.file, shard);
+    }
+    return shard;
+  }
+
+  private async loadCrossEdges(): Promise<MITOCWEdge[]> {
+    const manifest = await this.getManifest();
+    if (!this.crossEdges) {
+      this.crossEdges = this.fetchJSON<{ edges: MITOCWEdge[] }>(manifest.cross.file).then((data) => data.edges);
+      this.crossEdges.catch(() => {
+        this.crossEdges = null;
+      });
+    }
+    return this.crossEdges;
+  }
+
+  /**
+   * Loads the given departments and merges them into one graph, including
+   * the cross-department edges whose endpoints are both loaded.
+   */
+  async loadGraph(departments: string[]): Promise<MITOCWGraph> {
+    const manifest = await this.getManifest();
+    const [shards, crossEdges] = await Promise.all([
+      Promise.all(departments.map((department) => this.loadDepartment(department))),
+      this.loadCrossEdges(),
+    ]);
+    const nodes = shards.flatMap((shard) => shard.nodes);
+    const ids = new Set(nodes.map((node) => node.id));
+    const edges = [
+      ...shards.flatMap((shard) => shard.edges),
+      ...crossEdges.filter((edge) => ids.has(edge.source) && ids.has(edge.target)),
+    ];
+    return { nodes, edges, metadata: manifest.metadata };
+  }
+}